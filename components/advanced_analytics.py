@@ -3,6 +3,7 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
+from utils.features import get_feature_column
 
 
 def create_advanced_metrics_dashboard(filtered_data):
@@ -13,25 +14,25 @@ def create_advanced_metrics_dashboard(filtered_data):
         st.warning("No hay datos disponibles con los filtros aplicados.")
         return
     
-    # Métricas de eficiencia
+    # Métricas de eficiencia: promedio de las tasas por partida que precalcula el cargador
     st.subheader("📊 Métricas de Eficiencia")
     
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        avg_damage_per_min = filtered_data['HeroDmg'].mean() / (filtered_data['GameTime'].dt.total_seconds().mean() / 60)
+        avg_damage_per_min = get_feature_column(filtered_data, 'HeroDmgPerMin').mean()
         st.metric("Daño por Minuto", f"{avg_damage_per_min:.0f}")
     
     with col2:
-        avg_healing_per_min = filtered_data['HealShield'].mean() / (filtered_data['GameTime'].dt.total_seconds().mean() / 60)
+        avg_healing_per_min = get_feature_column(filtered_data, 'HealingPerMin').mean()
         st.metric("Curación por Minuto", f"{avg_healing_per_min:.0f}")
     
     with col3:
-        kill_participation = (filtered_data['Takedowns'].sum() / filtered_data['Deaths'].sum()) if filtered_data['Deaths'].sum() > 0 else 0
-        st.metric("Ratio K/D Global", f"{kill_participation:.2f}")
+        avg_kda = get_feature_column(filtered_data, 'KDA').mean()
+        st.metric("KDA Promedio", f"{avg_kda:.2f}")
     
     with col4:
-        avg_xp_per_min = filtered_data['XP'].mean() / (filtered_data['GameTime'].dt.total_seconds().mean() / 60)
+        avg_xp_per_min = get_feature_column(filtered_data, 'XPPerMin').mean()
         st.metric("XP por Minuto", f"{avg_xp_per_min:.0f}")
     
     # Análisis de correlaciones
@@ -110,7 +111,7 @@ def create_exploration_dashboard(filtered_data):
     if 'Role' in filtered_data.columns:
         st.subheader("🎭 Análisis por Roles")
         
-        role_stats = filtered_data.groupby('Role').agg({
+        role_stats = filtered_data.groupby('Role', observed=True).agg({
             'HeroDmg': 'mean',
             'DmgTaken': 'mean', 
             'HealShield': 'mean',
@@ -153,8 +154,8 @@ def create_advanced_composition_analysis(filtered_data):
     if 'Winner' in filtered_data.columns:
         st.subheader("🏆 Win Rates por Héroe")
         
-        hero_winrates = filtered_data.groupby('Hero').agg({
-            'Winner': lambda x: (x == 'Winner').mean() * 100
+        hero_winrates = filtered_data.groupby('Hero', observed=True).agg({
+            'Winner': lambda x: x.mean() * 100
         }).round(1)
         hero_winrates.columns = ['Win Rate %']
         hero_winrates = hero_winrates.sort_values('Win Rate %', ascending=False)
@@ -3,7 +3,11 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
-from collections import Counter
+from utils.aggregates import aggregate
+from utils.composition_engine import composition_stats
+from utils.match_table import get_match_table
+from utils.profiling import profiled
+from utils.synergy_engine import get_synergy_matrices
 
 
 def create_composition_analysis(filtered_data):
@@ -35,6 +39,7 @@ def create_composition_analysis(filtered_data):
         create_team_statistics(filtered_data)
 
 
+@profiled
 def create_role_composition_analysis(data):
     """Análisis de composiciones por roles."""
     st.markdown("#### 🎭 Análisis de Composiciones por Rol")
@@ -76,8 +81,8 @@ def create_role_composition_analysis(data):
         if 'Winner' in data.columns:
             st.markdown("##### 🏆 Rendimiento por Rol")
             
-            role_performance = data.groupby('Role').agg({
-                'Winner': lambda x: (x == 'Winner').mean() * 100,
+            role_performance = data.groupby('Role', observed=True).agg({
+                'Winner': lambda x: x.mean() * 100,
                 'HeroDmg': 'mean',
                 'Deaths': 'mean',
                 'Assists': 'mean'
@@ -106,6 +111,7 @@ def create_role_composition_analysis(data):
         st.error(f"Error en análisis de roles: {e}")
 
 
+@profiled
 def create_hero_synergy_analysis(data):
     """Análisis de sinergias entre héroes."""
     st.markdown("#### 🤝 Análisis de Sinergias de Héroes")
@@ -137,8 +143,8 @@ def create_hero_synergy_analysis(data):
         with col2:
             # Win rate por héroe (solo héroes con >5 partidas)
             if 'Winner' in data.columns:
-                hero_stats = data.groupby('Hero').agg({
-                    'Winner': lambda x: (x == 'Winner').mean() * 100,
+                hero_stats = data.groupby('Hero', observed=True).agg({
+                    'Winner': lambda x: x.mean() * 100,
                     'Hero': 'count'
                 }).round(2)
                 hero_stats.columns = ['Win Rate (%)', 'Games']
@@ -163,24 +169,20 @@ def create_hero_synergy_analysis(data):
                 )
                 st.plotly_chart(fig_winrate, use_container_width=True)
         
+        # Sinergias y counters por pareja de héroes
+        if 'Winner' in data.columns:
+            create_hero_pair_analysis(data, list(hero_usage.index))
+        
         # Análisis de combinaciones de roles
-        st.markdown("##### 🎭 Combinaciones de Roles por Partida")
+        st.markdown("##### 🎭 Combinaciones de Roles por Equipo")
         
-        # Agrupar por algún identificador de partida (si existe)
-        if 'Date' in data.columns:
-            # Usar fecha + hora como proxy para identificar partidas
-            if 'Hour' in data.columns:
-                data['Game_ID'] = data['Date'].astype(str) + '_' + data['Hour'].astype(str)
-            else:
-                data['Game_ID'] = data['Date'].astype(str)
-            
-            # Obtener combinaciones de roles por partida
-            role_combinations = data.groupby('Game_ID')['Role'].apply(list).reset_index()
-            role_combinations['Role_Combo'] = role_combinations['Role'].apply(
-                lambda x: ', '.join(sorted(Counter(x).keys()))
-            )
-            
-            combo_counts = role_combinations['Role_Combo'].value_counts().head(10)
+        # Combinaciones de roles de cada equipo, reconstruidos en la tabla de partidas
+        matches = get_match_table(data)
+        _, team_roles, won = matches.teams()
+        if team_roles is not None and len(team_roles) > 0:
+            # Una firma entera por multiconjunto de roles; frecuencias con bincount
+            stats = composition_stats(team_roles, won, list(matches.role_categories))
+            combo_counts = stats.set_index('Composition')['Games'].head(10)
             
             if len(combo_counts) > 0:
                 fig_combo = px.bar(
@@ -203,6 +205,45 @@ def create_hero_synergy_analysis(data):
         st.error(f"Error en análisis de sinergias: {e}")
 
 
+@profiled
+def create_hero_pair_analysis(data, top_heroes):
+    """Sinergias entre aliados y enfrentamientos entre rivales, desde las matrices por pareja."""
+    st.markdown("##### 🤝 Sinergias y Counters por Pareja")
+    
+    synergies = get_synergy_matrices(data)
+    
+    # Diferencia entre el winrate de la pareja y la media de los winrates individuales
+    synergy_matrix = synergies.synergy_matrix(top_heroes) * 100
+    fig_synergy = px.imshow(
+        synergy_matrix,
+        title="🔗 Delta de Win Rate como Aliados (Top 15, pp)",
+        template="plotly_dark",
+        color_continuous_scale="RdYlGn",
+        color_continuous_midpoint=0,
+        aspect="auto"
+    )
+    fig_synergy.update_layout(height=500)
+    st.plotly_chart(fig_synergy, use_container_width=True)
+    
+    selected_hero = st.selectbox(
+        "Héroe para ver sus mejores aliados y enfrentamientos:",
+        top_heroes,
+        key="synergy_hero"
+    )
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.markdown("**🤝 Mejores aliados**")
+        st.dataframe(synergies.best_partners(selected_hero).round(3), use_container_width=True)
+    with col2:
+        st.markdown("**💪 Gana contra**")
+        st.dataframe(synergies.matchups(selected_hero).round(3), use_container_width=True)
+    with col3:
+        st.markdown("**⚠️ Pierde contra**")
+        st.dataframe(synergies.matchups(selected_hero, best=False).round(3), use_container_width=True)
+
+
+@profiled
 def create_meta_analysis(data):
     """Análisis del meta actual."""
     st.markdown("#### 🎯 Análisis del Meta")
@@ -228,7 +269,7 @@ def create_meta_analysis(data):
         
         with col4:
             if 'Winner' in data.columns:
-                overall_winrate = (data['Winner'] == 'Winner').mean() * 100
+                overall_winrate = data['Winner'].mean() * 100
                 st.metric("🎯 Win Rate General", f"{overall_winrate:.1f}%")
             else:
                 st.metric("🎯 Win Rate General", "N/A")
@@ -238,12 +279,12 @@ def create_meta_analysis(data):
         
         if 'Winner' in data.columns:
             # Calcular estadísticas por héroe
-            hero_meta_stats = data.groupby('Hero').agg({
-                'Winner': lambda x: (x == 'Winner').mean() * 100,
-                'Hero': 'count',
-                'HeroDmg': 'mean'
+            hero_aggregates = aggregate(data, 'Hero', ['Winner', 'HeroDmg'], ['mean', 'count'])
+            hero_meta_stats = pd.DataFrame({
+                'Win Rate (%)': hero_aggregates[('Winner', 'mean')] * 100,
+                'Pick Rate': hero_aggregates[('Winner', 'count')],
+                'Avg Damage': hero_aggregates[('HeroDmg', 'mean')]
             }).round(2)
-            hero_meta_stats.columns = ['Win Rate (%)', 'Pick Rate', 'Avg Damage']
             
             # Solo héroes con al menos 3 partidas
             hero_meta_stats = hero_meta_stats[hero_meta_stats['Pick Rate'] >= 3]
@@ -318,6 +359,7 @@ def create_meta_analysis(data):
         st.error(f"Error en análisis del meta: {e}")
 
 
+@profiled
 def create_team_statistics(data):
     """Estadísticas de equipo y rendimiento conjunto."""
     st.markdown("#### 📊 Estadísticas de Equipo")
@@ -329,11 +371,11 @@ def create_team_statistics(data):
             
             # Convertir fecha si es necesario
             try:
-                data['Date'] = pd.to_datetime(data['Date'], format='%d/%m/%Y')
-                data['Month'] = data['Date'].dt.to_period('M').astype(str)
+                dates = pd.to_datetime(data['Date'], format='%d/%m/%Y')
+                months = dates.dt.to_period('M').astype(str).rename('Month')
                 
                 # Evolución de uso de héroes por mes
-                monthly_hero_usage = data.groupby(['Month', 'Hero']).size().reset_index(name='Usage')
+                monthly_hero_usage = data.groupby([months, 'Hero'], observed=True).size().reset_index(name='Usage')
                 
                 # Top 5 héroes por mes
                 top_heroes_monthly = (
@@ -368,7 +410,7 @@ def create_team_statistics(data):
         st.markdown("##### ⚔️ Análisis de Daño por Rol")
         
         if 'Role' in data.columns and 'HeroDmg' in data.columns:
-            role_damage_stats = data.groupby('Role')['HeroDmg'].agg([
+            role_damage_stats = data.groupby('Role', observed=True)['HeroDmg'].agg([
                 'mean', 'median', 'std', 'min', 'max'
             ]).round(2)
             
@@ -421,7 +463,7 @@ def create_team_statistics(data):
         
         if 'Winner' in data.columns:
             # Tasa de victoria general
-            win_rate = (data['Winner'] == 'Yes').mean() * 100
+            win_rate = data['Winner'].mean() * 100
             
             col1, col2 = st.columns(2)
             
@@ -433,8 +475,8 @@ def create_team_statistics(data):
             
             # Tasa de victoria por rol
             if 'Role' in data.columns:
-                win_by_role = data.groupby('Role')['Winner'].apply(
-                    lambda x: (x == 'Yes').mean() * 100
+                win_by_role = data.groupby('Role', observed=True)['Winner'].apply(
+                    lambda x: x.mean() * 100
                 ).reset_index()
                 win_by_role.columns = ['Role', 'Win Rate']
                 
@@ -2,7 +2,8 @@ import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
-import numpy as np
+from utils.data_loader import get_memory_footprint, get_metric_columns, get_metric_label
+from utils.profiling import profiled
 
 
 def create_data_exploration(filtered_data):
@@ -30,12 +31,13 @@ def create_data_exploration(filtered_data):
         create_raw_data_view(filtered_data)
 
 
+@profiled
 def create_statistical_summary(data):
     """Muestra un resumen estadístico detallado."""
     st.markdown("#### 📊 Resumen Estadístico")
     
-    # Obtener solo columnas numéricas
-    numeric_cols = data.select_dtypes(include=[np.number]).columns.tolist()
+    # Obtener solo columnas numéricas que sean métricas (sin MatchKey ni Hour)
+    numeric_cols = get_metric_columns(data)
     
     if not numeric_cols:
         st.warning("No se encontraron columnas numéricas para analizar.")
@@ -45,7 +47,7 @@ def create_statistical_summary(data):
     st.markdown("##### 📈 Estadísticas Descriptivas")
     
     try:
-        stats = data[numeric_cols].describe()
+        stats = data[numeric_cols].describe().rename(columns=get_metric_label)
         st.dataframe(stats.round(2), use_container_width=True)
     except Exception as e:
         st.error(f"Error al generar estadísticas: {e}")
@@ -89,12 +91,13 @@ def create_statistical_summary(data):
             st.metric("🦸‍♂️ Héroes Únicos", "N/A")
 
 
+@profiled
 def create_correlation_analysis(data):
     """Análisis de correlaciones entre variables."""
     st.markdown("#### 🔗 Análisis de Correlaciones")
     
-    # Obtener solo columnas numéricas
-    numeric_cols = data.select_dtypes(include=[np.number]).columns.tolist()
+    # Obtener solo columnas numéricas que sean métricas (sin MatchKey ni Hour)
+    numeric_cols = get_metric_columns(data)
     
     if len(numeric_cols) < 2:
         st.warning("Se necesitan al menos 2 columnas numéricas para análisis de correlación.")
@@ -102,7 +105,7 @@ def create_correlation_analysis(data):
     
     try:
         # Calcular matriz de correlación
-        corr_matrix = data[numeric_cols].corr()
+        corr_matrix = data[numeric_cols].corr().rename(index=get_metric_label, columns=get_metric_label)
         
         # Gráfico de matriz de correlación
         fig = px.imshow(
@@ -150,12 +153,13 @@ def create_correlation_analysis(data):
         st.error(f"Error al calcular correlaciones: {e}")
 
 
+@profiled
 def create_distribution_analysis(data):
     """Análisis de distribuciones de variables."""
     st.markdown("#### 📈 Distribuciones de Variables")
     
-    # Obtener columnas numéricas
-    numeric_cols = data.select_dtypes(include=[np.number]).columns.tolist()
+    # Obtener columnas numéricas que sean métricas (sin MatchKey ni Hour)
+    numeric_cols = get_metric_columns(data)
     
     if not numeric_cols:
         st.warning("No se encontraron columnas numéricas para analizar distribuciones.")
@@ -165,6 +169,7 @@ def create_distribution_analysis(data):
     selected_var = st.selectbox(
         "Selecciona una variable para analizar:",
         numeric_cols,
+        format_func=get_metric_label,
         help="Elige una variable numérica para ver su distribución"
     )
     
@@ -230,6 +235,7 @@ def create_distribution_analysis(data):
                 st.info(f"Ejemplo de valores: {list(data[selected_var].dropna().head(3))}")
 
 
+@profiled
 def create_raw_data_view(data):
     """Vista de datos brutos con filtros y búsqueda."""
     st.markdown("#### 🎮 Vista de Datos Brutos")
@@ -245,6 +251,10 @@ def create_raw_data_view(data):
         memory_usage = data.memory_usage(deep=True).sum() / 1024**2
         st.metric("💾 Memoria (MB)", f"{memory_usage:.2f}")
     
+    # Detalle de memoria por columna según el esquema de tipos del cargador
+    with st.expander("💾 Memoria por columna"):
+        st.dataframe(get_memory_footprint(data), use_container_width=True, hide_index=True)
+    
     # Filtros para la vista
     st.markdown("##### 🔍 Filtros de Vista")
     
@@ -279,15 +289,15 @@ def create_raw_data_view(data):
     )
     
     try:
-        # Aplicar filtros
-        display_data = data.copy()
+        # Aplicar filtros (cada paso crea un frame nuevo; data no se copia ni se modifica)
+        display_data = data
         
         if selected_columns:
             display_data = display_data[selected_columns]
         
         if search_term:
             # Buscar en columnas de texto
-            text_columns = display_data.select_dtypes(include=['object']).columns
+            text_columns = display_data.select_dtypes(include=['object', 'category']).columns
             if len(text_columns) > 0:
                 mask = False
                 for col in text_columns:
@@ -1,6 +1,13 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
+from utils.data_loader import DERIVED_COLUMNS, load_filter_engine
+from utils.aggregates import register_query
+from utils.filter_engine import FilterEngine
+from utils.query_cache import ByteBudgetLRU, filter_signature
+
+# Presupuesto de memoria para los subconjuntos filtrados cacheados
+FILTER_CACHE_MAX_BYTES = 256 * 1024**2
 
 
 def create_friendly_date_filter(date_series, label):
@@ -211,7 +218,9 @@ def create_filters(data):
         
         # Mostrar información de calidad de datos
         total_rows = len(data)
-        clean_rows = len(data.dropna())
+        # Sin dropna, que copiaba el dataset completo en cada rerun; las columnas derivadas no cuentan
+        source_columns = data.columns.difference(DERIVED_COLUMNS, sort=False)
+        clean_rows = int(data[source_columns].notna().all(axis=1).sum())
         if total_rows > clean_rows:
             st.info(f"ℹ️ Datos: {clean_rows:,}/{total_rows:,} filas completas")
         
@@ -267,48 +276,65 @@ def create_filters(data):
     return filters
 
 
-def apply_filters(data, filters):
-    """Aplica los filtros seleccionados al DataFrame."""
-    filtered_data = data.copy()
+def get_filter_engine(dataset):
+    """Motor de filtros del dataset, construido una sola vez por versión (ver load_filter_engine)"""
+    return load_filter_engine(dataset)
+
+
+@st.cache_resource(show_spinner=False)
+def get_subset_cache():
+    """Caché LRU (limitada por bytes) de subconjuntos filtrados, compartida entre sesiones"""
+    return ByteBudgetLRU(FILTER_CACHE_MAX_BYTES)
+
+
+def apply_filters(data, filters, engine=None, dataset_id=None, cube=None, matches=None):
+    """Aplica los filtros seleccionados al DataFrame.
     
-    # APLICAR FILTRO GEEKOS PRIMERO (si está activo)
-    if filters.get('_geeko_filter', False) and filters.get('_geeko_players'):
-        geeko_players = filters['_geeko_players']
-        if 'Player' in filtered_data.columns:
-            # Filtrar solo jugadores Geekos seleccionados
-            filtered_data = filtered_data[filtered_data['Player'].isin(geeko_players)]
+    Con dataset_id (el token de versión de DatasetHandle), el resultado se memoriza por
+    (dataset, firma de filtros) sin hashear el DataFrame: los reruns
+    que no cambian filtros (pestañas, selectores de gráficos) no vuelven a filtrar.
+    El cubo de agregados, si existe, se asocia al resultado para que las agregaciones
+    de los componentes se respondan desde él, igual que la tabla de partidas.
+    El DataFrame retornado es una copia superficial del subconjunto cacheado: añadirle
+    columnas no altera la caché; modificar valores en el lugar requiere copy-on-write
+    (ver pandas_options.enable_copy_on_write).
+    """
+    cache_key = None
+    if dataset_id is not None:
+        cache_key = (dataset_id, filter_signature(filters))
+        cached_subset = get_subset_cache().get(cache_key)
+        if cached_subset is not None:
+            # Copia diferida: el subconjunto cacheado se comparte entre reruns y sesiones
+            cached_subset = cached_subset.copy(deep=False)
+            register_query(cached_subset, dataset_id, filters, cube, matches=matches)
+            return cached_subset
     
-    # Aplicar filtros regulares
-    for column, filter_vals in filters.items():
-        # Saltar filtros especiales internos
-        if column.startswith('_'):
-            continue
-            
-        if filter_vals and column in filtered_data.columns:
-            try:
-                if column == "Date":
-                    # Manejar filtro de fechas
-                    if hasattr(filter_vals, '__len__') and len(filter_vals) == 2:
-                        start_date, end_date = filter_vals
-                        date_column = filtered_data["Date"]
-                        if date_column.dtype == 'object':
-                            date_column = pd.to_datetime(date_column, errors='coerce')
-                        
-                        mask = (date_column.dt.date >= start_date) & (date_column.dt.date <= end_date)
-                        filtered_data = filtered_data[mask]
-                        
-                elif isinstance(filter_vals, (list, tuple)) and filter_vals:
-                    # Manejar filtros multiselect
-                    # Convertir tanto los datos como los filtros a string para comparación consistente
-                    column_str = filtered_data[column].astype(str)
-                    filter_vals_str = [str(v) for v in filter_vals]
-                    
-                    # Excluir valores NaN/None explícitamente
-                    mask = column_str.isin(filter_vals_str) & (column_str.notna()) & (column_str != 'nan')
-                    filtered_data = filtered_data[mask]
-                    
-            except Exception as e:
-                st.warning(f"⚠️ Error aplicando filtro {column}: {str(e)}")
-                continue
-                
+    if engine is None or engine.n_rows != len(data):
+        engine = FilterEngine(data)
+    
+    # Un filtro que falla se omite con un aviso, sin descartar los demás
+    failed_filters = {}
+    try:
+        # Una sola máscara para todos los filtros; sin filtros activos no se copia nada
+        rows = engine.select_rows(filters, on_error=failed_filters.__setitem__)
+    except Exception as e:
+        # Nunca se devuelven datos sin filtrar: ante un fallo general no se muestra nada
+        st.warning(f"⚠️ Error aplicando filtros: {str(e)}")
+        return data.iloc[:0]
+    
+    for column, error in failed_filters.items():
+        st.warning(f"⚠️ Error aplicando filtro {column}: {str(error)}")
+    if failed_filters:
+        # El cubo y las agregaciones deben responder a los filtros que sí se aplicaron
+        filters = {column: value for column, value in filters.items() if column not in failed_filters}
+        cache_key = None if cache_key is None else (dataset_id, filter_signature(filters))
+    
+    filtered_data = data if rows is None else data.take(rows)
+    if cache_key is not None:
+        # Los resultados con filtros omitidos no se memorizan para que el aviso se repita
+        if rows is not None and not failed_filters:
+            get_subset_cache().put(cache_key, filtered_data)
+            filtered_data = filtered_data.copy(deep=False)
+        # Las agregaciones de los componentes se memorizan con la misma clave
+        register_query(filtered_data, dataset_id, filters, cube, matches=matches)
     return filtered_data
@@ -3,6 +3,7 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 from .explanations import create_explanation_section
+from utils.aggregates import aggregate
 
 
 def create_hero_analysis(filtered_data):
@@ -75,7 +76,7 @@ def create_hero_analysis(filtered_data):
             # Análisis por héroe agregado
             st.markdown("#### Análisis por Héroe (Promedio)")
             hero_col = "HeroName" if "HeroName" in filtered_data.columns else "Hero"
-            hero_stats = filtered_data.groupby(hero_col)[available_columns].mean().reset_index()
+            hero_stats = aggregate(filtered_data, hero_col, available_columns, 'mean').reset_index()
             
             fig_hero = px.scatter(
                 hero_stats,
@@ -110,7 +111,7 @@ def create_hero_analysis(filtered_data):
             role_col = "Role" if "Role" in filtered_data.columns else None
             if role_col and filtered_data[role_col].nunique() > 1:
                 st.markdown(f"#### Análisis por Rol ({available_metrics.get(metric_y, metric_y)})")
-                role_stats = filtered_data.groupby(role_col)[available_columns].mean().reset_index()
+                role_stats = aggregate(filtered_data, role_col, available_columns, 'mean').reset_index()
                 
                 fig_role = px.bar(
                     role_stats,
@@ -183,7 +184,7 @@ def create_hero_analysis(filtered_data):
         
         with col2:
             if "Winner" in filtered_data.columns:
-                win_rate = (filtered_data["Winner"] == "Yes").mean() * 100
+                win_rate = filtered_data["Winner"].mean() * 100
                 st.metric(
                     "Tasa de Victoria",
                     f"{win_rate:.1f}%"
@@ -2,7 +2,8 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from utils.hero_roles import get_hero_roles, get_all_roles
+from utils.data_loader import get_hero_role_column
+from utils.hero_roles import get_all_roles
 
 
 def create_metrics(filtered_data, original_data):
@@ -44,8 +45,8 @@ def create_metrics(filtered_data, original_data):
 
     with col3:
         if len(filtered_data) > 0 and "Winner" in filtered_data.columns:
-            win_rate = (filtered_data["Winner"] == "Yes").mean() * 100
-            original_win_rate = (original_data["Winner"] == "Yes").mean() * 100 if "Winner" in original_data.columns else 50
+            win_rate = filtered_data["Winner"].mean() * 100
+            original_win_rate = original_data["Winner"].mean() * 100 if "Winner" in original_data.columns else 50
             delta_wr = win_rate - original_win_rate
             st.metric(
                 "Tasa de Victoria",
@@ -83,37 +84,33 @@ def create_metrics(filtered_data, original_data):
     # Nuevas métricas basadas en roles
     st.markdown("### 🎭 Métricas por Rol")
     
-    # Obtener mapeo de héroes a roles
-    hero_roles = get_hero_roles()
+    # Rol de cada registro (columna precalculada en la carga), sin copiar el dataset filtrado
+    roles = get_hero_role_column(filtered_data)
     
-    # Agregar columna de roles al dataset
-    filtered_data_with_roles = filtered_data.copy()
-    filtered_data_with_roles['Role'] = filtered_data_with_roles['Hero'].map(hero_roles)
-    
-    # Filtrar solo los registros que tienen rol asignado
-    role_data = filtered_data_with_roles[filtered_data_with_roles['Role'].notna()]
-    
-    if len(role_data) > 0:
+    if roles.notna().any():
+        # Todas las métricas por rol en una sola pasada de groupby
+        file_col = 'File' if 'File' in filtered_data.columns else 'FileName'
+        role_aggregations = {'Registros': ('Hero', 'size')}
+        if file_col in filtered_data.columns:
+            role_aggregations['Partidas'] = (file_col, 'nunique')
+        if "HeroDmg" in filtered_data.columns:
+            role_aggregations['Daño'] = ('HeroDmg', 'mean')
+        if "Winner" in filtered_data.columns:
+            role_aggregations['Victorias'] = ('Winner', 'mean')
+        role_stats = filtered_data.groupby(roles.rename('Role'), observed=True).agg(**role_aggregations)
+        
         # Calcular métricas por rol
         role_metrics = []
         
         for role in get_all_roles():
-            role_subset = role_data[role_data['Role'] == role]
-            
-            if len(role_subset) > 0:
-                # Verificar que las columnas necesarias existen
-                file_col = 'File' if 'File' in role_subset.columns else 'FileName'
-                total_games_role = role_subset[file_col].nunique() if file_col in role_subset.columns else len(role_subset)
-                
-                # Calcular métricas seguras
-                avg_damage_role = role_subset["HeroDmg"].mean() if "HeroDmg" in role_subset.columns else 0
-                win_rate_role = (role_subset["Winner"] == "Yes").mean() * 100 if "Winner" in role_subset.columns else 0
+            if role in role_stats.index:
+                stats = role_stats.loc[role]
                 
                 role_metrics.append({
                     'Rol': role,
-                    'Total Partidas': total_games_role,
-                    'Daño Promedio': avg_damage_role,
-                    'Tasa de Victoria': win_rate_role
+                    'Total Partidas': int(stats['Partidas'] if 'Partidas' in stats else stats['Registros']),
+                    'Daño Promedio': stats['Daño'] if 'Daño' in stats else 0,
+                    'Tasa de Victoria': stats['Victorias'] * 100 if 'Victorias' in stats else 0
                 })
         
         if role_metrics:
@@ -44,8 +44,8 @@ def create_metrics(filtered_data, original_data):
 
     with col3:
         if len(filtered_data) > 0 and "Winner" in filtered_data.columns:
-            win_rate = (filtered_data["Winner"] == "Yes").mean() * 100
-            original_win_rate = (original_data["Winner"] == "Yes").mean() * 100 if "Winner" in original_data.columns else 50
+            win_rate = filtered_data["Winner"].mean() * 100
+            original_win_rate = original_data["Winner"].mean() * 100 if "Winner" in original_data.columns else 50
             delta_wr = win_rate - original_win_rate
             st.metric(
                 "Tasa de Victoria",
@@ -107,7 +107,7 @@ def create_metrics(filtered_data, original_data):
                 
                 # Calcular métricas seguras
                 avg_damage_role = role_subset["HeroDmg"].mean() if "HeroDmg" in role_subset.columns else 0
-                win_rate_role = (role_subset["Winner"] == "Yes").mean() * 100 if "Winner" in role_subset.columns else 0
+                win_rate_role = role_subset["Winner"].mean() * 100 if "Winner" in role_subset.columns else 0
                 
                 role_metrics.append({
                     'Rol': role,
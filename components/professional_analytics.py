@@ -8,6 +8,9 @@ import seaborn as sns
 from scipy import stats
 from sklearn.decomposition import PCA
 from sklearn.preprocessing import StandardScaler
+from utils.data_loader import get_metric_columns, get_metric_label
+from utils.features import GAME_MINUTES_COLUMN, get_feature_column
+from utils.profiling import profiled
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -42,6 +45,7 @@ def create_professional_analytics_dashboard(filtered_data):
         create_predictive_models_dashboard(filtered_data)
 
 
+@profiled
 def create_executive_dashboard(data):
     """Dashboard ejecutivo con métricas clave"""
     
@@ -128,6 +132,7 @@ def create_executive_dashboard(data):
     create_executive_insights(data, meta_health)
 
 
+@profiled
 def create_advanced_kpis_dashboard(data):
     """KPIs avanzados y métricas profesionales"""
     
@@ -178,6 +183,7 @@ def create_advanced_kpis_dashboard(data):
         create_player_performance_distribution(data)
 
 
+@profiled
 def create_statistical_analysis_dashboard(data):
     """Análisis estadístico avanzado"""
     
@@ -186,13 +192,14 @@ def create_statistical_analysis_dashboard(data):
     # Análisis de distribuciones
     st.markdown("##### 📊 Distribution Analysis")
     
-    numeric_columns = data.select_dtypes(include=[np.number]).columns.tolist()
+    numeric_columns = get_metric_columns(data)
     
     if len(numeric_columns) >= 2:
         selected_metrics = st.multiselect(
             "Select metrics for distribution analysis:",
             numeric_columns,
-            default=numeric_columns[:3] if len(numeric_columns) >= 3 else numeric_columns
+            default=numeric_columns[:3] if len(numeric_columns) >= 3 else numeric_columns,
+            format_func=get_metric_label
         )
         
         if selected_metrics:
@@ -215,6 +222,7 @@ def create_statistical_analysis_dashboard(data):
         create_pca_analysis(data, numeric_columns)
 
 
+@profiled
 def create_performance_insights_dashboard(data):
     """Dashboard de insights de performance"""
     
@@ -241,6 +249,7 @@ def create_performance_insights_dashboard(data):
         create_game_mode_analysis(data)
 
 
+@profiled
 def create_predictive_models_dashboard(data):
     """Dashboard de modelos predictivos"""
     
@@ -262,6 +271,11 @@ def create_predictive_models_dashboard(data):
 
 def calculate_avg_game_time(data):
     """Calcula el tiempo promedio de juego en minutos"""
+    # Duración en minutos precalculada por el cargador
+    if GAME_MINUTES_COLUMN in data.columns:
+        game_minutes = data[GAME_MINUTES_COLUMN].mean()
+        return game_minutes if pd.notna(game_minutes) else 20.0
+    
     if 'GameTime' in data.columns:
         try:
             # Manejar diferentes tipos de datos en GameTime
@@ -303,7 +317,7 @@ def calculate_meta_health(data):
       # Balance Score (basado en winrates)
     balance_score = 75  # Default
     if 'Winner' in data.columns:
-        hero_winrates = data.groupby('Hero')['Winner'].apply(lambda x: (x == 'Yes').mean())
+        hero_winrates = data.groupby('Hero', observed=True)['Winner'].mean()
         winrate_std = hero_winrates.std()
         balance_score = max(0, 100 - (winrate_std * 500))  # Normalize
     
@@ -325,12 +339,9 @@ def calculate_efficiency_metrics(data):
     
     metrics = {}
     
-    # KDA Efficiency
+    # KDA Efficiency: promedio del KDA de cada partida
     if all(col in data.columns for col in ['HeroKills', 'Assists', 'Deaths']):
-        kills = data['HeroKills'].mean()
-        assists = data['Assists'].mean()
-        deaths = data['Deaths'].mean()
-        metrics['avg_kda'] = (kills + assists) / max(deaths, 1)
+        metrics['avg_kda'] = get_feature_column(data, 'KDA').mean()
     
     # Damage Efficiency    if 'HeroDmg' in data.columns and 'DmgTaken' in data.columns:
         damage_ratio = data['HeroDmg'] / (data['DmgTaken'] + 1)
@@ -339,9 +350,8 @@ def calculate_efficiency_metrics(data):
     # Survivability
     if 'Deaths' in data.columns and 'GameTime' in data.columns:
         try:
-            game_time_minutes = calculate_avg_game_time(data)
-            avg_deaths = data['Deaths'].mean()
-            metrics['survivability'] = max(0, 100 - (avg_deaths / game_time_minutes * 100))
+            deaths_per_minute = get_feature_column(data, 'DeathsPerMin').mean()
+            metrics['survivability'] = max(0, 100 - deaths_per_minute * 100)
         except:
             metrics['survivability'] = 75
     
@@ -357,15 +367,14 @@ def calculate_efficiency_metrics(data):
 def create_performance_trend_chart(data):
     """Crea gráfico de tendencias de performance"""
     
-    # Si no hay fecha, crear índice temporal
+    # Si no hay fecha, crear índice temporal (sin modificar el DataFrame compartido)
     if 'Date' not in data.columns:
-        data = data.copy()
-        data['Period'] = pd.cut(range(len(data)), bins=10, labels=False)
+        periods = pd.Series(pd.cut(range(len(data)), bins=10, labels=False), index=data.index, name='Period')
     else:
-        data['Period'] = pd.to_datetime(data['Date']).dt.date
+        periods = pd.to_datetime(data['Date']).dt.date.rename('Period')
     
     # Agregar métricas por período
-    trend_data = data.groupby('Period').agg({
+    trend_data = data.groupby(periods).agg({
         'HeroDmg': 'mean',
         'Takedowns': 'mean',
         'Deaths': 'mean'
@@ -475,10 +484,11 @@ def create_executive_insights(data, meta_health):
             st.info(insight)
 
 
+@profiled
 def create_advanced_correlation_matrix(data):
     """Crea matriz de correlación avanzada"""
     
-    numeric_cols = data.select_dtypes(include=[np.number]).columns.tolist()
+    numeric_cols = get_metric_columns(data)
     
     if len(numeric_cols) < 3:
         st.info("No hay suficientes columnas numéricas para análisis de correlación")
@@ -496,8 +506,8 @@ def create_advanced_correlation_matrix(data):
     fig = px.imshow(
         corr_matrix,
         labels=dict(color="Correlation"),
-        x=relevant_cols,
-        y=relevant_cols,
+        x=[get_metric_label(col) for col in relevant_cols],
+        y=[get_metric_label(col) for col in relevant_cols],
         color_continuous_scale='RdBu',
         aspect="auto"
     )
@@ -517,10 +527,11 @@ def create_efficiency_performance_analysis(data):
         st.info("No hay suficientes métricas para análisis de eficiencia")
         return
     
-    # Calcular eficiencia
-    data_copy = data.copy()
-    data_copy['Efficiency'] = data_copy['Takedowns'] / (data_copy['Deaths'] + 1)
-    data_copy['Performance'] = data_copy['HeroDmg'] / 1000 + data_copy['Takedowns'] * 100
+    # Eficiencia = KDA precalculado (assign hace una copia diferida: no duplica las columnas de data)
+    data_copy = data.assign(
+        Efficiency=get_feature_column(data, 'KDA'),
+        Performance=data['HeroDmg'] / 1000 + data['Takedowns'] * 100
+    )
     
     fig = px.scatter(
         data_copy,
@@ -530,7 +541,7 @@ def create_efficiency_performance_analysis(data):
         size='XP' if 'XP' in data.columns else None,
         title="Efficiency vs Performance Analysis",
         labels={
-            'Efficiency': 'Efficiency Score (Takedowns/Deaths)',
+            'Efficiency': 'Efficiency Score (KDA)',
             'Performance': 'Performance Score'
         }
     )
@@ -544,7 +555,7 @@ def create_player_performance_distribution(data):
     if 'Player' not in data.columns:
         return
     
-    player_stats = data.groupby('Player').agg({
+    player_stats = data.groupby('Player', observed=True).agg({
         'HeroDmg': 'mean',
         'Takedowns': 'mean',
         'Deaths': 'mean'
@@ -572,8 +583,8 @@ def create_professional_distribution_analysis(data, metrics):
     
     fig = make_subplots(
         rows=len(metrics), cols=2,
-        subplot_titles=[f'{metric} - Histogram' for metric in metrics] + 
-                       [f'{metric} - Box Plot' for metric in metrics],
+        subplot_titles=[f'{get_metric_label(metric)} - Histogram' for metric in metrics] + 
+                       [f'{get_metric_label(metric)} - Box Plot' for metric in metrics],
         specs=[[{"secondary_y": False}, {"secondary_y": False}] for _ in metrics]
     )
     
@@ -594,12 +605,13 @@ def create_professional_distribution_analysis(data, metrics):
     st.plotly_chart(fig, use_container_width=True)
 
 
+@profiled
 def create_statistical_tests(data):
     """Crea tests estadísticos"""
     
-    # T-test para winners vs losers
-    winners = data[data['Winner'] == 'Yes']
-    losers = data[data['Winner'] == 'No']
+    # T-test para winners vs losers; los resultados desconocidos no entran en ningún grupo
+    winners = data[data['Winner'].fillna(False)]
+    losers = data[~data['Winner'].fillna(True)]
     
     if len(winners) > 0 and len(losers) > 0:
         st.markdown("**T-Test: Winners vs Losers**")
@@ -614,10 +626,11 @@ def create_statistical_tests(data):
             st.write(f"• **{metric}**: t-statistic = {t_stat:.3f}, p-value = {p_value:.3f} ({significance})")
 
 
+@profiled
 def create_outlier_analysis(data):
     """Análisis de outliers"""
     
-    numeric_cols = data.select_dtypes(include=[np.number]).columns.tolist()[:5]
+    numeric_cols = get_metric_columns(data)[:5]
     
     outlier_data = []
     
@@ -632,7 +645,7 @@ def create_outlier_analysis(data):
         outliers = data[(data[col] < lower_bound) | (data[col] > upper_bound)]
         
         outlier_data.append({
-            'Metric': col,
+            'Metric': get_metric_label(col),
             'Outliers': len(outliers),
             'Percentage': len(outliers) / len(data) * 100,
             'Lower Bound': lower_bound,
@@ -643,6 +656,7 @@ def create_outlier_analysis(data):
     st.dataframe(outlier_df.round(2), use_container_width=True)
 
 
+@profiled
 def create_pca_analysis(data, numeric_columns):
     """Análisis de componentes principales"""
       # Filtrar columnas que sean realmente numéricas (excluyendo timedelta, datetime, object)
@@ -669,8 +683,8 @@ def create_pca_analysis(data, numeric_columns):
         return
     
     try:
-        # Preparar datos - solo columnas realmente numéricas
-        pca_data = data[pca_cols].copy()
+        # Preparar datos - solo columnas realmente numéricas (copy-on-write: data no se modifica)
+        pca_data = data[pca_cols]
         
         # Convertir a numérico, forzando errores a NaN
         for col in pca_cols:
@@ -731,7 +745,7 @@ def create_pca_analysis(data, numeric_columns):
         components_df = pd.DataFrame(
             pca.components_[:2].T,
             columns=['PC1', 'PC2'],
-            index=pca_cols
+            index=[get_metric_label(col) for col in pca_cols]
         ).round(3)
         
         st.dataframe(components_df, use_container_width=True)
@@ -743,6 +757,7 @@ def create_pca_analysis(data, numeric_columns):
         st.write(f"Columnas seleccionadas para PCA: {pca_cols}")
 
 
+@profiled
 def create_performance_segmentation(data):
     """Segmentación de performance"""
     
@@ -754,13 +769,12 @@ def create_performance_segmentation(data):
     damage_q75 = data['HeroDmg'].quantile(0.75)
     damage_q25 = data['HeroDmg'].quantile(0.25)
     
-    data_copy = data.copy()
-    data_copy['Performance_Segment'] = 'Medium'
-    data_copy.loc[data_copy['HeroDmg'] >= damage_q75, 'Performance_Segment'] = 'High'
-    data_copy.loc[data_copy['HeroDmg'] <= damage_q25, 'Performance_Segment'] = 'Low'
+    segments = pd.Series('Medium', index=data.index, name='Performance_Segment')
+    segments[data['HeroDmg'] >= damage_q75] = 'High'
+    segments[data['HeroDmg'] <= damage_q25] = 'Low'
     
     # Distribución de segmentos
-    segment_counts = data_copy['Performance_Segment'].value_counts()
+    segment_counts = segments.value_counts()
     
     fig = px.pie(
         values=segment_counts.values,
@@ -771,10 +785,11 @@ def create_performance_segmentation(data):
     st.plotly_chart(fig, use_container_width=True)
 
 
+@profiled
 def create_hero_meta_analysis(data):
     """Análisis profundo del meta de héroes"""
     
-    hero_stats = data.groupby('Hero').agg({
+    hero_stats = data.groupby('Hero', observed=True).agg({
         'HeroDmg': ['mean', 'std'],
         'Takedowns': 'mean',
         'Deaths': 'mean',
@@ -818,7 +833,7 @@ def create_player_development_tracking(data):
     player_progression = []
     
     for player in data['Player'].unique():
-        player_data = data[data['Player'] == player].copy()
+        player_data = data[data['Player'] == player]
         if len(player_data) >= 3:  # Mínimo 3 partidas
             player_data = player_data.sort_index()  # Asumir orden cronológico
             
@@ -853,7 +868,7 @@ def create_player_development_tracking(data):
 def create_game_mode_analysis(data):
     """Análisis por modo de juego"""
     
-    mode_stats = data.groupby('GameMode').agg({
+    mode_stats = data.groupby('GameMode', observed=True).agg({
         'HeroDmg': 'mean',
         'GameTime': 'count'  # Como proxy para número de partidas
     }).round(0)
@@ -871,6 +886,7 @@ def create_game_mode_analysis(data):
     st.plotly_chart(fig, use_container_width=True)
 
 
+@profiled
 def create_performance_prediction_model(data):
     """Modelo simple de predicción de performance"""
     
@@ -893,6 +909,7 @@ def create_performance_prediction_model(data):
             st.metric("Predicted Next Period", f"{predicted_damage:,.0f}", f"{(predicted_damage-avg_damage):+,.0f}")
 
 
+@profiled
 def create_meta_trend_prediction(data):
     """Predicción de tendencias del meta"""
     
@@ -908,6 +925,7 @@ def create_meta_trend_prediction(data):
         st.write(f"• {trend} {hero}: {percentage:.1f}% pick rate")
 
 
+@profiled
 def create_risk_analysis(data):
     """Análisis de riesgo"""
     
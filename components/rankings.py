@@ -1,18 +1,16 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from utils.features import SHARE_METRICS
+from utils.ranking_engine import get_ranking_table
 from .explanations import create_explanation_section
 
 
 def create_rankings(filtered_data):
     st.markdown("### 🏆 Rankings Top 5 y Bottom 5")
 
-    # Crear una copia y convertir columnas de tiempo
-    df = filtered_data.copy()
-    time_columns = ["SpentDead", "GameTime"]
-    for col in time_columns:
-        if col in df.columns:
-            df[col] = pd.to_timedelta(df[col])
+    # Las métricas de ranking son numéricas: no hace falta copiar ni convertir columnas de tiempo
+    df = filtered_data
 
     # Métricas curadas y relevantes para rankings
     key_metrics = {
@@ -28,7 +26,9 @@ def create_rankings(filtered_data):
         "SelfHealing": "Auto-curación",
         "HeroLevel": "Nivel de Héroe",
         "MercCampCaptures": "Capturas de Mercenarios",
-        "TownKills": "Asesinatos en Ciudad"
+        "TownKills": "Asesinatos en Ciudad",
+        # Cuotas respecto al equipo, precalculadas por el cargador
+        **SHARE_METRICS
     }
     
     # Filtrar métricas que realmente existen en el dataset
@@ -55,33 +55,20 @@ def create_rankings(filtered_data):
     player_col = "PlayerName" if "PlayerName" in df.columns else "Player"
     hero_col = "HeroName" if "HeroName" in df.columns else "Hero"
     
-    # Agrupar por jugador y calcular estadísticas con información del héroe
-    if aggregation == "Promedio":
-        stats = df.groupby(player_col)[selected_metric].mean().sort_values(ascending=False)
-        # Para obtener el héroe más usado por cada jugador en esta métrica
-        hero_info = df.groupby([player_col, hero_col])[selected_metric].mean().reset_index()
-        hero_info = hero_info.loc[hero_info.groupby(player_col)[selected_metric].idxmax()]
-    elif aggregation == "Total":
-        stats = df.groupby(player_col)[selected_metric].sum().sort_values(ascending=False)
-        # Para obtener el héroe con mayor contribución total por jugador
-        hero_info = df.groupby([player_col, hero_col])[selected_metric].sum().reset_index()
-        hero_info = hero_info.loc[hero_info.groupby(player_col)[selected_metric].idxmax()]
-    else:  # Máximo
-        stats = df.groupby(player_col)[selected_metric].max().sort_values(ascending=False)
-        # Para obtener el héroe con el valor máximo por jugador
-        hero_info = df.loc[df.groupby(player_col)[selected_metric].idxmax()][[player_col, hero_col, selected_metric]]    # Crear dos columnas para Top 5 y Bottom 5
+    # Tabla de rankings de todas las métricas y agregaciones, con el mejor héroe de cada jugador
+    # Promedio: héroe con mejor promedio; Total: mayor contribución; Máximo: partida con el valor máximo
+    # Se calcula una vez por combinación de filtros: cambiar de métrica o agregación es una consulta
+    ranking = get_ranking_table(df, player_col, list(available_metrics), hero_col)
+    stats = ranking.stats(selected_metric, aggregation)
+    
+    # Crear dos columnas para Top 5 y Bottom 5
     col1, col2 = st.columns(2)
 
     with col1:
         st.markdown(f"#### 🥇 Top 5 - {selected_metric}")
-        top_5 = stats.head(5).reset_index()
+        top_5_with_hero = ranking.top(selected_metric, aggregation)
         
-        if len(top_5) > 0:
-            # Agregar información del héroe
-            top_5_with_hero = top_5.copy()
-            hero_dict = dict(zip(hero_info[player_col], hero_info[hero_col]))
-            top_5_with_hero['Héroe'] = top_5_with_hero[player_col].map(hero_dict)
-            
+        if len(top_5_with_hero) > 0:
             # Crear gráfico de barras para Top 5
             fig_top = px.bar(
                 top_5_with_hero,
@@ -98,20 +85,15 @@ def create_rankings(filtered_data):
         # Mostrar tabla con héroe
         display_cols = [player_col, 'Héroe', selected_metric]
         st.dataframe(
-            top_5_with_hero[display_cols].style.highlight_max(axis=0), 
+            top_5_with_hero[display_cols].style.highlight_max(axis=0, subset=[selected_metric]), 
             use_container_width=True
         )
 
     with col2:
         st.markdown(f"#### 📉 Bottom 5 - {selected_metric}")
-        bottom_5 = stats.tail(5).reset_index()
+        bottom_5_with_hero = ranking.bottom(selected_metric, aggregation)
         
-        if len(bottom_5) > 0:
-            # Agregar información del héroe
-            bottom_5_with_hero = bottom_5.copy()
-            hero_dict = dict(zip(hero_info[player_col], hero_info[hero_col]))
-            bottom_5_with_hero['Héroe'] = bottom_5_with_hero[player_col].map(hero_dict)
-            
+        if len(bottom_5_with_hero) > 0:
             # Crear gráfico de barras para Bottom 5
             fig_bottom = px.bar(
                 bottom_5_with_hero,
@@ -129,7 +111,7 @@ def create_rankings(filtered_data):
             # Mostrar tabla con héroe
             display_cols = [player_col, 'Héroe', selected_metric]
             st.dataframe(
-                bottom_5_with_hero[display_cols].style.highlight_min(axis=0), 
+                bottom_5_with_hero[display_cols].style.highlight_min(axis=0, subset=[selected_metric]), 
                 use_container_width=True
             )
 
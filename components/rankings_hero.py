@@ -1,19 +1,17 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from utils.features import SHARE_METRICS
 from utils.data_loader import load_data
+from utils.ranking_engine import get_ranking_table
 from .explanations import create_explanation_section
 
 
 def create_hero_rankings(filtered_data):
     st.markdown("### 🏆 Rankings de Héroes (Top 5 y Bottom 5)")
     
-    # Crear una copia y convertir columnas de tiempo
-    df = filtered_data.copy()
-    time_columns = ["SpentDead", "GameTime"]
-    for col in time_columns:
-        if col in df.columns:
-            df[col] = pd.to_timedelta(df[col])
+    # Las métricas de ranking son numéricas: no hace falta copiar ni convertir columnas de tiempo
+    df = filtered_data
 
     # Métricas curadas y relevantes para rankings de héroes
     key_metrics = {
@@ -29,7 +27,9 @@ def create_hero_rankings(filtered_data):
         "SelfHealing": "Auto-curación",
         "HeroLevel": "Nivel de Héroe",
         "MercCampCaptures": "Capturas de Mercenarios",
-        "TownKills": "Asesinatos en Ciudad"
+        "TownKills": "Asesinatos en Ciudad",
+        # Cuotas respecto al equipo, precalculadas por el cargador
+        **SHARE_METRICS
     }
     
     # Filtrar métricas que realmente existen en el dataset
@@ -55,21 +55,17 @@ def create_hero_rankings(filtered_data):
         st.warning("No hay datos para mostrar")
         return
 
-    # Agrupar por héroe y calcular estadísticas
+    # Tabla de rankings de todas las métricas y agregaciones, calculada una vez por combinación de filtros
     hero_col = "HeroName" if "HeroName" in df.columns else "Hero"
-    if aggregation == "Promedio":
-        stats = df.groupby(hero_col)[selected_metric].mean().sort_values(ascending=False)
-    elif aggregation == "Total":
-        stats = df.groupby(hero_col)[selected_metric].sum().sort_values(ascending=False)
-    else:  # Máximo
-        stats = df.groupby(hero_col)[selected_metric].max().sort_values(ascending=False)
+    ranking = get_ranking_table(df, hero_col, list(available_metrics))
+    stats = ranking.stats(selected_metric, aggregation)
 
     # Crear dos columnas para Top 5 y Bottom 5
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown(f"#### 🥇 Top 5 Héroes - {available_metrics.get(selected_metric, selected_metric)}")
-        top_5 = stats.head(5).reset_index()
+        top_5 = ranking.top(selected_metric, aggregation)
         
         if len(top_5) > 0:
             # Crear gráfico de barras para Top 5
@@ -86,11 +82,11 @@ def create_hero_rankings(filtered_data):
             st.plotly_chart(fig_top, use_container_width=True)
             
             # Mostrar tabla
-            st.dataframe(top_5.style.highlight_max(axis=0), use_container_width=True)
+            st.dataframe(top_5.style.highlight_max(axis=0, subset=[selected_metric]), use_container_width=True)
 
     with col2:
         st.markdown(f"#### 📉 Bottom 5 Héroes - {available_metrics.get(selected_metric, selected_metric)}")
-        bottom_5 = stats.tail(5).reset_index()
+        bottom_5 = ranking.bottom(selected_metric, aggregation)
         
         if len(bottom_5) > 0:
             # Crear gráfico de barras para Bottom 5
@@ -107,7 +103,7 @@ def create_hero_rankings(filtered_data):
             st.plotly_chart(fig_bottom, use_container_width=True)
             
             # Mostrar tabla
-            st.dataframe(bottom_5.style.highlight_min(axis=0), use_container_width=True)
+            st.dataframe(bottom_5.style.highlight_min(axis=0, subset=[selected_metric]), use_container_width=True)
 
     # Mostrar estadísticas generales
     st.markdown("### 📊 Estadísticas Generales")
@@ -0,0 +1,88 @@
+"""
+Registro de pestañas del dashboard
+Cada pestaña declara el módulo y las funciones que la dibujan; el módulo (y sus
+dependencias pesadas, como scipy o sklearn) solo se importa la primera vez que se
+abre la pestaña. Los tiempos de importación se guardan para medir el arranque en frío
+"""
+
+import importlib
+import sys
+import threading
+import time
+
+import streamlit as st
+
+from utils.profiling import profile_section
+
+# Pestaña -> (módulo, función que la dibuja, función de explicación o None)
+TABS = {
+    "📊 Análisis General": ("components.hero_analysis", "create_hero_analysis", None),
+    "🏆 Rankings de Players": ("components.rankings", "create_rankings", None),
+    "🦸‍♂️ Rankings de Héroes": ("components.rankings_hero", "create_hero_rankings", None),
+    "📈 Tendencias": ("components.time_analysis", "create_time_analysis", None),
+    "🚀 Analytics Profesional": (
+        "components.professional_analytics", "create_professional_analytics_dashboard",
+        "add_professional_analytics_explanation"
+    ),
+    "🔍 Exploración de Datos": (
+        "components.data_exploration", "create_data_exploration", "add_data_exploration_explanation"
+    ),
+    "📋 Análisis de Composiciones": (
+        "components.composition_analysis", "create_composition_analysis", "add_composition_analysis_explanation"
+    ),
+    "🛡️ Composiciones de Equipo": (
+        "components.team_composition_analysis", "create_team_composition_analysis", None
+    ),
+    "🎯 Métricas Avanzadas": (
+        "components.advanced_analytics", "create_advanced_metrics_dashboard", "add_advanced_analytics_explanation"
+    ),
+}
+
+# Segundos que tardó la primera importación de cada módulo en este proceso del servidor
+_import_timings = {}
+_timings_lock = threading.Lock()
+
+
+def get_tab_options():
+    """Nombres de las pestañas, en el orden del menú"""
+    return list(TABS.keys())
+
+
+def import_tab_module(module_name):
+    """Importa el módulo de una pestaña; retorna el módulo y los segundos de importación (0 si ya estaba cargado)"""
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module, 0.0
+
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    elapsed = time.perf_counter() - start
+    with _timings_lock:
+        _import_timings.setdefault(module_name, elapsed)
+    return module, elapsed
+
+
+def render_tab(tab_name, filtered_data):
+    """Dibuja una pestaña importando su módulo bajo demanda"""
+    module_name, render_name, explanation_name = TABS[tab_name]
+    module, elapsed = import_tab_module(module_name)
+
+    if elapsed > 0:
+        # Primera apertura de la pestaña en este proceso: coste de arranque en frío
+        if 'footer_messages' not in st.session_state:
+            st.session_state.footer_messages = []
+        st.session_state.footer_messages.append(
+            f"⏱️ Pestaña {tab_name}: módulo {module_name} importado en {elapsed * 1000:.0f} ms"
+        )
+
+    # Con el perfilado activo, la pestaña es la sección raíz de sus subpestañas
+    with profile_section(tab_name, len(filtered_data)):
+        getattr(module, render_name)(filtered_data)
+        if explanation_name is not None:
+            getattr(module, explanation_name)()
+
+
+def get_import_timings():
+    """Tiempos de la primera importación de cada módulo de pestaña, en segundos"""
+    with _timings_lock:
+        return dict(_import_timings)
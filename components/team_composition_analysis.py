@@ -13,6 +13,13 @@ from utils.hero_roles import (
     get_hero_roles, get_all_roles, get_heroes_by_role, 
     classify_composition, get_composition_type, get_hero_role
 )
+from utils.composition_engine import count_signatures, signature_stats
+from utils.composition_index import get_composition_index
+from utils.data_loader import get_hero_role_column
+from utils.draft_simulator import get_draft_model, simulate_draft
+from utils.features import get_feature_column
+from utils.profiling import profiled
+from utils.team_rosters import get_team_rosters
 
 def create_team_composition_analysis(data):
     """Crea la sección de análisis de composiciones de equipo"""
@@ -39,15 +46,15 @@ def create_team_composition_analysis(data):
     with tab4:
         meta_trends(data)
 
+@profiled
 def explore_compositions(data):
     """Explora composiciones existentes en el dataset"""
     
     st.subheader("🔍 Explorar Composiciones Existentes")
     
-    # Preparar datos con roles
+    # Preparar datos con roles (copia diferida: no se duplican las columnas de data)
     hero_roles = get_hero_roles()
-    data_with_roles = data.copy()
-    data_with_roles['Role'] = data_with_roles['Hero'].map(hero_roles)
+    data_with_roles = data.assign(Role=get_hero_role_column(data))
     
     # Filtros
     col1, col2, col3 = st.columns(3)
@@ -65,9 +72,18 @@ def explore_compositions(data):
             default=[]
         )
     
-    # Analizar composiciones por partida
-    if 'MatchID' in data.columns:
-        match_compositions = analyze_match_compositions(data_with_roles)
+    hero_filter = st.multiselect(
+        "Equipos que incluyen a",
+        options=sorted(hero_roles.keys()),
+        default=[]
+    )
+    
+    # Analizar composiciones por partida (equipos reconstruidos en la tabla de partidas)
+    rosters = get_team_rosters(data)
+    if rosters.n_teams > 0:
+        # Filtros de rol y de héroes sobre máscaras de bits, sin recorrer equipos en Python
+        team_mask = rosters.with_any_role(role_filter) & rosters.containing(hero_filter)
+        match_compositions = analyze_match_compositions(rosters, team_mask)
         
         # Filtrar por criterios
         filtered_comps = match_compositions[
@@ -75,13 +91,6 @@ def explore_compositions(data):
             (match_compositions['Winrate'] >= min_winrate/100)
         ]
         
-        if role_filter:
-            filtered_comps = filtered_comps[
-                filtered_comps['Composition'].apply(
-                    lambda x: any(role in x for role in role_filter)
-                )
-            ]
-        
         # Mostrar resultados
         if not filtered_comps.empty:
             col1, col2 = st.columns([2, 1])
@@ -104,21 +113,20 @@ def explore_compositions(data):
         else:
             st.warning("No se encontraron composiciones que cumplan los criterios.")
     else:
-        st.info("Para análisis de composiciones completas se necesita información de MatchID.")
+        st.info("Para análisis de composiciones completas se necesitan partidas con equipos de 5 jugadores.")
         show_role_distribution(data_with_roles)
 
+@profiled
 def role_statistics(data):
     """Muestra estadísticas detalladas por roles"""
     
     st.subheader("📊 Estadísticas por Roles")
     
     # Preparar datos
-    hero_roles = get_hero_roles()
-    data_with_roles = data.copy()
-    data_with_roles['Role'] = data_with_roles['Hero'].map(hero_roles)
+    data_with_roles = data.assign(Role=get_hero_role_column(data))
     
     # Calcular estadísticas por rol
-    role_stats = data_with_roles.groupby('Role').agg({
+    role_stats = data_with_roles.groupby('Role', observed=True).agg({
         'Kills': ['mean', 'std'],
         'Deaths': ['mean', 'std'],
         'Assists': ['mean', 'std'],
@@ -165,7 +173,7 @@ def role_statistics(data):
     display_stats = role_stats[[
         'Role', 'Games', 'Kills_mean', 'Deaths_mean', 'Assists_mean',
         'HeroDamage_mean', 'Healing_mean', 'DamageTaken_mean'
-    ]].copy()
+    ]]
     
     display_stats.columns = [
         'Rol', 'Partidas', 'Kills (Prom)', 'Deaths (Prom)', 'Assists (Prom)',
@@ -177,7 +185,8 @@ def role_statistics(data):
     # Análisis de KDA por rol
     st.subheader("⚔️ Análisis KDA por Rol")
     
-    data_with_roles['KDA'] = (data_with_roles['Kills'] + data_with_roles['Assists']) / np.maximum(data_with_roles['Deaths'], 1)
+    # KDA por partida precalculado por el cargador
+    data_with_roles = data_with_roles.assign(KDA=get_feature_column(data_with_roles, 'KDA'))
     
     fig = px.box(
         data_with_roles,
@@ -188,6 +197,7 @@ def role_statistics(data):
     fig.update_xaxes(tickangle=45)
     st.plotly_chart(fig, use_container_width=True)
 
+@profiled
 def custom_composition_analysis(data):
     """Permite al usuario crear y analizar composiciones personalizadas"""
     
@@ -233,12 +243,71 @@ def custom_composition_analysis(data):
                 role = get_hero_role(hero)
                 st.write(f"• {hero} - {role}")
     
+    # Equipos observados que contienen la selección, actualizados con cada héroe elegido
+    if selected_heroes:
+        show_observed_compositions(data, selected_heroes)
+    
+    # Recomendación del siguiente pick mientras la composición no esté completa
+    if len(selected_heroes) < 5:
+        show_draft_suggestions(data, selected_heroes, available_heroes)
+    
     # Analizar composición si está completa
     if len(selected_heroes) == 5:
         analyze_custom_composition(data, selected_heroes)
     elif len(selected_heroes) > 0:
         st.info(f"Selecciona {5 - len(selected_heroes)} héroes más para completar la composición.")
 
+@profiled
+def show_observed_compositions(data, heroes):
+    """Muestra las composiciones jugadas que contienen los héroes seleccionados"""
+    
+    index = get_composition_index(data)
+    summary = index.summary(heroes)
+    exact = index.exact(heroes)
+    
+    st.write("**Equipos observados con esta selección:**")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Composiciones Distintas", summary['compositions'])
+    with col2:
+        st.metric("Partidas", summary['games'])
+    with col3:
+        st.metric("Winrate", f"{summary['winrate']:.1%}" if summary['games'] else "N/A")
+    
+    if exact is not None:
+        st.success(f"✅ Esta composición exacta se jugó {exact['games']} veces con {exact['winrate']:.1%} de winrate.")
+    elif len(set(heroes)) == 5:
+        st.info("ℹ️ Esta composición exacta no aparece en las partidas filtradas.")
+    
+    if summary['games']:
+        st.dataframe(index.query(heroes).head(20).round(3), use_container_width=True)
+
+@profiled
+def show_draft_suggestions(data, allies, available_heroes):
+    """Muestra los siguientes picks recomendados por el simulador de draft"""
+    
+    st.write("---")
+    st.subheader("🎲 Simulador de Draft")
+    
+    enemies = st.multiselect(
+        "Picks del equipo rival",
+        options=[hero for hero in available_heroes if hero not in allies],
+        max_selections=5,
+        key="draft_enemies"
+    )
+    
+    model = get_draft_model(data)
+    suggestions = simulate_draft(model, allies, enemies)
+    if suggestions.empty:
+        st.info("No hay datos suficientes para simular el draft.")
+        return
+    
+    st.caption(
+        "Probabilidad de victoria estimada para cada siguiente pick, completando por Monte Carlo "
+        "los huecos restantes según la tasa de pick de cada héroe."
+    )
+    st.dataframe(suggestions.head(15).round(3), use_container_width=True)
+
 def analyze_custom_composition(data, heroes):
     """Analiza una composición personalizada"""
     
@@ -257,8 +326,7 @@ def analyze_custom_composition(data, heroes):
     with col2:
         # Calcular estadísticas promedio
         hero_data = data[data['Hero'].isin(heroes)]
-        avg_kda = (hero_data['Kills'] + hero_data['Assists']) / np.maximum(hero_data['Deaths'], 1)
-        st.metric("KDA Promedio", f"{avg_kda.mean():.2f}")
+        st.metric("KDA Promedio", f"{get_feature_column(hero_data, 'KDA').mean():.2f}")
     
     with col3:
         total_games = len(hero_data)
@@ -284,11 +352,11 @@ def analyze_custom_composition(data, heroes):
                 'Héroe': hero,
                 'Rol': get_hero_role(hero),
                 'Partidas': len(hero_data),
-                'Kills (Prom)': hero_data['Kills'].mean(),
+                'Kills (Prom)': hero_data['HeroKills'].mean(),
                 'Deaths (Prom)': hero_data['Deaths'].mean(),
                 'Assists (Prom)': hero_data['Assists'].mean(),
-                'KDA (Prom)': ((hero_data['Kills'] + hero_data['Assists']) / np.maximum(hero_data['Deaths'], 1)).mean(),
-                'Daño a Héroes': hero_data['HeroDamage'].mean(),
+                'KDA (Prom)': get_feature_column(hero_data, 'KDA').mean(),
+                'Daño a Héroes': hero_data['HeroDmg'].mean(),
                 'Curación': hero_data['Healing'].mean()
             }
             hero_stats.append(stats)
@@ -300,24 +368,23 @@ def analyze_custom_composition(data, heroes):
     # Recomendaciones
     provide_composition_recommendations(composition, comp_type)
 
+@profiled
 def meta_trends(data):
     """Muestra tendencias del meta basadas en el tiempo"""
     
     st.subheader("📈 Tendencias del Meta")
     
     # Preparar datos con roles
-    hero_roles = get_hero_roles()
-    data_with_roles = data.copy()
-    data_with_roles['Role'] = data_with_roles['Hero'].map(hero_roles)
+    data_with_roles = data.assign(Role=get_hero_role_column(data))
     
     # Análisis temporal si hay datos de fecha
     if 'MatchDateTime' in data.columns:
         try:
-            data_with_roles['Date'] = pd.to_datetime(data_with_roles['MatchDateTime'])
-            data_with_roles['Month'] = data_with_roles['Date'].dt.to_period('M')
+            dates = pd.to_datetime(data_with_roles['MatchDateTime'])
+            data_with_roles = data_with_roles.assign(Date=dates, Month=dates.dt.to_period('M'))
             
             # Popularidad de roles por mes
-            role_popularity = data_with_roles.groupby(['Month', 'Role']).size().reset_index(name='Count')
+            role_popularity = data_with_roles.groupby(['Month', 'Role'], observed=True).size().reset_index(name='Count')
             role_popularity['Month_str'] = role_popularity['Month'].astype(str)
             
             fig = px.line(
@@ -355,11 +422,13 @@ def meta_trends(data):
         fig.update_layout(yaxis={'categoryorder': 'total ascending'})
         st.plotly_chart(fig, use_container_width=True)
 
-def analyze_match_compositions(data):
-    """Analiza composiciones por partida (si hay datos de MatchID)"""
-    # Esta función requeriría datos de MatchID para agrupar por equipos
-    # Por ahora retorna un DataFrame vacío como placeholder
-    return pd.DataFrame()
+def analyze_match_compositions(rosters, team_mask=None):
+    """Analiza las composiciones de rol de los equipos completos (opcionalmente solo los de team_mask)"""
+    role_counts, won = rosters.role_counts, rosters.won
+    if team_mask is not None:
+        role_counts, won = role_counts[team_mask], won[team_mask]
+    stats = signature_stats(count_signatures(role_counts), won, rosters.role_names)
+    return stats.drop(columns='Signature')
 
 def show_role_distribution(data):
     """Muestra distribución básica de roles"""
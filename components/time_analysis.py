@@ -10,21 +10,22 @@ def create_time_analysis(filtered_data):
         st.markdown("### 📅 Análisis Temporal")
 
         # 🔹 Convertir la columna Date a formato datetime especificando el formato correcto
-        filtered_data["Date"] = pd.to_datetime(filtered_data["Date"], format="%d/%m/%Y")
+        # (como series derivadas: el DataFrame filtrado se comparte entre reruns)
+        dates = pd.to_datetime(filtered_data["Date"], format="%d/%m/%Y")
 
         # 🔹 Extraer el mes en formato YYYY-MM para una mejor agrupación
-        filtered_data["Month"] = filtered_data["Date"].dt.to_period("M").astype(str)
+        months = dates.dt.to_period("M").astype(str).rename("Month")
 
         col1, col2 = st.columns(2)
 
         with col1:
             daily_stats = (
-                filtered_data.groupby("Date")
+                filtered_data.groupby(dates)
                 .agg(
                     {
                         "HeroDmg": "mean",
                         "Assists": "mean",
-                        "Winner": lambda x: (x == "Winner").mean() * 100,
+                        "Winner": lambda x: x.mean() * 100,
                     }
                 )
                 .round(2)
@@ -70,7 +71,7 @@ def create_time_analysis(filtered_data):
                 st.plotly_chart(fig, use_container_width=True)
 
         # 🔹 Nuevo gráfico: Partidas jugadas por mes
-        monthly_games = filtered_data.groupby("Month").size().reset_index()
+        monthly_games = filtered_data.groupby(months).size().reset_index()
         monthly_games.columns = ["Month", "Games Played"]
 
         fig = px.line(
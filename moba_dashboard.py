@@ -1,24 +1,30 @@
+import time
+
+# Inicio de las importaciones del script, para medir el arranque en frío de cada sesión
+_imports_start = time.perf_counter()
+
 import streamlit as st
-from utils.data_loader import load_data, get_available_datasets
+from utils.append_store import get_store_version
+from utils.data_loader import (
+    get_available_datasets, get_dataset_summary, load_dataset, load_match_table, load_rollup_cube
+)
 from components.header import create_header
-from components.filters import create_filters, apply_filters
+from components.filters import create_filters, apply_filters, get_filter_engine
 from components.metrics import create_metrics
-from components.hero_analysis import create_hero_analysis
-from components.rankings import create_rankings
-from components.rankings_hero import create_hero_rankings
-from components.time_analysis import create_time_analysis
-from components.professional_analytics import create_professional_analytics_dashboard
-from components.data_exploration import create_data_exploration
-from components.composition_analysis import create_composition_analysis
-from components.advanced_analytics import (
-    create_advanced_metrics_dashboard,
-    create_exploration_dashboard,
-    create_advanced_composition_analysis as create_comp_analysis_alt
-)
-from components.team_composition_analysis import create_team_composition_analysis
 from components.explanations import create_general_explanation
+# Los componentes de cada pestaña se importan al abrirla (ver tab_registry)
+from components.tab_registry import get_tab_options, render_tab
+from utils.profiling import (
+    profile_section, render_profiling_panel, render_profiling_toggle, start_profiling_run
+)
+from utils.pandas_options import enable_copy_on_write
 from datetime import datetime
 
+# El dataset y los subconjuntos cacheados se comparten entre sesiones como copias superficiales
+enable_copy_on_write()
+
+IMPORT_SECONDS = time.perf_counter() - _imports_start
+
 
 def main():
     # Configuración inicial
@@ -32,9 +38,20 @@ def main():
     # Limpiar mensajes de footer previos
     if 'footer_messages' in st.session_state:
         st.session_state.footer_messages = []
+    start_profiling_run()
+    
+    # Coste de importación del script en la primera ejecución de cada sesión
+    if 'startup_reported' not in st.session_state:
+        st.session_state.startup_reported = True
+        if 'footer_messages' not in st.session_state:
+            st.session_state.footer_messages = []
+        st.session_state.footer_messages.append(
+            f"⏱️ Importaciones del dashboard: {IMPORT_SECONDS * 1000:.0f} ms"
+        )
 
     # Selector de dataset en la barra lateral
     st.sidebar.title("⚙️ Configuración")
+    render_profiling_toggle()
     
     # Obtener datasets disponibles
     available_datasets = get_available_datasets()
@@ -64,25 +81,35 @@ def main():
     create_header(dashboard_title)
 
     # Carga de datos
-    with st.spinner("Cargando datos..."):
-        original_data = load_data(selected_file)
+    with st.spinner("Cargando datos..."), profile_section("Carga de datos"):
+        # Las partidas ingeridas después de generar el CSV cambian la versión del dataset
+        store_version = get_store_version(selected_file)
+        # El handle se cachea por versión: los reruns no copian ni hashean el DataFrame
+        dataset = load_dataset(selected_file, store_version)
+        original_data = dataset.frame
+        match_table = load_match_table(dataset)
     
     # Mostrar información básica del dataset
     col1, col2, col3 = st.columns(3)
     with col1:
-        # Calcular partidas únicas basado en la columna File/FileName
-        file_col = 'File' if 'File' in original_data.columns else 'FileName'
-        if file_col in original_data.columns:
-            unique_games = original_data[file_col].nunique()
+        # Partidas únicas según la tabla de partidas (una por File/FileName)
+        if match_table.n_matches > 0:
+            unique_games = match_table.n_matches
         else:
             unique_games = len(original_data)
         st.metric("📊 Total de Partidas", unique_games)
+    dataset_summary = get_dataset_summary(dataset)
     with col2:
-        st.metric("👥 Jugadores Únicos", original_data['Player'].nunique())
+        st.metric("👥 Jugadores Únicos", dataset_summary['players'])
     with col3:
-        st.metric("🦸‍♂️ Héroes Únicos", original_data['Hero'].nunique())    # Creación y aplicación de filtros
+        st.metric("🦸‍♂️ Héroes Únicos", dataset_summary['heroes'])    # Creación y aplicación de filtros
     filters = create_filters(original_data)
-    filtered_data = apply_filters(original_data, filters)
+    with profile_section("Filtros", len(original_data)):
+        filtered_data = apply_filters(
+            original_data, filters, get_filter_engine(dataset),
+            dataset_id=dataset.version, cube=load_rollup_cube(dataset),
+            matches=match_table
+        )
 
     # Agregar explicación general del dashboard
     st.sidebar.markdown("---")
@@ -90,49 +117,14 @@ def main():
 
     # Visualizaciones
     create_metrics(filtered_data, original_data)    # Manejo de pestañas usando un selectbox en la barra lateral
-    tab_options = [
-        "📊 Análisis General",
-        "🏆 Rankings de Players", 
-        "🦸‍♂️ Rankings de Héroes",
-        "📈 Tendencias",
-        "🚀 Analytics Profesional",
-        "🔍 Exploración de Datos",
-        "📋 Análisis de Composiciones",
-        "🛡️ Composiciones de Equipo",
-        "🎯 Métricas Avanzadas"    ]
+    tab_options = get_tab_options()
     selected_tab = st.sidebar.radio("Selecciona una sección:", tab_options)
 
-    # Mostrar el contenido según la pestaña activa
-    if selected_tab == "📊 Análisis General":
-        create_hero_analysis(filtered_data)
-        # Explicación ya incluida en hero_analysis.py
-    elif selected_tab == "🏆 Rankings de Players":
-        create_rankings(filtered_data)
-        # Explicación ya incluida en rankings.py
-    elif selected_tab == "🦸‍♂️ Rankings de Héroes":
-        create_hero_rankings(filtered_data)
-        # Explicación ya incluida en rankings_hero.py
-    elif selected_tab == "📈 Tendencias":
-        create_time_analysis(filtered_data)
-        # Explicación ya incluida en time_analysis.py
-    elif selected_tab == "🚀 Analytics Profesional":
-        create_professional_analytics_dashboard(filtered_data)
-        from components.professional_analytics import add_professional_analytics_explanation
-        add_professional_analytics_explanation()
-    elif selected_tab == "🔍 Exploración de Datos":
-        create_data_exploration(filtered_data)
-        from components.data_exploration import add_data_exploration_explanation
-        add_data_exploration_explanation()
-    elif selected_tab == "📋 Análisis de Composiciones":
-        create_composition_analysis(filtered_data)
-        from components.composition_analysis import add_composition_analysis_explanation
-        add_composition_analysis_explanation()
-    elif selected_tab == "🛡️ Composiciones de Equipo":
-        create_team_composition_analysis(filtered_data)
-    elif selected_tab == "🎯 Métricas Avanzadas":
-        create_advanced_metrics_dashboard(filtered_data)
-        from components.advanced_analytics import add_advanced_analytics_explanation
-        add_advanced_analytics_explanation()    # Footer simple
+    # Mostrar el contenido según la pestaña activa; su módulo se importa la primera vez
+    render_tab(selected_tab, filtered_data)
+    render_profiling_panel()
+
+    # Footer simple
     st.markdown("---")
     st.markdown(
         f"**Heroes of the Storm Analytics** | "
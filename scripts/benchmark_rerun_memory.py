@@ -0,0 +1,175 @@
+"""
+Benchmark de memoria por rerun del dashboard
+Simula sin servidor (Streamlit en modo "bare") los reruns de una sesión con el dataset
+ya cargado: load_dataset, create_filters, apply_filters y el render de cada pestaña, y
+mide con tracemalloc el pico de memoria que asigna cada etapa. Con --baseline compara
+contra un informe anterior (por ejemplo, el de otra versión del código).
+
+Uso:
+    python scripts/benchmark_rerun_memory.py --dataset structured_data.csv
+    python scripts/benchmark_rerun_memory.py --output memoria.json --reruns 3
+    python scripts/benchmark_rerun_memory.py --baseline memoria_anterior.json --skip-tabs
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+# Permite ejecutar el script desde la raíz del proyecto sin instalarlo
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from scripts.benchmark_startup import detect_format  # noqa: E402
+
+
+def measure(function, *args, **kwargs):
+    """Ejecuta una función bajo tracemalloc; retorna (resultado, pico en MB, segundos, error)"""
+    tracemalloc.reset_peak()
+    start_memory = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    try:
+        result = function(*args, **kwargs)
+        error = None
+    except Exception as e:
+        result = None
+        error = f"{type(e).__name__}: {e}"
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] - start_memory
+    return result, max(peak, 0) / 1024 ** 2, seconds, error
+
+
+def run_rerun(file_path, store_version, skip_tabs):
+    """Un rerun con el dataset en caché: carga, filtros y render; retorna las etapas medidas"""
+    from utils.data_loader import load_dataset, load_match_table, load_rollup_cube
+    from components.filters import apply_filters, create_filters, get_filter_engine
+    from components.tab_registry import TABS, render_tab
+
+    stages = []
+
+    def stage(name, function, *args, **kwargs):
+        result, peak_mb, seconds, error = measure(function, *args, **kwargs)
+        stages.append({'stage': name, 'peak_memory_mb': round(peak_mb, 2), 'seconds': round(seconds, 4), 'error': error})
+        return result
+
+    dataset = stage('load_dataset', load_dataset, file_path, store_version)
+    if dataset is None:
+        return stages
+    engine = get_filter_engine(dataset)
+    cube = load_rollup_cube(dataset)
+    matches = load_match_table(dataset)
+
+    filters = stage('create_filters', create_filters, dataset.frame)
+    filtered_data = stage(
+        'apply_filters', apply_filters, dataset.frame, filters or {}, engine,
+        dataset_id=dataset.version, cube=cube, matches=matches
+    )
+    if not skip_tabs and filtered_data is not None:
+        for tab_name in TABS:
+            stage(tab_name, render_tab, tab_name, filtered_data)
+    return stages
+
+
+def benchmark_dataset(file_path, reruns, skip_tabs):
+    """Carga inicial (no medida) y varios reruns medidos; retorna el informe del dataset"""
+    from utils.data_loader import load_dataset
+    from utils.append_store import get_store_version
+
+    store_version = get_store_version(file_path)
+    dataset = load_dataset(file_path, store_version)
+    report = {'file': file_path, 'format': detect_format(file_path), 'rows': len(dataset)}
+
+    # El primer rerun llena las cachés de filtros y subconjuntos; los siguientes son los de una sesión
+    report['reruns'] = [run_rerun(file_path, store_version, skip_tabs) for _ in range(reruns)]
+    stages = report['reruns'][-1]
+    report['stages'] = {entry['stage']: entry['peak_memory_mb'] for entry in stages}
+    report['rerun_peak_mb'] = max((entry['peak_memory_mb'] for entry in stages), default=0.0)
+    report['rerun_allocated_mb'] = round(sum(entry['peak_memory_mb'] for entry in stages), 2)
+    return report
+
+
+def compare_with_baseline(report, baseline):
+    """Diferencia de picos por dataset y etapa respecto a un informe anterior"""
+    previous = {entry['file']: entry for entry in baseline.get('datasets', []) if 'stages' in entry}
+    comparison = []
+    for entry in report['datasets']:
+        before = previous.get(entry['file'])
+        if before is None or 'stages' not in entry:
+            continue
+        stages = {}
+        for name, peak in entry['stages'].items():
+            if name in before['stages']:
+                stages[name] = {'before_mb': before['stages'][name], 'after_mb': peak,
+                                'reduction_mb': round(before['stages'][name] - peak, 2)}
+        before_total = before['rerun_allocated_mb']
+        comparison.append({
+            'file': entry['file'],
+            'stages': stages,
+            'rerun_allocated_before_mb': before_total,
+            'rerun_allocated_after_mb': entry['rerun_allocated_mb'],
+            'reduction_pct': round(100 * (1 - entry['rerun_allocated_mb'] / before_total), 1) if before_total else None
+        })
+    return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide el pico de memoria por rerun del dashboard y emite un informe JSON")
+    parser.add_argument('--output', help="Archivo JSON de salida (por defecto, la salida estándar)")
+    parser.add_argument('--dataset', action='append', help="Dataset a medir (por defecto, todos los disponibles)")
+    parser.add_argument('--reruns', type=int, default=2, help="Reruns medidos por dataset; se informa el último")
+    parser.add_argument('--skip-tabs', action='store_true', help="No renderiza las pestañas")
+    parser.add_argument('--baseline', help="Informe JSON anterior con el que comparar")
+    args = parser.parse_args()
+
+    # Sin servidor Streamlit avisa de cada llamada fuera de contexto; solo interesan los errores
+    import streamlit as st
+    from streamlit import config
+    from streamlit.logger import set_log_level
+    config.set_option('logger.level', 'error')
+    set_log_level('error')
+    import pandas as pd
+    from utils.data_loader import get_available_datasets
+    from utils.pandas_options import enable_copy_on_write
+    enable_copy_on_write()
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'versions': {'streamlit': st.__version__, 'pandas': pd.__version__},
+        'reruns': args.reruns,
+    }
+    files = args.dataset or list(get_available_datasets().values())
+
+    tracemalloc.start()
+    report['datasets'] = []
+    for file_path in files:
+        try:
+            report['datasets'].append(benchmark_dataset(file_path, max(args.reruns, 1), args.skip_tabs))
+        except Exception as e:
+            report['datasets'].append({'file': file_path, 'error': f"{type(e).__name__}: {e}"})
+    tracemalloc.stop()
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            report['comparison'] = compare_with_baseline(report, json.load(baseline_file))
+        for entry in report['comparison']:
+            print(f"📉 {entry['file']}: {entry['rerun_allocated_before_mb']:.1f} MB → "
+                  f"{entry['rerun_allocated_after_mb']:.1f} MB por rerun ({entry['reduction_pct']}% menos)")
+
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            output.write(payload)
+        print(f"✅ Informe guardado en {args.output}")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Benchmark de arranque del dashboard
+Mide sin servidor (Streamlit en modo "bare": los widgets devuelven su valor por defecto
+y no se dibuja nada) lo que cuesta llegar a la primera pantalla: importaciones,
+get_available_datasets, load_data por formato de dataset, create_filters/apply_filters
+y el render de cada pestaña. Emite un informe JSON para comparar versiones.
+
+Uso:
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --output benchmark.json --isolated-imports
+    python scripts/benchmark_startup.py --skip-tabs --dataset structured_data.csv
+"""
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import traceback
+from datetime import datetime
+
+# Permite ejecutar el script desde la raíz del proyecto sin instalarlo
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Dependencias externas y módulos del proyecto, en el orden en que se importan
+THIRD_PARTY_MODULES = [
+    'streamlit', 'pandas', 'numpy', 'pyarrow', 'plotly.express', 'scipy.stats', 'sklearn.decomposition'
+]
+PROJECT_MODULES = [
+    'utils.data_loader', 'components.header', 'components.filters', 'components.metrics',
+    'components.explanations', 'components.tab_registry', 'components.hero_analysis',
+    'components.rankings', 'components.rankings_hero', 'components.time_analysis',
+    'components.professional_analytics', 'components.data_exploration',
+    'components.composition_analysis', 'components.team_composition_analysis',
+    'components.advanced_analytics'
+]
+
+
+def timed(function, *args, **kwargs):
+    """Ejecuta una función y retorna (resultado, segundos, error)"""
+    start = time.perf_counter()
+    try:
+        result = function(*args, **kwargs)
+        error = None
+    except Exception as e:
+        result = None
+        error = f"{type(e).__name__}: {e}"
+    return result, time.perf_counter() - start, error
+
+
+def time_imports_in_process(modules):
+    """Importa los módulos en orden; cada tiempo excluye lo que ya cargaron los anteriores"""
+    timings = []
+    for module_name in modules:
+        already_loaded = module_name in sys.modules
+        _, seconds, error = timed(importlib.import_module, module_name)
+        timings.append({
+            'module': module_name, 'seconds': seconds, 'already_loaded': already_loaded, 'error': error
+        })
+    return timings
+
+
+def time_import_isolated(module_name):
+    """Importa un módulo en un intérprete nuevo: coste en frío con todas sus dependencias"""
+    code = (
+        "import time, importlib; start = time.perf_counter(); "
+        f"importlib.import_module({module_name!r}); print(time.perf_counter() - start)"
+    )
+    process = subprocess.run(
+        [sys.executable, '-c', code], cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    if process.returncode != 0:
+        return {'module': module_name, 'seconds': None, 'error': process.stderr.strip().splitlines()[-1]}
+    return {'module': module_name, 'seconds': float(process.stdout.strip().splitlines()[-1]), 'error': None}
+
+
+def detect_format(file_path):
+    """Formato del dataset según su nombre, con el mismo criterio que data_loader.prepare_rows"""
+    if 'structured_data.csv' in file_path:
+        return 'structured'
+    if '2025_1' in file_path:
+        return '2025'
+    return '2024'
+
+
+def benchmark_dataset(file_path, skip_tabs):
+    """Carga, filtrado y render de pestañas para un dataset"""
+    from utils.data_loader import get_dataset_store, load_data, load_dataset, load_match_table, load_rollup_cube
+    from utils.append_store import get_store_version
+    from components.filters import apply_filters, create_filters, get_filter_engine
+    from components.tab_registry import TABS, render_tab
+
+    report = {'file': file_path, 'format': detect_format(file_path)}
+    store_version = get_store_version(file_path)
+
+    # Primera carga (caché columnar en disco si existe) y segunda carga desde la caché en memoria
+    get_dataset_store.clear()
+    data, report['load_data_cold_seconds'], report['load_data_error'] = timed(load_data, file_path, store_version)
+    if data is None:
+        return report
+    _, report['load_data_warm_seconds'], _ = timed(load_data, file_path, store_version)
+    dataset, report['load_dataset_seconds'], _ = timed(load_dataset, file_path, store_version)
+    _, report['load_dataset_warm_seconds'], _ = timed(load_dataset, file_path, store_version)
+    report['rows'] = len(data)
+
+    engine, report['filter_engine_seconds'], _ = timed(get_filter_engine, dataset)
+    cube, report['rollup_cube_seconds'], _ = timed(load_rollup_cube, dataset)
+    matches, report['match_table_seconds'], _ = timed(load_match_table, dataset)
+    filters, report['create_filters_seconds'], report['create_filters_error'] = timed(create_filters, data)
+    filtered_data, report['apply_filters_seconds'], report['apply_filters_error'] = timed(
+        apply_filters, dataset.frame, filters or {}, engine,
+        dataset_id=dataset.version, cube=cube, matches=matches
+    )
+
+    report['tabs'] = []
+    if not skip_tabs and filtered_data is not None:
+        for tab_name in TABS:
+            _, seconds, error = timed(render_tab, tab_name, filtered_data)
+            report['tabs'].append({'tab': tab_name, 'seconds': seconds, 'error': error})
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide el arranque del dashboard sin servidor y emite un informe JSON")
+    parser.add_argument('--output', help="Archivo JSON de salida (por defecto, la salida estándar)")
+    parser.add_argument('--dataset', action='append', help="Dataset a medir (por defecto, todos los disponibles)")
+    parser.add_argument('--isolated-imports', action='store_true',
+                        help="Mide cada importación en un intérprete nuevo (coste en frío por módulo)")
+    parser.add_argument('--skip-tabs', action='store_true', help="No renderiza las pestañas")
+    args = parser.parse_args()
+
+    total_start = time.perf_counter()
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+    }
+
+    modules = THIRD_PARTY_MODULES + PROJECT_MODULES
+    if args.isolated_imports:
+        report['imports'] = [time_import_isolated(module_name) for module_name in modules]
+    else:
+        report['imports'] = time_imports_in_process(modules)
+
+    from utils.pandas_options import enable_copy_on_write
+    enable_copy_on_write()
+
+    # Sin servidor Streamlit avisa de cada llamada fuera de contexto; solo interesan los errores
+    import streamlit as st
+    from streamlit import config
+    from streamlit.logger import set_log_level
+    # La opción se aplica al leer la configuración; set_log_level, a los loggers ya creados
+    config.set_option('logger.level', 'error')
+    set_log_level('error')
+    import pandas as pd
+    report['versions'] = {'streamlit': st.__version__, 'pandas': pd.__version__}
+
+    from utils.data_loader import get_available_datasets
+    datasets, report['get_available_datasets_seconds'], _ = timed(get_available_datasets)
+    files = args.dataset or list((datasets or {}).values())
+
+    report['datasets'] = []
+    for file_path in files:
+        try:
+            report['datasets'].append(benchmark_dataset(file_path, args.skip_tabs))
+        except Exception:
+            report['datasets'].append({'file': file_path, 'error': traceback.format_exc(limit=3)})
+
+    report['total_seconds'] = time.perf_counter() - total_start
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            output.write(payload)
+        print(f"✅ Informe guardado en {args.output} ({report['total_seconds']:.1f} s)")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,380 @@
+"""
+Generador de datasets sintéticos de partidas
+Produce partidas de 10 jugadores (5 ganadores y 5 perdedores) con los héroes reales de
+utils/hero_roles, estadísticas según el rol y la duración de la partida y fechas
+plausibles, en cualquiera de los tres formatos que entiende el dashboard (structured,
+backup 2024 y backup 2025). Todo se genera con numpy por bloques de partidas y se
+escribe en el CSV bloque a bloque, así que sirve para datasets de 1M a 50M de filas.
+
+Uso:
+    python scripts/generate_synthetic_data.py --rows 1000000
+    python scripts/generate_synthetic_data.py --format 2025 --rows 10000000 --players 5000
+    python scripts/generate_synthetic_data.py --format 2024 --rows 50000000 --output big/hots_cleaned_data_modified.csv
+"""
+
+import argparse
+import os
+import sys
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # sin pyarrow se escribe con pandas, varias veces más lento
+    pa_csv = None
+
+# Permite ejecutar el script desde la raíz del proyecto sin instalarlo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.data_loader import get_automatic_role_mapping  # noqa: E402
+from utils.hero_roles import get_hero_roles  # noqa: E402
+from utils.match_table import TEAM_SIZE  # noqa: E402
+
+PLAYERS_PER_MATCH = 2 * TEAM_SIZE
+
+MAPS = [
+    'Alterac Pass', 'Battlefield of Eternity', 'Braxis Holdout', 'Cursed Hollow', 'Dragon Shire',
+    'Garden of Terror', 'Hanamura Temple', 'Infernal Shrines', 'Sky Temple', 'Tomb of the Spider Queen',
+    'Towers of Doom', 'Volskaya Foundry'
+]
+GAME_MODE = 'Storm League'
+
+# Nombre de las columnas de cada formato y separadores de la fecha-hora en el nombre del replay.
+# Los nombres por defecto coinciden con la detección de formato de data_loader.prepare_rows
+FORMATS = {
+    'structured': {
+        'columns': {'File': 'FileName', 'Player': 'PlayerName', 'Hero': 'HeroName',
+                    'HeroDmg': 'HeroDamage', 'SiegeDmg': 'StructureDamage',
+                    'Healing': 'HealingShielding', 'DmgTaken': 'DamageTaken'},
+        'date_separator': ' ',
+        'time_separator': '.',
+        'extra_columns': [],
+        'default_output': 'synthetic_data/structured_data.csv'
+    },
+    '2024': {
+        'columns': {},
+        'date_separator': ' ',
+        'time_separator': '.',
+        # El backup 2024 trae el rol (vocabulario del cargador) y la fecha ya calculados
+        'extra_columns': ['Role', 'Date'],
+        'default_output': 'synthetic_data/hots_cleaned_data_modified.csv'
+    },
+    '2025': {
+        'columns': {'File': 'FileName', 'Player': 'PlayerName', 'Hero': 'HeroName'},
+        'date_separator': '_',
+        'time_separator': '-',
+        'extra_columns': [],
+        'default_output': 'synthetic_data/hots_cleaned_data_modified_2025_1.csv'
+    }
+}
+
+OUTPUT_COLUMNS = [
+    'File', 'Player', 'Hero', 'Map', 'GameTime', 'Winner', 'GameMode', 'HeroKills', 'Assists', 'Takedowns',
+    'Deaths', 'HeroDmg', 'SiegeDmg', 'Healing', 'DmgTaken', 'SelfHealing', 'Experience', 'HeroLevel',
+    'MercCampCaptures', 'TownKills', 'SpentDead', 'SummonDamage'
+]
+
+# Media por minuto de cada estadística según el rol del héroe
+ROLE_PROFILES = {
+    'Tank':            {'HeroKills': 0.10, 'Assists': 0.55, 'Deaths': 0.17, 'HeroDmg': 1900, 'SiegeDmg': 1100,
+                        'Healing': 0, 'DmgTaken': 4800, 'SelfHealing': 900, 'Experience': 1050},
+    'Bruiser':         {'HeroKills': 0.18, 'Assists': 0.45, 'Deaths': 0.18, 'HeroDmg': 2300, 'SiegeDmg': 2600,
+                        'Healing': 0, 'DmgTaken': 3400, 'SelfHealing': 1000, 'Experience': 1450},
+    'Melee Assassin':  {'HeroKills': 0.30, 'Assists': 0.40, 'Deaths': 0.22, 'HeroDmg': 3600, 'SiegeDmg': 1700,
+                        'Healing': 0, 'DmgTaken': 2600, 'SelfHealing': 700, 'Experience': 1000},
+    'Ranged Assassin': {'HeroKills': 0.32, 'Assists': 0.42, 'Deaths': 0.17, 'HeroDmg': 4200, 'SiegeDmg': 2200,
+                        'Healing': 0, 'DmgTaken': 1700, 'SelfHealing': 300, 'Experience': 1000},
+    'Mage':            {'HeroKills': 0.30, 'Assists': 0.45, 'Deaths': 0.17, 'HeroDmg': 4500, 'SiegeDmg': 1900,
+                        'Healing': 0, 'DmgTaken': 1500, 'SelfHealing': 200, 'Experience': 950},
+    'Healer':          {'HeroKills': 0.06, 'Assists': 0.65, 'Deaths': 0.15, 'HeroDmg': 1100, 'SiegeDmg': 700,
+                        'Healing': 4300, 'DmgTaken': 1900, 'SelfHealing': 400, 'Experience': 850},
+    'Support':         {'HeroKills': 0.08, 'Assists': 0.55, 'Deaths': 0.10, 'HeroDmg': 1300, 'SiegeDmg': 1500,
+                        'Healing': 1500, 'DmgTaken': 900, 'SelfHealing': 300, 'Experience': 1300},
+}
+COUNT_STATS = ['HeroKills', 'Assists', 'Deaths']
+AMOUNT_STATS = ['HeroDmg', 'SiegeDmg', 'Healing', 'DmgTaken', 'SelfHealing', 'Experience']
+PROFILE_ROLES = list(ROLE_PROFILES)
+# Matriz (rol, estadística) con una fila final de ceros para héroes sin rol conocido
+PROFILE_MATRIX = np.array(
+    [[ROLE_PROFILES[role][stat] for stat in COUNT_STATS + AMOUNT_STATS] for role in PROFILE_ROLES]
+    + [[0.0] * len(COUNT_STATS + AMOUNT_STATS)]
+)
+
+# Forma de la distribución gamma de las cantidades: cuanto menor, más dispersión entre jugadores
+AMOUNT_SHAPE = 4.0
+# Cambio relativo de cada media para el equipo ganador
+WINNER_BONUS = {'HeroKills': 1.25, 'Assists': 1.30, 'Deaths': 0.70, 'HeroDmg': 1.08, 'SiegeDmg': 1.15,
+                'Experience': 1.10}
+
+# Duración de las partidas: gamma con media de 19 minutos, recortada a 6-40 minutos
+GAME_MINUTES_MEAN = 19
+GAME_TIME_SHAPE = 9.0
+MIN_GAME_MINUTES = 6
+MAX_GAME_MINUTES = 40
+
+# Peso de cada hora del día al elegir el inicio de la partida (más partidas por la tarde-noche)
+DAY_SECONDS = 24 * 3600
+HOUR_WEIGHTS = np.array([3, 2, 1, 1, 1, 1, 1, 1, 2, 2, 3, 3, 4, 4, 4, 5, 6, 7, 9, 10, 10, 9, 7, 5], dtype=np.float64)
+
+
+class HeroPool:
+    """Héroes con su rol, popularidad y fuerza, fijados por la semilla del dataset"""
+
+    def __init__(self, rng):
+        hero_roles = get_hero_roles()
+        self.names = np.array(list(hero_roles.keys()))
+        self.roles = np.array(list(hero_roles.values()))
+        self.role_codes = np.array([
+            PROFILE_ROLES.index(role) if role in ROLE_PROFILES else len(PROFILE_ROLES) for role in self.roles
+        ])
+        # Popularidad log-normal (pocos héroes muy jugados) y fuerza en log-odds de victoria
+        self.log_popularity = rng.normal(0, 0.6, len(self.names))
+        self.strength = rng.normal(0, 0.12, len(self.names))
+        role_mapping = get_automatic_role_mapping()
+        # Rol con el vocabulario del cargador (Assassin, Specialist...), para los formatos que lo incluyen
+        self.dataset_role_codes, self.dataset_roles = pd.factorize(
+            np.array([role_mapping.get(hero, 'Unknown') for hero in self.names])
+        )
+        self.tanks = np.flatnonzero(self.roles == 'Tank')
+        self.healers = np.flatnonzero(self.roles == 'Healer')
+        # Fuera de su hueco, tanques y healers se eligen poco: doble tanque o doble healer ocasional
+        self.flex_penalty = np.where(np.isin(self.roles, ['Tank', 'Healer']), np.log(0.08), 0.0)
+
+
+def top_k(keys, k):
+    """Columnas con las k claves mayores de cada fila, de mayor a menor"""
+    top = np.argpartition(-keys, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(keys, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+def draft_heroes(pool, n_matches, rng):
+    """Héroes de cada partida (n, 2, 5) sin repetidos: un tanque y un healer por equipo y tres libres.
+
+    Se usa Gumbel top-k sobre la popularidad: equivale a muestrear sin reemplazo.
+    """
+    keys = pool.log_popularity + rng.gumbel(size=(n_matches, len(pool.names)))
+    rows = np.arange(n_matches)[:, None]
+
+    tanks = pool.tanks[top_k(keys[:, pool.tanks], 2)]
+    keys[rows, tanks] = -np.inf
+    healers = pool.healers[top_k(keys[:, pool.healers], 2)]
+    keys[rows, healers] = -np.inf
+    flex = top_k(keys + pool.flex_penalty, 2 * (TEAM_SIZE - 2))
+
+    side_a = np.column_stack([tanks[:, 0], healers[:, 0], flex[:, :TEAM_SIZE - 2]])
+    side_b = np.column_stack([tanks[:, 1], healers[:, 1], flex[:, TEAM_SIZE - 2:]])
+    return np.stack([side_a, side_b], axis=1)
+
+
+def split_winners(pool, heroes, rng):
+    """Reordena cada partida para que el equipo ganador vaya primero según la fuerza de sus héroes"""
+    strength = pool.strength[heroes].sum(axis=2)
+    a_wins = rng.random(len(heroes)) < 1 / (1 + np.exp(strength[:, 1] - strength[:, 0]))
+    return np.where(a_wins[:, None, None], heroes, heroes[:, ::-1])
+
+
+def draw_players(player_weights, n_matches, rng):
+    """Jugadores de cada partida (n, 10), distintos dentro de la partida"""
+    cumulative = np.cumsum(player_weights)
+    cumulative /= cumulative[-1]
+    players = np.searchsorted(cumulative, rng.random((n_matches, PLAYERS_PER_MATCH)))
+
+    # Se vuelven a sortear solo las partidas con algún jugador repetido
+    while True:
+        ordered = np.sort(players, axis=1)
+        repeated = np.flatnonzero((ordered[:, 1:] == ordered[:, :-1]).any(axis=1))
+        if len(repeated) == 0:
+            return players
+        players[repeated] = np.searchsorted(cumulative, rng.random((len(repeated), PLAYERS_PER_MATCH)))
+
+
+def draw_start_times(n_matches, day_weights, chunk_index, n_chunks, rng):
+    """Segundo de inicio de cada partida desde el primer día, distinto en todo el dataset.
+
+    Más partidas en fin de semana (day_weights) y por la noche. Cada bloque solo usa los
+    segundos congruentes con su índice módulo el número de bloques, así dos bloques nunca
+    generan el mismo replay; dentro del bloque se vuelven a sortear los repetidos.
+    """
+    def draw(size):
+        day = rng.choice(len(day_weights), size=size, p=day_weights)
+        hour = rng.choice(24, size=size, p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+        seconds = day * DAY_SECONDS + hour * 3600 + rng.integers(0, 3600, size)
+        return seconds - seconds % n_chunks + chunk_index
+
+    starts = draw(n_matches)
+    while True:
+        order = np.argsort(starts, kind='stable')
+        repeated = order[1:][starts[order[1:]] == starts[order[:-1]]]
+        if len(repeated) == 0:
+            return starts
+        starts[repeated] = draw(len(repeated))
+
+
+@lru_cache(maxsize=None)
+def clock_labels(max_seconds, separator=':'):
+    """Texto HH:MM:SS de cada segundo entre 0 y max_seconds, para indexar en vez de formatear fila a fila"""
+    return np.array([
+        f"{s // 3600:02d}{separator}{s // 60 % 60:02d}{separator}{s % 60:02d}" for s in range(max_seconds + 1)
+    ])
+
+
+def generate_stats(pool, heroes, minutes, rng):
+    """Estadísticas de cada fila (partida × jugador) según el rol del héroe y la duración"""
+    role_codes = pool.role_codes[heroes.reshape(-1)]
+    row_minutes = np.repeat(minutes, PLAYERS_PER_MATCH)
+    is_winner = np.tile(np.repeat([True, False], TEAM_SIZE), len(minutes))
+    n_rows = len(role_codes)
+
+    stats = {}
+    for position, stat in enumerate(COUNT_STATS + AMOUNT_STATS):
+        mean = PROFILE_MATRIX[role_codes, position] * row_minutes
+        if stat in WINNER_BONUS:
+            mean[is_winner] *= WINNER_BONUS[stat]
+        if stat in COUNT_STATS:
+            stats[stat] = rng.poisson(mean)
+        else:
+            stats[stat] = np.round(rng.gamma(AMOUNT_SHAPE, mean / AMOUNT_SHAPE))
+
+    stats['Takedowns'] = stats['HeroKills'] + stats['Assists']
+    stats['HeroLevel'] = rng.integers(1, 21, n_rows)
+    stats['MercCampCaptures'] = rng.poisson(row_minutes * 0.12 * np.where(is_winner, 1.3, 1.0))
+    stats['TownKills'] = rng.poisson(row_minutes * 0.08 * np.where(is_winner, 1.5, 0.7))
+    # Cada muerte cuesta más tiempo de respawn cuanto más larga es la partida (como mucho media partida)
+    respawn = 15 + 2.5 * row_minutes
+    spent_dead = np.minimum(stats['Deaths'] * respawn, row_minutes * 30).astype(np.int64)
+    stats['SpentDead'] = pd.Categorical.from_codes(spent_dead, clock_labels(MAX_GAME_MINUTES * 30))
+    summons = rng.random(n_rows) < 0.1
+    stats['SummonDamage'] = np.where(summons, np.round(rng.gamma(2.0, 2500.0, n_rows)), 0).astype(np.int64)
+    return stats
+
+
+def generate_chunk(pool, player_names, player_weights, n_matches, chunk_index, n_chunks, args, rng):
+    """DataFrame de un bloque de partidas en el formato pedido.
+
+    Las columnas de texto son categóricas (códigos sobre etiquetas ya formateadas): no
+    se construye ni se formatea un texto por fila.
+    """
+    spec = FORMATS[args.format]
+    heroes = split_winners(pool, draft_heroes(pool, n_matches, rng), rng)
+    players = draw_players(player_weights, n_matches, rng)
+
+    days = pd.date_range(args.start_date, args.end_date, freq='D')
+    day_weights = np.where(days.dayofweek >= 5, 1.5, 1.0)
+    starts = draw_start_times(n_matches, day_weights / day_weights.sum(), chunk_index, n_chunks, rng)
+    day, time_of_day = starts // DAY_SECONDS, starts % DAY_SECONDS
+    date_labels = np.asarray(days.strftime('%Y-%m-%d'))
+    time_labels = clock_labels(DAY_SECONDS - 1, spec['time_separator'])
+
+    game_seconds = rng.gamma(GAME_TIME_SHAPE, GAME_MINUTES_MEAN * 60 / GAME_TIME_SHAPE, n_matches)
+    game_seconds = np.clip(game_seconds, MIN_GAME_MINUTES * 60, MAX_GAME_MINUTES * 60).astype(np.int64)
+    map_codes = rng.integers(0, len(MAPS), n_matches)
+    files = (
+        pd.Series(date_labels[day], dtype=object) + spec['date_separator'] + time_labels[time_of_day].astype(object)
+        + ' ' + np.array(MAPS, dtype=object)[map_codes] + '.StormReplay'
+    )
+
+    def per_row(codes, categories):
+        return pd.Categorical.from_codes(np.repeat(codes, PLAYERS_PER_MATCH), categories)
+
+    chunk = {
+        'File': per_row(np.arange(n_matches), files),
+        'Player': pd.Categorical.from_codes(players.reshape(-1), player_names),
+        'Hero': pd.Categorical.from_codes(heroes.reshape(-1), pool.names),
+        'Map': per_row(map_codes, MAPS),
+        'GameTime': per_row(game_seconds, clock_labels(MAX_GAME_MINUTES * 60)),
+        'Winner': pd.Categorical.from_codes(np.tile(np.repeat([0, 1], TEAM_SIZE), n_matches), ['Yes', 'No']),
+        'GameMode': per_row(np.zeros(n_matches, dtype=np.int64), [GAME_MODE]),
+    }
+    chunk.update(generate_stats(pool, heroes, game_seconds / 60, rng))
+    frame = pd.DataFrame(chunk, columns=OUTPUT_COLUMNS)
+
+    if 'Role' in spec['extra_columns']:
+        frame['Role'] = pd.Categorical.from_codes(
+            pool.dataset_role_codes[heroes.reshape(-1)], pool.dataset_roles
+        )
+    if 'Date' in spec['extra_columns']:
+        frame['Date'] = per_row(day, date_labels)
+    return frame.rename(columns=spec['columns'])
+
+
+def write_chunk(frame, output, writer):
+    """Añade un bloque al CSV; retorna el escritor de pyarrow (abierto con el primer bloque) o None"""
+    if pa_csv is None:
+        frame.to_csv(output, mode='a' if os.path.exists(output) else 'w', header=not os.path.exists(output),
+                     index=False)
+        return None
+
+    # Las categorías cambian entre bloques: se escriben como texto para mantener un único esquema
+    table = pa.Table.from_pandas(frame, preserve_index=False).replace_schema_metadata(None)
+    table = table.cast(pa.schema([
+        pa.field(field.name, field.type.value_type if pa.types.is_dictionary(field.type) else field.type)
+        for field in table.schema
+    ]))
+    if writer is None:
+        writer = pa_csv.CSVWriter(output, table.schema)
+    writer.write_table(table)
+    return writer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera un dataset sintético de partidas para pruebas de escala")
+    parser.add_argument('--format', choices=list(FORMATS), default='structured', help="Formato del CSV")
+    parser.add_argument('--rows', type=int, default=1_000_000,
+                        help="Filas aproximadas (se redondea a partidas completas de 10 jugadores)")
+    parser.add_argument('--players', type=int, default=2000, help="Jugadores distintos")
+    parser.add_argument('--start-date', default='2023-01-01', help="Primera fecha de partida")
+    parser.add_argument('--end-date', default='2025-06-30', help="Última fecha de partida")
+    parser.add_argument('--chunk-matches', type=int, default=100_000, help="Partidas generadas por bloque")
+    parser.add_argument('--seed', type=int, default=42, help="Semilla (mismo valor, mismo dataset)")
+    parser.add_argument('--output', help="CSV de salida (por defecto, synthetic_data/ con el nombre del formato)")
+    args = parser.parse_args()
+
+    if args.players < PLAYERS_PER_MATCH:
+        print(f"❌ Se necesitan al menos {PLAYERS_PER_MATCH} jugadores")
+        return 1
+
+    output = args.output or FORMATS[args.format]['default_output']
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    n_matches = -(-args.rows // PLAYERS_PER_MATCH)
+    n_chunks = -(-n_matches // args.chunk_matches)
+    n_days = len(pd.date_range(args.start_date, args.end_date, freq='D'))
+    # Cada partida necesita un segundo de inicio propio; con holgura para que el sorteo converja
+    if n_matches > n_days * DAY_SECONDS // 4:
+        print(f"❌ Demasiadas partidas ({n_matches:,}) para {n_days} días: amplía el rango de fechas")
+        return 1
+
+    rng = np.random.default_rng(args.seed)
+    pool = HeroPool(rng)
+    player_names = np.array([f"Player{i:05d}" for i in range(args.players)])
+    # Actividad muy desigual entre jugadores, como en los datos reales
+    player_weights = rng.lognormal(0, 1.0, args.players)
+
+    if os.path.exists(output):
+        os.remove(output)  # write_chunk añade al final del archivo
+
+    start = time.perf_counter()
+    generated = 0
+    writer = None
+    try:
+        for chunk_index in range(n_chunks):
+            size = min(args.chunk_matches, n_matches - generated)
+            frame = generate_chunk(pool, player_names, player_weights, size, chunk_index, n_chunks, args, rng)
+            writer = write_chunk(frame, output, writer)
+            generated += size
+            print(f"📝 {generated * PLAYERS_PER_MATCH:,} / {n_matches * PLAYERS_PER_MATCH:,} filas "
+                  f"({time.perf_counter() - start:.1f} s)")
+    finally:
+        if writer is not None:
+            writer.close()
+
+    print(f"✅ Dataset {args.format} con {n_matches:,} partidas guardado en {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Ingesta incremental de partidas nuevas
+Añade uno o varios CSV (o todos los CSV de un directorio) a un dataset existente sin
+reescribir el CSV principal: solo se procesan las filas nuevas. Cada archivo se guarda
+como una parte propia.
+
+Uso:
+    python scripts/ingest_replays.py nuevas_partidas.csv
+    python scripts/ingest_replays.py --dataset temp_backup_csv/hots_cleaned_data_modified.csv lote/
+"""
+
+import argparse
+import glob
+import os
+import sys
+
+import pandas as pd
+
+# Permite ejecutar el script desde la raíz del proyecto sin instalarlo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.data_loader import ingest_rows  # noqa: E402
+from utils.pandas_options import enable_copy_on_write  # noqa: E402
+
+
+def collect_batch_files(paths):
+    """Expande directorios a sus archivos CSV, en orden alfabético"""
+    batch_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            batch_files.extend(sorted(glob.glob(os.path.join(path, '*.csv'))))
+        else:
+            batch_files.append(path)
+    return batch_files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Añade partidas nuevas a un dataset del dashboard")
+    parser.add_argument('batch', nargs='+', help="Archivos CSV o directorios con las partidas nuevas")
+    parser.add_argument('--dataset', default='structured_data.csv', help="Dataset al que se añaden las partidas")
+    args = parser.parse_args()
+    enable_copy_on_write()
+
+    batch_files = collect_batch_files(args.batch)
+    if not batch_files:
+        print("⚠️ No se encontraron archivos CSV para ingerir")
+        return 1
+    if not os.path.exists(args.dataset):
+        print(f"❌ No existe el dataset {args.dataset}")
+        return 1
+
+    # Cada archivo se ingiere por separado para informar de los duplicados de cada fuente
+    total_appended = 0
+    for batch_file in batch_files:
+        source = os.path.basename(batch_file)
+        summary = ingest_rows(args.dataset, pd.read_csv(batch_file), source)
+        total_appended += summary['anadidas']
+        print(f"📥 {source}: {summary['leidas']} filas leídas, "
+              f"{summary['duplicadas_lote']} duplicadas dentro del archivo, "
+              f"{summary['duplicadas_dataset']} ya presentes en el dataset, "
+              f"{summary['anadidas']} añadidas")
+
+    print(f"✅ {total_appended} filas añadidas a {args.dataset}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Servicio de agregaciones del dashboard
+Los componentes piden sus groupby aquí en lugar de llamar a pandas directamente;
+el resultado se memoriza por (dataset, firma de filtros, claves, métricas, funciones)
+y, cuando el dataset tiene cubo de agregados, se calcula desde el cubo
+"""
+
+import threading
+import weakref
+
+import pandas as pd
+
+from utils.query_cache import ByteBudgetLRU, filter_signature
+
+# Presupuesto de memoria para los resultados de agregaciones cacheados
+AGGREGATE_CACHE_MAX_BYTES = 64 * 1024**2
+
+_aggregate_cache = ByteBudgetLRU(AGGREGATE_CACHE_MAX_BYTES)
+
+# Consulta que originó cada DataFrame entregado por apply_filters: id -> (weakref, consulta)
+_frame_queries = {}
+_registry_lock = threading.Lock()
+
+
+def _as_tuple(value):
+    """Normaliza un nombre o una lista de nombres a tupla"""
+    if isinstance(value, (list, tuple)):
+        return tuple(value)
+    return (value,)
+
+
+def register_query(frame, dataset_id, filters, cube=None, **resources):
+    """Asocia un DataFrame filtrado con la consulta (dataset, filtros) que lo produjo.
+
+    resources guarda estructuras precalculadas del dataset completo (p. ej. la tabla
+    de partidas) para que los componentes las reutilicen sobre el DataFrame filtrado.
+    """
+    frame_id = id(frame)
+    query = {
+        'key': (dataset_id, filter_signature(filters)),
+        'filters': filters,
+        'cube': cube,
+        'resources': resources,
+    }
+
+    def _forget(_ref):
+        with _registry_lock:
+            entry = _frame_queries.get(frame_id)
+            if entry is not None and entry[0] is _ref:
+                del _frame_queries[frame_id]
+
+    with _registry_lock:
+        _frame_queries[frame_id] = (weakref.ref(frame, _forget), query)
+
+
+def get_query(frame):
+    """Consulta registrada para un DataFrame; None si es un DataFrame derivado o desconocido"""
+    with _registry_lock:
+        entry = _frame_queries.get(id(frame))
+    if entry is None or entry[0]() is not frame:
+        return None
+    return entry[1]
+
+
+def compute_aggregate(data, keys, metrics, funcs):
+    """groupby de las métricas por las claves, sin caché"""
+    grouped = data.groupby(list(keys), observed=True)[list(metrics)]
+    if len(funcs) == 1:
+        return grouped.agg(funcs[0])
+    # Una pasada vectorizada por función (agg con lista recorre columna a columna);
+    # mismo resultado que grouped.agg(list(funcs)), con columnas (métrica, función)
+    by_func = pd.concat({func: grouped.agg(func) for func in funcs}, axis=1).swaplevel(axis=1)
+    return by_func[pd.MultiIndex.from_product([list(metrics), list(funcs)])]
+
+
+def aggregate(data, keys, metrics, funcs='mean'):
+    """Agrega métricas por claves; memoriza el resultado si data proviene de apply_filters.
+
+    Si la consulta registrada tiene cubo y este cubre las claves, métricas y funciones,
+    el resultado se deriva del cubo filtrado en lugar de recorrer data.
+
+    Con una sola función las columnas del resultado son las métricas; con varias,
+    un MultiIndex (métrica, función). El resultado se comparte: no modificarlo en el lugar.
+    """
+    keys, metrics, funcs = _as_tuple(keys), _as_tuple(metrics), _as_tuple(funcs)
+
+    query = get_query(data)
+    if query is None:
+        return compute_aggregate(data, keys, metrics, funcs)
+
+    cache_key = (query['key'], keys, metrics, funcs)
+    result = _aggregate_cache.get(cache_key)
+    if result is None:
+        cube = query['cube']
+        if cube is not None and cube.supports(keys, metrics, funcs):
+            result = cube.query(query['filters'], keys, metrics, funcs)
+        else:
+            result = compute_aggregate(data, keys, metrics, funcs)
+        _aggregate_cache.put(cache_key, result)
+    return result
+
+
+def memoize(data, name, compute):
+    """Resultado de compute(data), memorizado por (dataset, firma de filtros, name).
+
+    Para estructuras derivadas que no son un groupby (matrices, tablas de partidas...).
+    Si data no proviene de apply_filters se calcula sin caché.
+    """
+    query = get_query(data)
+    if query is None:
+        return compute(data)
+
+    cache_key = (query['key'], name)
+    result = _aggregate_cache.get(cache_key)
+    if result is None:
+        result = compute(data)
+        _aggregate_cache.put(cache_key, result)
+    return result
+
+
+def get_aggregate_cache_stats():
+    """Resumen de uso de la caché de agregaciones"""
+    return _aggregate_cache.stats()
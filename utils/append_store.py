@@ -0,0 +1,261 @@
+"""
+Almacén de partidas añadidas de forma incremental
+Las filas nuevas se guardan como partes Feather junto a la caché columnar del dataset,
+cada una con el conjunto ordenado de claves (archivo, jugador, héroe) que contiene.
+Las claves son hashes de 64 bits que también usa clean_data para deduplicar, de modo
+que los lotes nuevos se comprueban sin volver a procesar el dataset completo
+"""
+
+import glob
+import json
+import os
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from utils.columnar_cache import CACHE_DIR_NAME, feather
+
+STORE_SUFFIX = '.appended'
+PART_PREFIX = 'part-'
+KEYS_EXTENSION = '.keys.npy'
+DUPLICATES_EXTENSION = '.duplicates.json'
+LOCK_FILE_NAME = 'ingest.lock'
+
+# Espera máxima (segundos) para obtener el bloqueo del almacén y frecuencia de reintento
+STORE_LOCK_TIMEOUT = 300
+STORE_LOCK_POLL_SECONDS = 0.2
+
+# Columnas que identifican un registro, las mismas que usa clean_data para deduplicar
+DEDUP_KEY_COLUMNS = ['File', 'Player', 'Hero']
+
+
+def get_store_dir(file_path):
+    """Directorio con las partes añadidas de un dataset"""
+    source_dir = os.path.dirname(os.path.abspath(file_path))
+    return os.path.join(source_dir, CACHE_DIR_NAME, os.path.basename(file_path) + STORE_SUFFIX)
+
+
+def list_parts(file_path):
+    """Rutas de las partes añadidas, en orden de ingesta"""
+    return sorted(glob.glob(os.path.join(get_store_dir(file_path), f"{PART_PREFIX}*.feather")))
+
+
+def get_store_version(file_path):
+    """Identificador de las partes añadidas; None si el dataset no tiene ninguna"""
+    parts = list_parts(file_path)
+    if not parts:
+        return None
+    return f"{len(parts)}-{os.path.basename(parts[-1])}"
+
+
+def get_store_parts(file_path, store_version):
+    """Rutas de las partes que incluye una versión del almacén (las primeras, en orden de ingesta)"""
+    if store_version is None:
+        return []
+    n_parts = int(store_version.split('-', 1)[0])
+    return list_parts(file_path)[:n_parts]
+
+
+def read_parts(part_paths):
+    """Lee las partes añadidas indicadas"""
+    if feather is None:
+        return []
+    return [feather.read_feather(part_path) for part_path in part_paths]
+
+
+# Multiplicador para combinar los hashes de varias columnas (primo FNV de 64 bits)
+_HASH_PRIME = np.uint64(0x100000001B3)
+
+
+def key_columns(data):
+    """Columnas presentes que forman la clave de deduplicación"""
+    columns = [column for column in DEDUP_KEY_COLUMNS if column in data.columns]
+    if 'File' not in columns and 'FileName' in data.columns:
+        columns.insert(0, 'FileName')
+    return columns
+
+
+def column_hashes(series):
+    """Hash de 64 bits del texto de cada valor, calculado una sola vez por valor distinto"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series)
+    # Se compara como texto para que categorías y cadenas produzcan el mismo hash
+    value_hashes = pd.util.hash_array(np.asarray(uniques.astype(str), dtype=object))
+    # Los nulos (código -1) comparten el hash de un valor reservado
+    value_hashes = np.append(value_hashes, pd.util.hash_array(np.array(['<NA>'], dtype=object)))
+    return value_hashes[codes]
+
+
+def row_keys(data):
+    """Hash de 64 bits de la clave (archivo, jugador, héroe) de cada fila"""
+    keys = np.zeros(len(data), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for column in key_columns(data):
+            keys = (keys * _HASH_PRIME) ^ column_hashes(data[column])
+    return keys
+
+
+def duplicated_keys(keys):
+    """Máscara de las filas cuya clave ya apareció antes (se conserva la primera)"""
+    return pd.Series(keys).duplicated(keep='first').to_numpy()
+
+
+def _keys_path(path):
+    """Archivo de claves asociado a una parte o al dataset base"""
+    return path[:-len('.feather')] + KEYS_EXTENSION if path.endswith('.feather') else path + KEYS_EXTENSION
+
+
+def get_base_keys_path(file_path, cache_key):
+    """Archivo con las claves del dataset base para una versión de la caché columnar"""
+    return os.path.join(get_store_dir(file_path), f"base-{cache_key}{KEYS_EXTENSION}")
+
+
+def remove_stale_base_files(file_path, cache_key):
+    """Elimina las claves e informes del dataset base de versiones anteriores de la caché"""
+    current_prefix = f"base-{cache_key}."
+    for stale_path in glob.glob(os.path.join(get_store_dir(file_path), "base-*")):
+        if not os.path.basename(stale_path).startswith(current_prefix):
+            os.remove(stale_path)
+
+
+def write_base_keys(file_path, cache_key, keys):
+    """Persiste las claves del dataset base y elimina las de versiones anteriores"""
+    base_keys_path = get_base_keys_path(file_path, cache_key)
+    os.makedirs(os.path.dirname(base_keys_path), exist_ok=True)
+    base_keys = np.sort(keys)
+    np.save(base_keys_path, base_keys)
+    remove_stale_base_files(file_path, cache_key)
+    return base_keys
+
+
+def get_duplicates_report_path(file_path, cache_key):
+    """Archivo con los duplicados eliminados de cada fuente del dataset base"""
+    return os.path.join(get_store_dir(file_path), f"base-{cache_key}{DUPLICATES_EXTENSION}")
+
+
+def write_duplicates_report(file_path, cache_key, reports):
+    """Persiste junto a las claves base los duplicados eliminados por fuente al procesar el CSV"""
+    report_path = get_duplicates_report_path(file_path, cache_key)
+    os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    with open(report_path, 'w', encoding='utf-8') as report_file:
+        json.dump(reports, report_file, ensure_ascii=False)
+    remove_stale_base_files(file_path, cache_key)
+
+
+def read_duplicates_report(file_path, cache_key):
+    """Duplicados eliminados por fuente en el dataset base; lista vacía si no se guardaron"""
+    report_path = get_duplicates_report_path(file_path, cache_key)
+    if not os.path.exists(report_path):
+        return []
+    try:
+        with open(report_path, encoding='utf-8') as report_file:
+            return json.load(report_file)
+    except (OSError, ValueError):
+        return []
+
+
+def load_key_index(file_path, cache_key, load_base):
+    """Conjuntos ordenados de claves del dataset base y de cada parte añadida.
+
+    Las claves del dataset base se guardan al generar la caché columnar; load_base solo
+    se llama si no existen para la versión actual.
+    """
+    base_keys_path = get_base_keys_path(file_path, cache_key)
+    if os.path.exists(base_keys_path):
+        base_keys = np.load(base_keys_path, mmap_mode='r')
+    else:
+        base_keys = write_base_keys(file_path, cache_key, row_keys(load_base()))
+
+    index = [base_keys]
+    for part_path in list_parts(file_path):
+        index.append(np.load(_keys_path(part_path), mmap_mode='r'))
+    return index
+
+
+def contains_keys(index, keys):
+    """Máscara de las claves que ya existen en alguno de los conjuntos ordenados"""
+    found = np.zeros(len(keys), dtype=bool)
+    for sorted_keys in index:
+        if len(sorted_keys) == 0:
+            continue
+        positions = np.searchsorted(sorted_keys, keys)
+        positions = np.minimum(positions, len(sorted_keys) - 1)
+        found |= np.asarray(sorted_keys[positions]) == keys
+    return found
+
+
+def write_part(file_path, data):
+    """Guarda un lote de filas nuevas como una parte más del dataset"""
+    if feather is None:
+        raise RuntimeError("pyarrow no está instalado: no se pueden guardar partes añadidas")
+
+    store_dir = get_store_dir(file_path)
+    os.makedirs(store_dir, exist_ok=True)
+    part_path = claim_part_path(file_path)
+
+    # Las claves se guardan antes que la parte: una parte visible siempre tiene sus claves
+    tmp_path = f"{part_path}.{os.getpid()}.tmp"
+    try:
+        np.save(_keys_path(part_path), np.sort(row_keys(data)))
+        feather.write_feather(data, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, part_path)
+    except BaseException:
+        # Sin parte visible, el archivo de claves reservado no debe quedar huérfano
+        if not os.path.exists(part_path):
+            os.remove(_keys_path(part_path))
+        raise
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return part_path
+
+
+def claim_part_path(file_path):
+    """Reserva de forma atómica el nombre de la siguiente parte.
+
+    El archivo de claves de la parte se crea con O_EXCL: si otra ingesta ya tomó ese
+    número, se prueba el siguiente en lugar de sobrescribir su parte.
+    """
+    store_dir = get_store_dir(file_path)
+    number = len(list_parts(file_path)) + 1
+    while True:
+        part_path = os.path.join(store_dir, f"{PART_PREFIX}{number:05d}.feather")
+        try:
+            os.close(os.open(_keys_path(part_path), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return part_path
+        except FileExistsError:
+            number += 1
+
+
+@contextmanager
+def store_lock(file_path, timeout=STORE_LOCK_TIMEOUT):
+    """Acceso exclusivo al almacén de partes de un dataset entre procesos.
+
+    Las ingestas que se solapan comprobarían duplicados contra el mismo índice de claves
+    y añadirían dos veces las mismas filas; con el bloqueo se ejecutan una tras otra.
+    """
+    store_dir = get_store_dir(file_path)
+    os.makedirs(store_dir, exist_ok=True)
+    lock_path = os.path.join(store_dir, LOCK_FILE_NAME)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            lock_fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            if time.monotonic() >= deadline:
+                raise RuntimeError(
+                    f"El almacén {store_dir} está bloqueado por otra ingesta; "
+                    f"si no hay ninguna en curso, elimina {lock_path}"
+                )
+            time.sleep(STORE_LOCK_POLL_SECONDS)
+    try:
+        os.write(lock_fd, str(os.getpid()).encode())
+        os.close(lock_fd)
+        yield
+    finally:
+        os.remove(lock_path)
@@ -0,0 +1,106 @@
+"""
+Caché columnar persistente para los datasets normalizados
+Guarda el resultado de load_data en un archivo Feather junto al CSV de origen,
+identificado por el hash del contenido del CSV y la versión del código del cargador
+"""
+
+import glob
+import hashlib
+import os
+from functools import lru_cache
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow se instala con streamlit, pero la caché es opcional
+    feather = None
+
+
+CACHE_DIR_NAME = '.columnar_cache'
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# Módulos cuyo código determina el resultado de load_data
+_LOADER_SOURCES = ['data_loader.py', 'columnar_cache.py', 'features.py', 'match_table.py']
+
+
+def hash_file(file_path):
+    """Calcula el hash SHA-256 del contenido de un archivo leyendo por bloques"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(_HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=1)
+def get_loader_version():
+    """Obtiene la versión del cargador como hash de su código fuente"""
+    utils_dir = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for source in _LOADER_SOURCES:
+        source_path = os.path.join(utils_dir, source)
+        if os.path.exists(source_path):
+            digest.update(hash_file(source_path).encode())
+    return digest.hexdigest()
+
+
+def get_cache_key(file_path):
+    """Clave de caché: hash del archivo de origen + versión del cargador"""
+    return f"{hash_file(file_path)[:16]}-{get_loader_version()[:8]}"
+
+
+def get_cache_path(file_path, cache_key):
+    """Ruta del archivo sidecar para un archivo de origen y una clave"""
+    source_dir = os.path.dirname(os.path.abspath(file_path))
+    source_name = os.path.basename(file_path)
+    return os.path.join(source_dir, CACHE_DIR_NAME, f"{source_name}.{cache_key}.feather")
+
+
+def read_cached_frame(file_path, cache_key):
+    """Lee el DataFrame normalizado desde la caché; retorna None si no existe o no es válido"""
+    if feather is None:
+        return None
+
+    cache_path = get_cache_path(file_path, cache_key)
+    if not os.path.exists(cache_path):
+        return None
+
+    try:
+        # Sin compresión el archivo se mapea en memoria en lugar de parsearse
+        return feather.read_feather(cache_path, memory_map=True)
+    except Exception:
+        # Un sidecar corrupto o incompatible se ignora y se regenera
+        return None
+
+
+def write_cached_frame(file_path, cache_key, data):
+    """Guarda el DataFrame normalizado en la caché y elimina versiones obsoletas"""
+    if feather is None:
+        return False
+
+    cache_path = get_cache_path(file_path, cache_key)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+    # Escritura atómica para que otro worker nunca lea un archivo a medias
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        feather.write_feather(data, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+    remove_stale_entries(file_path, cache_key)
+    return True
+
+
+def remove_stale_entries(file_path, cache_key):
+    """Elimina sidecars de versiones anteriores del mismo archivo de origen"""
+    current_path = get_cache_path(file_path, cache_key)
+    pattern = get_cache_path(file_path, '*')
+    for stale_path in glob.glob(pattern):
+        if stale_path != current_path:
+            try:
+                os.remove(stale_path)
+            except OSError:
+                pass
@@ -0,0 +1,91 @@
+"""
+Motor de composiciones de equipo
+Codifica el multiconjunto de roles de cada equipo como un entero (conteo de cada rol en
+base 8) y calcula frecuencia, winrate e intervalo de confianza de cada composición con
+operaciones vectorizadas de NumPy
+"""
+
+import numpy as np
+import pandas as pd
+
+# Base de la firma: cada rol aparece como mucho 5 veces por equipo
+SIGNATURE_BASE = 8
+
+# Valor z del intervalo de confianza al 95%
+DEFAULT_Z = 1.96
+
+UNKNOWN_ROLE = 'Unknown'
+
+
+def role_signatures(role_codes, n_roles):
+    """Firma entera del multiconjunto de roles de cada equipo (conteos en base 8)"""
+    if n_roles + 1 > np.iinfo(np.int64).bits // 3:
+        raise ValueError(f"Demasiados roles para una firma de 64 bits: {n_roles}")
+    # Cada jugador suma 8^rol: la suma por equipo es el vector de conteos en base 8
+    weights = SIGNATURE_BASE ** np.arange(n_roles + 1, dtype=np.int64)
+    role_codes = np.asarray(role_codes)
+    codes = np.where(role_codes < 0, n_roles, role_codes)
+    return weights[codes].sum(axis=1)
+
+
+def count_signatures(role_counts):
+    """Firma de cada equipo a partir de su vector de conteos por rol (n, n_roles + 1)"""
+    weights = SIGNATURE_BASE ** np.arange(role_counts.shape[1], dtype=np.int64)
+    return role_counts.astype(np.int64) @ weights
+
+
+def decode_signatures(signatures, n_roles):
+    """Conteos de cada rol (n, n_roles + 1) a partir de las firmas"""
+    signatures = np.asarray(signatures, dtype=np.int64)
+    weights = SIGNATURE_BASE ** np.arange(n_roles + 1, dtype=np.int64)
+    return (signatures[:, None] // weights) % SIGNATURE_BASE
+
+
+def signature_labels(signatures, role_names):
+    """Texto de cada composición: los roles repetidos tantas veces como aparecen"""
+    names = list(role_names) + [UNKNOWN_ROLE]
+    counts = decode_signatures(signatures, len(role_names))
+    return [
+        ', '.join(name for name, count in zip(names, row) for _ in range(count))
+        for row in counts
+    ]
+
+
+def wilson_interval(wins, games, z=DEFAULT_Z):
+    """Intervalo de confianza de Wilson para la proporción de victorias"""
+    wins = np.asarray(wins, dtype=np.float64)
+    games = np.asarray(games, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = wins / games
+        denominator = 1 + z ** 2 / games
+        center = (p + z ** 2 / (2 * games)) / denominator
+        half_width = z * np.sqrt(p * (1 - p) / games + z ** 2 / (4 * games ** 2)) / denominator
+    return center - half_width, center + half_width
+
+
+def composition_stats(role_codes, won, role_names, z=DEFAULT_Z):
+    """Frecuencia, victorias, winrate e intervalo de Wilson de cada composición de roles.
+
+    role_codes es un array (equipos, huecos) con el código de rol de cada jugador
+    (índice en role_names, negativo si se desconoce) y won indica si el equipo ganó.
+    """
+    return signature_stats(role_signatures(role_codes, len(role_names)), won, role_names, z)
+
+
+def signature_stats(signatures, won, role_names, z=DEFAULT_Z):
+    """Estadísticas de composición a partir de las firmas ya calculadas de cada equipo"""
+    inverse, unique_signatures = pd.factorize(signatures)
+    games = np.bincount(inverse, minlength=len(unique_signatures))
+    wins = np.bincount(inverse, weights=np.asarray(won, dtype=np.float64), minlength=len(unique_signatures))
+    ci_low, ci_high = wilson_interval(wins, games, z)
+
+    result = pd.DataFrame({
+        'Signature': unique_signatures,
+        'Composition': signature_labels(unique_signatures, role_names),
+        'Games': games,
+        'Wins': wins.astype(np.int64),
+        'Winrate': wins / games,
+        'CI_Low': ci_low,
+        'CI_High': ci_high
+    })
+    return result.sort_values(['Games', 'Signature'], ascending=[False, True]).reset_index(drop=True)
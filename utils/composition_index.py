@@ -0,0 +1,122 @@
+"""
+Índice de composiciones de 5 héroes
+Guarda cada equipo completo observado como una tupla ordenada de códigos de héroe con sus
+partidas y victorias, y un bitset por héroe sobre esas composiciones para responder
+"todos los equipos que contienen estos héroes" con un AND de bits
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.aggregates import memoize
+from utils.composition_engine import wilson_interval
+from utils.match_table import TEAM_SIZE, get_match_table
+
+# Bits por código de héroe en la clave empaquetada de una composición
+HERO_CODE_BITS = 12
+
+
+def pack_teams(teams):
+    """Clave entera de cada equipo a partir de sus códigos de héroe ya ordenados"""
+    shifts = np.arange(teams.shape[1], dtype=np.int64) * HERO_CODE_BITS
+    return (teams.astype(np.int64) << shifts).sum(axis=1)
+
+
+def build_composition_index(matches):
+    """Construye el índice con los equipos completos de una tabla de partidas"""
+    n_heroes = len(matches.hero_categories)
+    if n_heroes >= 2 ** HERO_CODE_BITS:
+        raise ValueError(f"Demasiados héroes para la clave de composición: {n_heroes}")
+
+    heroes, _, won = matches.teams()
+    # Los equipos con héroes desconocidos no forman una composición comparable
+    known = (heroes >= 0).all(axis=1)
+    teams = np.sort(heroes[known], axis=1)
+    won = won[known]
+
+    codes, keys = pd.factorize(pack_teams(teams))
+    games = np.bincount(codes, minlength=len(keys))
+    wins = np.bincount(codes, weights=won.astype(np.float64), minlength=len(keys)).astype(np.int64)
+    first = np.unique(codes, return_index=True)[1]
+    return CompositionIndex(matches.hero_categories, teams[first], games, wins)
+
+
+class CompositionIndex:
+    """Composiciones observadas con sus partidas y victorias, consultables por subconjunto de héroes"""
+
+    def __init__(self, hero_names, teams, games, wins):
+        self.hero_names = pd.Index(hero_names)
+        self.teams = teams
+        self.games = games
+        self.wins = wins
+
+        # Bitset por héroe: bit k activo si la composición k contiene al héroe
+        membership = np.zeros((len(self.hero_names), len(teams)), dtype=bool)
+        for slot in range(teams.shape[1]):
+            membership[teams[:, slot], np.arange(len(teams))] = True
+        self.bitsets = np.packbits(membership, axis=1)
+
+    @property
+    def n_compositions(self):
+        return len(self.teams)
+
+    @property
+    def nbytes(self):
+        return self.teams.nbytes + self.games.nbytes + self.wins.nbytes + self.bitsets.nbytes
+
+    def hero_codes(self, heroes):
+        """Códigos de los héroes indicados; None si alguno no aparece en el índice"""
+        codes = self.hero_names.get_indexer(list(heroes))
+        return None if (codes < 0).any() else codes
+
+    def containing(self, heroes):
+        """Posiciones de las composiciones que contienen todos los héroes indicados"""
+        codes = self.hero_codes(heroes)
+        if codes is None:
+            return np.array([], dtype=np.int64)
+        if len(codes) == 0:
+            return np.arange(self.n_compositions)
+        bits = np.bitwise_and.reduce(self.bitsets[codes], axis=0)
+        return np.flatnonzero(np.unpackbits(bits, count=self.n_compositions))
+
+    def query(self, heroes):
+        """Composiciones que contienen los héroes indicados, ordenadas por partidas"""
+        positions = self.containing(heroes)
+        games, wins = self.games[positions], self.wins[positions]
+        ci_low, ci_high = wilson_interval(wins, games)
+        result = pd.DataFrame({
+            'Composition': [', '.join(self.hero_names[team]) for team in self.teams[positions]],
+            'Games': games,
+            'Wins': wins,
+            'Winrate': wins / games,
+            'CI_Low': ci_low,
+            'CI_High': ci_high
+        })
+        return result.sort_values(['Games', 'Winrate'], ascending=False).reset_index(drop=True)
+
+    def summary(self, heroes):
+        """Partidas, victorias y número de composiciones distintas que contienen los héroes"""
+        positions = self.containing(heroes)
+        games, wins = int(self.games[positions].sum()), int(self.wins[positions].sum())
+        return {
+            'compositions': len(positions),
+            'games': games,
+            'wins': wins,
+            'winrate': wins / games if games else np.nan
+        }
+
+    def exact(self, heroes):
+        """Partidas y victorias de exactamente esa composición de 5 héroes; None si no se jugó"""
+        if len(set(heroes)) != TEAM_SIZE:
+            return None
+        positions = self.containing(heroes)
+        if len(positions) == 0:
+            return None
+        position = positions[0]
+        return {'games': int(self.games[position]), 'wins': int(self.wins[position]),
+                'winrate': float(self.wins[position] / self.games[position])}
+
+
+def get_composition_index(data):
+    """Índice de composiciones de las partidas presentes en data, memorizado por firma de filtros"""
+    return memoize(data, 'composition_index', lambda frame: build_composition_index(get_match_table(frame)))
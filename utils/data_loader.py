@@ -1,6 +1,22 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
+import threading
+from collections import OrderedDict
+from utils.append_store import (
+    contains_keys, duplicated_keys, get_store_parts, key_columns, load_key_index, read_duplicates_report,
+    read_parts, row_keys, store_lock, write_base_keys, write_duplicates_report, write_part
+)
+from utils.columnar_cache import get_cache_key, read_cached_frame, write_cached_frame
+from utils.dataset_handle import DatasetHandle, cache_by_dataset, get_dataset_version
+from utils.features import FEATURE_COLUMNS, add_derived_features, has_derived_features
+from utils.filter_engine import FilterEngine
+from utils.hero_roles import get_all_roles
+from utils.match_table import (
+    MATCH_KEY_COLUMN, build_match_table, compute_match_keys, extend_match_table, get_file_column, get_role_lookup
+)
+from utils.rollup_cube import build_rollup_cube, merge_rollup_cubes
 
 
 @st.cache_data
@@ -24,14 +40,305 @@ def get_available_datasets():
     return datasets
 
 
-@st.cache_data
-def load_data(file_path=None):
-    """Carga los datos desde el archivo especificado"""
+def load_data(file_path=None, store_version=None):
+    """Carga los datos desde el archivo especificado, incluidas las partidas añadidas.
+    
+    Es el DataFrame del handle de load_dataset, cacheado por su token de versión.
+    """
+    return load_dataset(file_path, store_version).frame
+
+
+def add_loader_columns(data):
+    """Añade las columnas derivadas que calcula el cargador en cada versión del dataset"""
+    # Clave entera de partida que enlaza cada fila con la tabla de partidas
+    return data.assign(**{
+        MATCH_KEY_COLUMN: compute_match_keys(data),
+        HERO_ROLE_COLUMN: compute_hero_roles(data),
+    })
+
+
+def append_parts(data, parts):
+    """Une partidas añadidas al dataset ya cargado sin reprocesar sus filas.
+    
+    Las categorías del dataset se amplían al final con los valores nuevos, así que los
+    códigos existentes (y con ellos MatchKey) no cambian y las columnas derivadas solo se
+    calculan para las filas nuevas. Retorna (dataset, filas nuevas con los tipos del
+    dataset); si el dataset no identifica los replays con una columna categórica, se
+    reprocesa completo y las filas nuevas son None.
+    """
+    if not parts:
+        return data, data.iloc[:0]
+    
+    # Las partes guardadas antes de existir las métricas derivadas las calculan al cargarse
+    parts = [part if has_derived_features(part) else add_derived_features(part) for part in parts]
+    rows = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+    
+    file_col = get_file_column(data)
+    if file_col is not None and not isinstance(data[file_col].dtype, pd.CategoricalDtype):
+        data = pd.concat([data.drop(columns=[MATCH_KEY_COLUMN, HERO_ROLE_COLUMN]), rows], ignore_index=True)
+        return add_loader_columns(apply_dtype_schema(data)), None
+    
+    extended, aligned = {}, {}
+    for column in data.columns.intersection(rows.columns):
+        dtype = data[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            values = pd.Index(rows[column].dropna().astype(object).unique())
+            missing = values.difference(dtype.categories, sort=False)
+            if len(missing) > 0:
+                dtype = pd.CategoricalDtype(dtype.categories.append(missing), ordered=dtype.ordered)
+                # Las categorías nuevas van al final: los códigos se reutilizan sin recodificar
+                extended[column] = pd.Categorical.from_codes(data[column].cat.codes.to_numpy(), dtype=dtype)
+            aligned[column] = rows[column].astype(dtype)
+        elif rows[column].dtype != dtype:
+            aligned[column] = match_numeric_dtype(rows[column], dtype)
+    
+    if extended:
+        data = data.assign(**extended)
+    rows = add_loader_columns(rows.assign(**aligned))
+    return pd.concat([data, rows], ignore_index=True), rows
+
+
+def match_numeric_dtype(series, dtype):
+    """Convierte una columna numérica al tipo indicado si no pierde valores; si no, la deja igual"""
+    if not (pd.api.types.is_numeric_dtype(series.dtype) and pd.api.types.is_numeric_dtype(dtype)):
+        return series
+    if pd.api.types.is_bool_dtype(series.dtype) != pd.api.types.is_bool_dtype(dtype):
+        return series
+    try:
+        converted = series.astype(dtype)
+    except (TypeError, ValueError):
+        return series
+    # Los flotantes se reducen a float32 como en apply_dtype_schema; los enteros deben coincidir
+    if pd.api.types.is_float_dtype(dtype) or converted.astype('float64').equals(series.astype('float64')):
+        return converted
+    return series
+
+
+# Rol de get_hero_roles (Tank, Healer, Mage...) de cada fila, distinto de la columna Role del CSV
+HERO_ROLE_COLUMN = 'HeroRole'
+
+# Columnas que no vienen del CSV sino que calcula el cargador
+DERIVED_COLUMNS = [MATCH_KEY_COLUMN, HERO_ROLE_COLUMN] + FEATURE_COLUMNS
+
+# Columnas numéricas que no son estadísticas: la clave de partida y la hora de inicio
+NON_METRIC_COLUMNS = [MATCH_KEY_COLUMN, 'Hour']
+
+
+def get_metric_columns(data):
+    """Columnas numéricas analizables como métricas (sin claves ni la hora de inicio)"""
+    return [
+        column for column in data.select_dtypes(include=[np.number]).columns
+        if column not in NON_METRIC_COLUMNS
+    ]
+
+
+def get_metric_label(column):
+    """Nombre de una métrica en los selectores; las derivadas por el cargador se marcan como tales"""
+    return f"{column} (derivada)" if column in FEATURE_COLUMNS else column
+
+
+def compute_hero_roles(data):
+    """Rol de cada fila según get_hero_roles, categórico; NaN para héroes sin rol conocido"""
+    if isinstance(data['Hero'].dtype, pd.CategoricalDtype):
+        codes, heroes = data['Hero'].cat.codes.to_numpy(), data['Hero'].cat.categories
+    else:
+        codes, heroes = pd.factorize(data['Hero'])
+    # Un código por héroe distinto; el código -1 (héroe nulo) cae en el último hueco, sin rol
+    role_codes = np.append(get_role_lookup(heroes), -1)
+    return pd.Categorical.from_codes(role_codes[codes], categories=get_all_roles())
+
+
+def get_hero_role_column(data):
+    """Columna de rol por héroe: la precalculada por load_data o, si falta, calculada al vuelo"""
+    if HERO_ROLE_COLUMN in data.columns:
+        return data[HERO_ROLE_COLUMN]
+    return pd.Series(compute_hero_roles(data), index=data.index, name=HERO_ROLE_COLUMN)
+
+
+def load_dataset(file_path=None, store_version=None):
+    """Handle del dataset (DataFrame + token de versión) para indexar cachés sin hashear datos.
+    
+    El DataFrame se comparte (sin copia por llamada) entre el handle, el motor de filtros,
+    el cubo y la tabla de partidas, que se guardan con el mismo token: no modificarlo en
+    el lugar (añadir columnas sobre una copia superficial sí es seguro).
+    """
     if file_path is None:
         file_path = "structured_data.csv"
+    version = get_dataset_version(file_path, store_version)
+    return get_dataset_store(file_path).get(store_version, version).handle
+
+
+# Datasets distintos que se mantienen en memoria a la vez
+MAX_CACHED_DATASETS = 4
+
+# Versiones de un mismo dataset que se conservan: la actual y la anterior, que aún pueden
+# pedir las sesiones cuyo rerun empezó antes de una ingesta
+MAX_VERSIONS_PER_DATASET = 2
+
+
+@st.cache_resource(show_spinner=False, max_entries=MAX_CACHED_DATASETS)
+def get_dataset_store(file_path):
+    """Almacén en memoria de las versiones de un dataset, compartido entre sesiones"""
+    return DatasetStore(file_path)
+
+
+class DatasetStore:
+    """Últimas versiones cargadas de un dataset.
+    
+    Cuando solo cambian las partidas añadidas, la versión nueva se obtiene ampliando la
+    última con las partes nuevas en lugar de volver a cargar el dataset completo.
+    """
+    
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        self._states = OrderedDict()
+    
+    def get(self, store_version, version):
+        """Versión del dataset con ese token, cargándola o ampliando la última si hace falta"""
+        with self._lock:
+            state = self._states.get(version)
+            if state is None:
+                state = self._load(store_version, version)
+                self._states[version] = state
+                while len(self._states) > MAX_VERSIONS_PER_DATASET:
+                    self._states.popitem(last=False)
+            return state
+    
+    def find(self, version):
+        """Versión ya cargada con ese token; None si no está (o ya se descartó)"""
+        with self._lock:
+            return self._states.get(version)
+    
+    def _load(self, store_version, version):
+        base_version = get_dataset_version(self.file_path)
+        part_paths = get_store_parts(self.file_path, store_version)
+        latest = next(reversed(self._states.values()), None)
+        if (latest is not None and latest.base_version == base_version
+                and len(part_paths) > len(latest.part_paths)
+                and part_paths[:len(latest.part_paths)] == latest.part_paths):
+            return latest.extend(part_paths, version)
+        
+        data = add_loader_columns(load_base_data(self.file_path))
+        base_rows = len(data)
+        # Partidas añadidas de forma incremental después de generar el CSV
+        if part_paths:
+            data, _ = append_parts(data, read_parts(part_paths))
+        return DatasetState(DatasetHandle(data, self.file_path, version), base_version, part_paths, base_rows)
+
+
+class DatasetState:
+    """Una versión cargada de un dataset: handle, partes incluidas y estructuras derivadas.
+    
+    El motor de filtros, el cubo y la tabla de partidas se construyen la primera vez que
+    se piden. Al ampliar la versión con partes nuevas, los ya construidos se extienden
+    solo con las filas nuevas.
+    """
+    
+    def __init__(self, handle, base_version, part_paths, base_rows=None, structures=None):
+        self.handle = handle
+        self.base_version = base_version
+        self.part_paths = part_paths
+        # Filas del dataset base (el resto son partidas añadidas); None si no se conocen
+        self.base_rows = base_rows
+        self._lock = threading.Lock()
+        self._structures = structures or {}
+    
+    @property
+    def engine(self):
+        return self._get('engine', FilterEngine)
+    
+    @property
+    def cube(self):
+        return self._get('cube', lambda data: build_dataset_cube(data, self.base_rows))
+    
+    @property
+    def matches(self):
+        return self._get('matches', build_match_table)
+    
+    def _get(self, name, build):
+        with self._lock:
+            if name not in self._structures:
+                self._structures[name] = build(self.handle.frame)
+            return self._structures[name]
+    
+    def extend(self, part_paths, version):
+        """Versión con las partes nuevas añadidas; self no se modifica"""
+        data, rows = append_parts(self.handle.frame, read_parts(part_paths[len(self.part_paths):]))
+        structures = {}
+        if rows is not None:
+            with self._lock:
+                built = dict(self._structures)
+            if 'engine' in built:
+                engine = built['engine']
+                structures['engine'] = engine.append(rows) if engine.can_append(rows) else FilterEngine(data)
+            if 'matches' in built:
+                structures['matches'] = extend_match_table(built['matches'], data, rows)
+            if 'cube' in built:
+                structures['cube'] = extend_dataset_cube(built['cube'], data, rows)
+        handle = DatasetHandle(data, self.handle.file_path, version)
+        return DatasetState(handle, self.base_version, part_paths, self.base_rows, structures)
+
+
+def get_dataset_state(dataset):
+    """Versión cargada a la que pertenece un handle; si ya se descartó, una sin caché"""
+    state = get_dataset_store(dataset.file_path).find(dataset.version)
+    if state is None:
+        state = DatasetState(dataset, None, None)
+    return state
+
+
+@cache_by_dataset(show_spinner=False)
+def get_dataset_summary(dataset):
+    """Jugadores y héroes distintos del dataset completo, calculados una vez por versión"""
+    data = dataset.frame
+    return {'players': data['Player'].nunique(), 'heroes': data['Hero'].nunique()}
+
+
+def load_base_data(file_path):
+    """Carga el dataset base desde la caché columnar o procesando el CSV"""
+    # Intentar leer el resultado ya normalizado desde la caché columnar
+    cache_key = get_cache_key(file_path)
+    cached_data = read_cached_frame(file_path, cache_key)
+    if cached_data is not None:
+        # Los duplicados eliminados al procesar el CSV se guardaron junto a las claves base
+        for duplicates in read_duplicates_report(file_path, cache_key):
+            report_duplicates(duplicates)
+        return cached_data
+    
+    data, duplicates = prepare_rows(pd.read_csv(file_path), file_path)
+    
+    # Esquema compacto de tipos (categorías, booleanos y numéricos reducidos)
+    memory_before = data.memory_usage(deep=True).sum()
+    data = apply_dtype_schema(data)
+    report_memory_footprint(data, memory_before)
+    
+    # KDA y tasas por minuto en float32; se guardan en la caché columnar con el resto
+    data = add_derived_features(data)
+    
+    # Índice contiguo para que la caché y la carga desde CSV produzcan el mismo frame
+    data = data.reset_index(drop=True)
+    
+    # Guardar el resultado normalizado para los próximos arranques en frío
+    if not write_cached_frame(file_path, cache_key, data):
+        if 'footer_messages' not in st.session_state:
+            st.session_state.footer_messages = []
+        st.session_state.footer_messages.append(
+            "⚠️ No se pudo guardar la caché columnar; la próxima carga volverá a procesar el CSV"
+        )
+    else:
+        # Índice de claves persistido para deduplicar las ingestas incrementales
+        write_base_keys(file_path, cache_key, row_keys(data))
+        write_duplicates_report(file_path, cache_key, [duplicates] if duplicates['rows'] else [])
     
-    data = pd.read_csv(file_path)
+    return data
+
+
+def prepare_rows(data, file_path, source=None):
+    """Normaliza, unifica y limpia filas crudas con el formato del dataset indicado.
     
+    Retorna (filas, resumen de duplicados eliminados), como clean_data.
+    """
     # Normalizar estructura según el tipo de archivo
     if 'structured_data.csv' in file_path:
         # Nuevo formato structured_data (formato estándar)
@@ -47,9 +354,90 @@ def load_data(file_path=None):
     data = unify_players(data)
     
     # Aplicar limpieza de datos
-    data = clean_data(data)
+    return clean_data(data, source or os.path.basename(file_path))
+
+
+def ingest_rows(file_path, new_data, source=None):
+    """Añade filas crudas nuevas al dataset sin reprocesarlo.
+    
+    Solo se normalizan las filas nuevas; las que ya existen en el dataset o en lotes
+    anteriores (misma clave archivo/jugador/héroe) se descartan. Retorna un resumen.
+    """
+    rows, duplicates = prepare_rows(new_data, file_path, source)
+    
+    # Duplicados contra el conjunto de claves persistido (dataset base + partes); el bloqueo
+    # impide que otra ingesta añada partes entre la comprobación y la escritura
+    cache_key = get_cache_key(file_path)
+    with store_lock(file_path):
+        key_index = load_key_index(file_path, cache_key, lambda: load_base_data(file_path))
+        duplicated = contains_keys(key_index, row_keys(rows))
+        rows = rows[~duplicated].reset_index(drop=True)
+        
+        if len(rows) > 0:
+            write_part(file_path, add_derived_features(apply_dtype_schema(rows)))
+    
+    return {
+        'leidas': len(new_data),
+        'duplicadas_lote': duplicates['rows'],
+        'duplicadas_dataset': int(duplicated.sum()),
+        'anadidas': len(rows),
+    }
+
+
+def load_rollup_cube(dataset):
+    """Cubo de agregados del dataset; None si no reduce lo suficiente las filas.
     
-    return data
+    Se construye una sola vez por versión; cuando llegan partidas nuevas, el cubo de la
+    versión anterior se combina solo con el de las filas nuevas.
+    """
+    return get_dataset_state(dataset).cube
+
+
+def load_match_table(dataset):
+    """Tabla de partidas del dataset (una fila por replay), construida una sola vez por versión"""
+    return get_dataset_state(dataset).matches
+
+
+def load_filter_engine(dataset):
+    """Motor de filtros del dataset con sus códigos precalculados, construido una sola vez por versión"""
+    return get_dataset_state(dataset).engine
+
+
+def report_cube_error(error):
+    """Avisa en el footer de que las agregaciones se calcularán sin cubo"""
+    if 'footer_messages' not in st.session_state:
+        st.session_state.footer_messages = []
+    st.session_state.footer_messages.append(f"⚠️ No se pudo construir el cubo de agregados: {str(error)}")
+
+
+def cube_rows(data):
+    """Filas para el cubo sin la clave de partida, que no es una métrica"""
+    return data.drop(columns=[MATCH_KEY_COLUMN], errors='ignore')
+
+
+def build_dataset_cube(data, base_rows=None):
+    """Cubo del dataset: el del dataset base (si reduce lo suficiente) combinado con el de las partes"""
+    base_rows = len(data) if base_rows is None else base_rows
+    try:
+        cube = build_rollup_cube(cube_rows(data.iloc[:base_rows]))
+        if cube is None or base_rows == len(data):
+            return cube
+        return merge_rollup_cubes([cube, build_rollup_cube(cube_rows(data.iloc[base_rows:]), max_row_ratio=None)], data)
+    except Exception as e:
+        # Sin cubo las agregaciones se calculan directamente sobre el dataset filtrado
+        report_cube_error(e)
+        return None
+
+
+def extend_dataset_cube(cube, data, rows):
+    """Cubo tras añadir rows al dataset: el anterior combinado con el de las filas nuevas"""
+    if cube is None:
+        return None
+    try:
+        return merge_rollup_cubes([cube, build_rollup_cube(cube_rows(rows), max_row_ratio=None)], data)
+    except Exception as e:
+        report_cube_error(e)
+        return None
 
 
 def normalize_2024_format(data):
@@ -81,16 +469,10 @@ def normalize_structured_format(data):
     # Optimizar dataset eliminando redundancias
     data = optimize_dataset(data)
     
-    # Crear columna Date a partir de FileName
+    # Crear columnas Date y StartDateTime a partir de FileName (formato esperado: YYYY-MM-DD HH.MM.SS)
     if 'FileName' in data.columns or 'File' in data.columns:
         file_col = 'File' if 'File' in data.columns else 'FileName'
-        # Extraer fecha del nombre del archivo (formato esperado: YYYY-MM-DD)
-        data['Date'] = pd.to_datetime(data[file_col].str.extract(r'(\d{4}-\d{2}-\d{2})')[0], errors='coerce')
-        
-        # Extraer hora de inicio si está disponible
-        time_match = data[file_col].str.extract(r'(\d{2}\.\d{2}\.\d{2})')
-        if not time_match[0].isna().all():
-            data['StartTime'] = pd.to_datetime(time_match[0], format='%H.%M.%S', errors='coerce').dt.time
+        data = add_replay_datetimes(data, file_col)
     
     # Convertir GameTime a timedelta
     data["GameTime"] = pd.to_timedelta(data["GameTime"], errors="coerce")
@@ -116,13 +498,10 @@ def normalize_2025_format(data):
         if old_col in data.columns and new_col not in data.columns:
             data[new_col] = data[old_col]
     
-    # Crear columna Date y StartTime a partir de FileName
+    # Crear columnas Date y StartDateTime a partir de FileName (formato esperado: YYYY-MM-DD_HH-MM-SS)
     if 'FileName' in data.columns or 'File' in data.columns:
         file_col = 'File' if 'File' in data.columns else 'FileName'
-        # Extraer fecha del nombre del archivo (formato esperado: YYYY-MM-DD_HH-MM-SS)
-        data['Date'] = pd.to_datetime(data[file_col].str.extract(r'(\d{4}-\d{2}-\d{2})')[0], errors='coerce')
-        data['StartTime'] = data[file_col].str.extract(r'(\d{2}-\d{2}-\d{2})')[0]
-        data['StartTime'] = pd.to_datetime(data['StartTime'], format='%H-%M-%S', errors='coerce').dt.time
+        data = add_replay_datetimes(data, file_col)
     
     # Aplicar role mapping y limpieza
     data = apply_role_mapping(data)
@@ -133,6 +512,42 @@ def normalize_2025_format(data):
     return data
 
 
+# Fecha del replay y, justo después, la hora de inicio (HH.MM.SS o HH-MM-SS)
+REPLAY_DATETIME_PATTERN = r'(?P<date>\d{4}-\d{2}-\d{2})(?:[ _T](?P<time>\d{2}[.:-]\d{2}[.:-]\d{2}))?'
+
+
+def parse_replay_filenames(filenames):
+    """Extrae fecha y fecha-hora de inicio de los nombres de replay, una vez por nombre distinto"""
+    # Cada replay aparece una vez por jugador: se parsean los valores únicos y se propagan
+    if isinstance(filenames.dtype, pd.CategoricalDtype):
+        codes, uniques = filenames.cat.codes.to_numpy(), filenames.cat.categories
+    else:
+        codes, uniques = pd.factorize(filenames)
+    
+    parts = pd.Series(uniques.astype(str)).str.extract(REPLAY_DATETIME_PATTERN)
+    dates = pd.to_datetime(parts['date'], format='%Y-%m-%d', errors='coerce')
+    start_times = parts['date'] + ' ' + parts['time'].str.replace(r'[.-]', ':', regex=True)
+    starts = pd.to_datetime(start_times, format='%Y-%m-%d %H:%M:%S', errors='coerce')
+    
+    # El código -1 (nombre nulo) apunta a un NaT añadido al final
+    dates = np.append(dates.to_numpy(), np.datetime64('NaT'))
+    starts = np.append(starts.to_numpy(), np.datetime64('NaT'))
+    return pd.DataFrame(
+        {'Date': dates[codes], 'StartDateTime': starts[codes]},
+        index=filenames.index
+    )
+
+
+def add_replay_datetimes(data, file_col):
+    """Añade Date, StartDateTime y Hour (si hay hora de inicio) a partir del nombre del replay"""
+    parsed = parse_replay_filenames(data[file_col])
+    data['Date'] = parsed['Date']
+    if parsed['StartDateTime'].notna().any():
+        data['StartDateTime'] = parsed['StartDateTime']
+        data['Hour'] = parsed['StartDateTime'].dt.hour
+    return data
+
+
 def clean_hero_names(data):
     """Limpia y corrige nombres de héroes con problemas de encoding"""
     name_corrections = {
@@ -297,10 +712,13 @@ def apply_role_mapping(data):
     return data
 
 
-@st.cache_data
-def clean_data(data):
-    """Limpia los datos mejorando la calidad y consistencia"""
-    df = data.copy()
+def clean_data(data, source=None):
+    """Limpia los datos mejorando la calidad y consistencia.
+    
+    Retorna (datos limpios, resumen de duplicados eliminados; ver summarize_duplicates).
+    """
+    # Copia diferida (copy-on-write): solo se duplican las columnas que se modifican
+    df = data.copy(deep=False)
     
     # Limpiar valores NaN críticos
     if 'Player' in df.columns:
@@ -328,12 +746,14 @@ def clean_data(data):
             df.loc[df[col] < 0, col] = 0
     
     # Limpiar duplicados
+    duplicates = summarize_duplicates(df.iloc[:0], source)
     if 'File' in df.columns or 'FileName' in df.columns:
-        file_col = 'File' if 'File' in df.columns else 'FileName'
-        # Identificar duplicados por archivo, jugador y héroe
-        subset_cols = [file_col, 'Player', 'Hero']
-        subset_cols = [col for col in subset_cols if col in df.columns]
-        df = df.drop_duplicates(subset=subset_cols, keep='first')
+        # Identificar duplicados por archivo, jugador y héroe con la clave hash de 64 bits
+        duplicated = duplicated_keys(row_keys(df))
+        if duplicated.any():
+            duplicates = summarize_duplicates(df[duplicated], source)
+            report_duplicates(duplicates)
+            df = df[~duplicated]
       # Limpiar partidas anómalamente cortas (menos de 3 minutos)
     if 'GameTime' in df.columns:
         if df['GameTime'].dtype == 'timedelta64[ns]':
@@ -350,12 +770,33 @@ def clean_data(data):
                 # En lugar de eliminar, marcar con una etiqueta
                 df.loc[short_games_mask, 'DataQuality'] = 'Short Game'
     
-    return df
+    return df, duplicates
+
+
+def summarize_duplicates(duplicates, source=None):
+    """Resumen serializable de los registros duplicados de una fuente y de cuántas partidas son"""
+    columns = key_columns(duplicates)
+    return {
+        'source': source,
+        'rows': len(duplicates),
+        'matches': int(duplicates[columns[0]].nunique()) if columns else 0,
+    }
+
+
+def report_duplicates(duplicates):
+    """Añade al footer cuántos registros duplicados aportó una fuente y de cuántas partidas"""
+    source_label = f" en {duplicates['source']}" if duplicates['source'] else ""
+    if 'footer_messages' not in st.session_state:
+        st.session_state.footer_messages = []
+    st.session_state.footer_messages.append(
+        f"🔁 Eliminados {duplicates['rows']} registros duplicados{source_label} "
+        f"({duplicates['matches']} partidas afectadas)"
+    )
 
 
 def optimize_dataset(data):
     """Optimiza el dataset eliminando columnas redundantes identificadas"""
-    df = data.copy()
+    df = data.copy(deep=False)
     
     # Lista de columnas redundantes a eliminar
     redundant_columns = [
@@ -382,3 +823,82 @@ def optimize_dataset(data):
         )
     
     return df
+
+
+# Columnas de texto con pocos valores distintos que se almacenan como category
+CATEGORICAL_COLUMNS = [
+    'Player', 'PlayerName', 'Hero', 'HeroName', 'Map', 'Role',
+    'File', 'FileName', 'GameMode', 'DataQuality'
+]
+
+# Proporción máxima de valores únicos para que una columna se convierta a category
+MAX_CATEGORY_RATIO = 0.5
+
+# int8 se evita a propósito: sumas entre columnas (HeroKills + Assists) podrían desbordarse
+MIN_INTEGER_DTYPE = 'int16'
+
+
+def apply_dtype_schema(data):
+    """Aplica el esquema de tipos compacto: categorías, Winner booleano y numéricos reducidos"""
+    for col in CATEGORICAL_COLUMNS:
+        if col in data.columns and not isinstance(data[col].dtype, pd.CategoricalDtype):
+            if data[col].nunique() <= max(len(data) * MAX_CATEGORY_RATIO, 1):
+                data[col] = data[col].astype('category')
+    
+    # Winner pasa de Yes/No a booleano anulable; los resultados desconocidos quedan como <NA>
+    if 'Winner' in data.columns and not pd.api.types.is_bool_dtype(data['Winner'].dtype):
+        known = data['Winner'].isin(['Yes', 'No'])
+        unknown_results = int((~known).sum())
+        data['Winner'] = pd.array(data['Winner'] == 'Yes', dtype='boolean')
+        data.loc[~known, 'Winner'] = pd.NA
+        if unknown_results > 0:
+            if 'footer_messages' not in st.session_state:
+                st.session_state.footer_messages = []
+            st.session_state.footer_messages.append(
+                f"⚠️ {unknown_results} registros sin resultado válido no cuentan en las tasas de victoria"
+            )
+    
+    for col in data.columns:
+        dtype = data[col].dtype
+        # Las métricas derivadas se mantienen en float32 aunque sus valores sean enteros
+        if col in FEATURE_COLUMNS:
+            continue
+        if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_float_dtype(dtype):
+            data[col] = downcast_numeric(data[col])
+    
+    return data
+
+
+def downcast_numeric(series):
+    """Reduce una columna numérica al tipo más pequeño que conserva todos sus valores"""
+    if pd.api.types.is_float_dtype(series):
+        values = series.dropna()
+        is_integral = len(values) == len(series) and (values == values.round()).all()
+        if not is_integral:
+            return series.astype('float32')
+    
+    downcasted = pd.to_numeric(series, downcast='integer')
+    if downcasted.dtype.itemsize < pd.api.types.pandas_dtype(MIN_INTEGER_DTYPE).itemsize:
+        downcasted = downcasted.astype(MIN_INTEGER_DTYPE)
+    return downcasted
+
+
+def get_memory_footprint(data):
+    """Resumen de memoria por columna con el tipo aplicado por el esquema"""
+    memory = data.memory_usage(deep=True, index=False)
+    footprint = pd.DataFrame({
+        'Columna': memory.index,
+        'Tipo': [str(data[col].dtype) for col in memory.index],
+        'Memoria (KB)': (memory.values / 1024).round(1)
+    })
+    return footprint.sort_values('Memoria (KB)', ascending=False).reset_index(drop=True)
+
+
+def report_memory_footprint(data, memory_before):
+    """Añade al footer el ahorro de memoria conseguido por el esquema de tipos"""
+    memory_after = data.memory_usage(deep=True).sum()
+    if 'footer_messages' not in st.session_state:
+        st.session_state.footer_messages = []
+    st.session_state.footer_messages.append(
+        f"💾 Esquema de tipos aplicado: {memory_before / 1024**2:.1f} MB → {memory_after / 1024**2:.1f} MB en memoria"
+    )
@@ -0,0 +1,85 @@
+"""
+Handle de dataset con token de versión
+Agrupa el DataFrame normalizado de un dataset con un token de versión derivado del hash
+del archivo de origen (y de las partidas añadidas). Las cachés se indexan por ese token
+en lugar de hashear el contenido del DataFrame, así que buscar en ellas cuesta lo mismo
+sea cual sea el tamaño del dataset
+"""
+
+import functools
+import os
+
+import streamlit as st
+
+from utils.columnar_cache import get_cache_key
+
+
+class DatasetHandle:
+    """DataFrame de un dataset con su archivo y token de versión.
+
+    frame retorna una copia superficial: añadir o reemplazar columnas en ella (assign,
+    frame[col] = ...) no altera el DataFrame compartido entre sesiones. Modificar valores
+    en el lugar solo es seguro con copy-on-write (ver pandas_options.enable_copy_on_write).
+    """
+
+    __slots__ = ('_frame', '_file_path', '_version')
+
+    def __init__(self, frame, file_path, version):
+        object.__setattr__(self, '_frame', frame)
+        object.__setattr__(self, '_file_path', file_path)
+        object.__setattr__(self, '_version', version)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DatasetHandle es inmutable")
+
+    @property
+    def frame(self):
+        return self._frame.copy(deep=False)
+
+    @property
+    def file_path(self):
+        return self._file_path
+
+    @property
+    def version(self):
+        return self._version
+
+    def __len__(self):
+        return len(self._frame)
+
+    def __repr__(self):
+        return f"DatasetHandle({self._file_path!r}, version={self._version!r}, rows={len(self._frame)})"
+
+
+@functools.lru_cache(maxsize=32)
+def _content_version(file_path, mtime_ns, size):
+    """Hash del contenido del archivo; se recalcula solo si cambian la fecha o el tamaño"""
+    return get_cache_key(file_path)
+
+
+def get_dataset_version(file_path, store_version=None):
+    """Token de versión del dataset: hash del archivo de origen más las partidas añadidas.
+
+    El hash del contenido se memoriza por (ruta, fecha de modificación, tamaño), de modo que
+    en cada rerun solo se consulta el stat del archivo.
+    """
+    stat = os.stat(file_path)
+    version = _content_version(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    return version if store_version is None else f"{version}+{store_version}"
+
+
+def _handle_token(dataset):
+    """Valor con el que st.cache_data identifica un DatasetHandle"""
+    return dataset.version
+
+
+def cache_by_dataset(function=None, **cache_kwargs):
+    """st.cache_data que identifica los DatasetHandle por su token en vez de hashear el DataFrame.
+
+    Se usa como @cache_by_dataset o @cache_by_dataset(ttl=...); el resto de argumentos
+    de la función se hashean como siempre.
+    """
+    def decorator(function):
+        return st.cache_data(hash_funcs={DatasetHandle: _handle_token}, **cache_kwargs)(function)
+
+    return decorator(function) if function is not None else decorator
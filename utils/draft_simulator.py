@@ -0,0 +1,210 @@
+"""
+Simulador de draft
+Estima la probabilidad de victoria de cada posible siguiente pick a partir de los
+winrates históricos por héroe, por pareja (aliados y rivales) y por composición de
+roles. Los huecos que faltan se completan por Monte Carlo con la tasa de pick de cada
+héroe; todos los candidatos se evalúan a la vez con operaciones vectorizadas
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.aggregates import memoize
+from utils.composition_engine import count_signatures, role_signatures
+from utils.hero_roles import classify_composition, get_all_roles, get_composition_type, get_hero_role
+from utils.match_table import TEAM_SIZE, get_match_table
+from utils.synergy_engine import build_synergy_matrices
+from utils.team_rosters import build_team_rosters
+
+# Partidas virtuales al 50% con las que se suavizan los winrates de muestras pequeñas
+PRIOR_GAMES = 10
+
+DEFAULT_SAMPLES = 200
+
+
+def smoothed_logit(wins, games, prior_games=PRIOR_GAMES):
+    """Log-odds del winrate suavizado hacia el 50%"""
+    wins = np.asarray(wins, dtype=np.float64)
+    games = np.asarray(games, dtype=np.float64)
+    winrate = (wins + prior_games / 2) / (games + prior_games)
+    return np.log(winrate / (1 - winrate))
+
+
+def build_draft_model(matches):
+    """Modelo de draft (términos en log-odds) a partir de una tabla de partidas"""
+    synergies = build_synergy_matrices(matches)
+    rosters = build_team_rosters(matches)
+
+    hero_games = synergies.hero_games
+    hero_wins = np.asarray(synergies.ally_wins.diagonal())
+    base = smoothed_logit(hero_wins, hero_games)
+
+    # Sinergia: cuánto mejora la pareja respecto a la media de sus dos héroes
+    synergy = smoothed_logit(synergies.ally_wins.toarray(), synergies.ally_games.toarray())
+    synergy -= (base[:, None] + base[None, :]) / 2
+    np.fill_diagonal(synergy, 0)
+
+    # Counter: cuánto cambia el winrate del héroe fila frente al héroe columna
+    counter = smoothed_logit(synergies.enemy_wins.toarray(), synergies.enemy_games.toarray()) - base[:, None]
+
+    # Composición de roles: winrate de cada firma de conteos por rol
+    signatures = count_signatures(rosters.role_counts)
+    codes, unique_signatures = pd.factorize(signatures)
+    role_games = np.bincount(codes, minlength=len(unique_signatures))
+    role_wins = np.bincount(codes, weights=rosters.won.astype(np.float64), minlength=len(unique_signatures))
+    role_logits = smoothed_logit(role_wins, role_games) - smoothed_logit(role_wins.sum(), role_games.sum())
+    role_terms = pd.Series(role_logits, index=unique_signatures)
+
+    hero_role_codes = matches.hero_role_codes(np.arange(len(matches.hero_categories)))
+    return DraftModel(matches.hero_categories, base, synergy, counter, hero_games, hero_role_codes, role_terms)
+
+
+class DraftModel:
+    """Términos en log-odds por héroe, pareja y composición, con la tasa de pick de cada héroe"""
+
+    def __init__(self, hero_names, base, synergy, counter, hero_games, hero_role_codes, role_terms):
+        self.hero_names = pd.Index(hero_names)
+        self.base = base
+        self.synergy = synergy
+        self.counter = counter
+        self.hero_games = hero_games
+        self.hero_role_codes = hero_role_codes
+        self.role_terms = role_terms
+
+    @property
+    def n_heroes(self):
+        return len(self.hero_names)
+
+    @property
+    def nbytes(self):
+        return self.synergy.nbytes + self.counter.nbytes + self.base.nbytes + self.role_terms.memory_usage()
+
+    def pick_rates(self):
+        """Probabilidad de pick de cada héroe, usada para completar los huecos"""
+        games = self.hero_games.astype(np.float64) + 1
+        return games / games.sum()
+
+    def team_logit(self, allies, enemies):
+        """Log-odds de victoria de equipos completos (n, 5) frente a sus rivales (n, 5)"""
+        pairs = TEAM_SIZE * (TEAM_SIZE - 1)
+        strength = self.base[allies].mean(axis=1) - self.base[enemies].mean(axis=1)
+        strength += self.synergy[allies[:, :, None], allies[:, None, :]].sum(axis=(1, 2)) / pairs
+        strength -= self.synergy[enemies[:, :, None], enemies[:, None, :]].sum(axis=(1, 2)) / pairs
+        # Ventaja de cada aliado frente a cada rival menos la del rival frente al aliado
+        matchups = self.counter[allies[:, :, None], enemies[:, None, :]]
+        matchups = matchups - self.counter[enemies[:, None, :], allies[:, :, None]]
+        strength += matchups.mean(axis=(1, 2)) / 2
+        strength += self.role_term(allies) - self.role_term(enemies)
+        return strength
+
+    def role_term(self, teams):
+        """Término de composición de roles de cada equipo; 0 si la composición no se ha visto"""
+        signatures = role_signatures(self.hero_role_codes[teams], len(get_all_roles()))
+        positions = self.role_terms.index.get_indexer(signatures)
+        return np.where(positions >= 0, self.role_terms.to_numpy()[positions], 0.0)
+
+
+def sample_fills(model, candidates, picked, n_ally, n_enemy, n_samples, rng, bans=()):
+    """Completa los huecos libres para cada candidato: (candidatos, muestras, n_ally + n_enemy).
+
+    Todos los candidatos comparten las mismas muestras (números aleatorios comunes), lo
+    que reduce la varianza al compararlos y evita generar una muestra por candidato. Los
+    héroes ya elegidos (picked) y los baneados (bans) nunca ocupan un hueco.
+    """
+    n_fill = n_ally + n_enemy
+    if n_fill == 0:
+        return np.empty((len(candidates), n_samples, 0), dtype=np.int64)
+
+    # Muestreo sin reemplazo por Gumbel top-k: se toma un héroe extra por si el candidato sale
+    log_rates = np.log(model.pick_rates())
+    log_rates[picked] = -np.inf
+    log_rates[np.asarray(bans, dtype=np.int64)] = -np.inf
+    keys = log_rates + rng.gumbel(size=(n_samples, model.n_heroes))
+    top = np.argpartition(-keys, n_fill, axis=1)[:, :n_fill + 1]
+    top = np.take_along_axis(top, np.argsort(-np.take_along_axis(keys, top, axis=1), axis=1), axis=1)
+
+    # Si el candidato está entre los primeros n_fill, los héroes siguientes avanzan un puesto
+    is_candidate = top[None, :, :n_fill] == candidates[:, None, None]
+    position = np.where(is_candidate.any(axis=2), is_candidate.argmax(axis=2), n_fill)
+    slots = np.arange(n_fill)
+    shifted = slots[None, None, :] + (slots[None, None, :] >= position[:, :, None])
+    return np.take_along_axis(np.broadcast_to(top, (len(candidates),) + top.shape), shifted, axis=2)
+
+
+def evaluate_candidates(model, candidates, allies, enemies, n_samples, seed, bans=()):
+    """Probabilidad media de victoria y su desviación para cada candidato"""
+    rng = np.random.default_rng(seed)
+    n_ally = TEAM_SIZE - len(allies) - 1
+    n_enemy = TEAM_SIZE - len(enemies)
+    fills = sample_fills(
+        model, candidates, np.r_[allies, enemies].astype(np.int64), n_ally, n_enemy, n_samples, rng, bans=bans
+    )
+
+    n_candidates = len(candidates)
+    shape = (n_candidates, n_samples)
+    ally_teams = np.concatenate([
+        np.broadcast_to(np.asarray(allies, dtype=np.int64), shape + (len(allies),)),
+        np.broadcast_to(np.asarray(candidates, dtype=np.int64)[:, None, None], shape + (1,)),
+        fills[:, :, :n_ally]
+    ], axis=2).reshape(-1, TEAM_SIZE)
+    enemy_teams = np.concatenate([
+        np.broadcast_to(np.asarray(enemies, dtype=np.int64), shape + (len(enemies),)),
+        fills[:, :, n_ally:]
+    ], axis=2).reshape(-1, TEAM_SIZE)
+
+    probabilities = 1 / (1 + np.exp(-model.team_logit(ally_teams, enemy_teams)))
+    probabilities = probabilities.reshape(shape)
+    return probabilities.mean(axis=1), probabilities.std(axis=1)
+
+
+def simulate_draft(model, allies, enemies, bans=(), n_samples=DEFAULT_SAMPLES, seed=0, n_jobs=1):
+    """Ranking de los posibles siguientes picks aliados por probabilidad estimada de victoria.
+
+    allies y enemies son los héroes ya elegidos (nombres). Con n_jobs > 1 los candidatos
+    se reparten entre procesos, útil con muchas muestras.
+    """
+    ally_codes = model.hero_names.get_indexer(list(allies))
+    enemy_codes = model.hero_names.get_indexer(list(enemies))
+    ally_codes, enemy_codes = ally_codes[ally_codes >= 0], enemy_codes[enemy_codes >= 0]
+    if len(ally_codes) >= TEAM_SIZE or len(enemy_codes) > TEAM_SIZE:
+        return pd.DataFrame(columns=['Hero', 'Role', 'WinProbability', 'Std', 'Games', 'Composition'])
+
+    ban_codes = model.hero_names.get_indexer(list(bans))
+    ban_codes = ban_codes[ban_codes >= 0].astype(np.int64)
+    unavailable = set(ally_codes) | set(enemy_codes) | set(ban_codes)
+    candidates = np.array([code for code in range(model.n_heroes) if code not in unavailable], dtype=np.int64)
+
+    if n_jobs > 1 and len(candidates) > n_jobs:
+        chunks = np.array_split(candidates, n_jobs)
+        # La misma semilla en cada proceso: todos los candidatos se comparan sobre las mismas muestras
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            results = list(executor.map(
+                evaluate_candidates,
+                [model] * n_jobs, chunks, [ally_codes] * n_jobs, [enemy_codes] * n_jobs,
+                [n_samples] * n_jobs, [seed] * n_jobs, [ban_codes] * n_jobs
+            ))
+        mean = np.concatenate([result[0] for result in results])
+        std = np.concatenate([result[1] for result in results])
+    else:
+        mean, std = evaluate_candidates(model, candidates, ally_codes, enemy_codes, n_samples, seed, bans=ban_codes)
+
+    names = model.hero_names[candidates]
+    result = pd.DataFrame({
+        'Hero': names,
+        'Role': [get_hero_role(hero) for hero in names],
+        'WinProbability': mean,
+        'Std': std,
+        'Games': model.hero_games[candidates].astype(np.int64)
+    })
+    # Con el quinto pick aliado la composición queda cerrada
+    if len(ally_codes) == TEAM_SIZE - 1:
+        current = list(model.hero_names[ally_codes])
+        result['Composition'] = [get_composition_type(classify_composition(current + [hero])) for hero in names]
+    return result.sort_values('WinProbability', ascending=False).reset_index(drop=True)
+
+
+def get_draft_model(data):
+    """Modelo de draft de las partidas presentes en data, memorizado por firma de filtros"""
+    return memoize(data, 'draft_model', lambda frame: build_draft_model(get_match_table(frame)))
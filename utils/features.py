@@ -0,0 +1,148 @@
+"""
+Métricas derivadas por fila
+KDA, K/D y tasas por minuto (daño, curación, XP, takedowns, muertes) calculadas una
+sola vez al procesar el dataset, de forma vectorizada y en float32, a partir de la
+duración de la partida en segundos, y cuotas respecto al equipo (participación en
+kills, daño, curación y muertes) con una sola agregación por partida y lado. Se
+guardan en la caché columnar junto al resto de columnas, así que las pestañas las
+leen en lugar de recalcularlas
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.match_table import N_SIDES, TEAM_SIZE, compute_match_keys, get_team_sides
+
+# Duración de la partida en minutos; nula si GameTime falta o no es positivo
+GAME_MINUTES_COLUMN = 'GameMinutes'
+
+# Métrica por minuto -> columnas de origen posibles, en orden de preferencia
+PER_MINUTE_SOURCES = {
+    'HeroDmgPerMin': ['HeroDmg'],
+    'SiegeDmgPerMin': ['SiegeDmg'],
+    'HealingPerMin': ['Healing'],
+    'DmgTakenPerMin': ['DmgTaken'],
+    'XPPerMin': ['Experience', 'XP'],
+    'TakedownsPerMin': ['Takedowns'],
+    'DeathsPerMin': ['Deaths'],
+}
+
+# Cuota respecto al equipo -> (columna del jugador, columna cuyo total por equipo es el denominador)
+SHARE_SOURCES = {
+    'KillParticipation': ('Takedowns', 'HeroKills'),
+    'DamageShare': ('HeroDmg', 'HeroDmg'),
+    'HealingShare': ('Healing', 'Healing'),
+    'DeathShare': ('Deaths', 'Deaths'),
+}
+
+# Nombres de las cuotas para los selectores de métricas
+SHARE_METRICS = {
+    'KillParticipation': 'Participación en Kills',
+    'DamageShare': '% Daño del Equipo',
+    'HealingShare': '% Curación del Equipo',
+    'DeathShare': '% Muertes del Equipo',
+}
+
+# Columnas que puede añadir add_derived_features
+FEATURE_COLUMNS = [GAME_MINUTES_COLUMN, 'KDA', 'KD'] + list(PER_MINUTE_SOURCES) + list(SHARE_SOURCES)
+
+
+def as_float32(series):
+    """Valores de una columna como array float32, con NaN para los nulos"""
+    return series.to_numpy(dtype=np.float32, na_value=np.nan)
+
+
+def compute_game_minutes(data):
+    """Minutos de cada partida a partir de GameTime; None si la columna no existe"""
+    if 'GameTime' not in data.columns:
+        return None
+    game_time = data['GameTime']
+    if pd.api.types.is_timedelta64_dtype(game_time):
+        seconds = game_time.to_numpy() / np.timedelta64(1, 's')
+    else:
+        seconds = pd.to_timedelta(game_time, errors='coerce').to_numpy() / np.timedelta64(1, 's')
+    minutes = (seconds / 60).astype(np.float32)
+    # Sin duración válida las tasas quedan nulas en lugar de infinitas
+    minutes[~(minutes > 0)] = np.nan
+    return minutes
+
+
+def compute_derived_features(data):
+    """Métricas derivadas de cada fila como {columna: array float32}, solo las que admite el dataset"""
+    features = {}
+
+    if 'HeroKills' in data.columns and 'Deaths' in data.columns:
+        kills = as_float32(data['HeroKills'])
+        deaths = np.maximum(as_float32(data['Deaths']), np.float32(1))
+        if 'Assists' in data.columns:
+            features['KDA'] = (kills + as_float32(data['Assists'])) / deaths
+        features['KD'] = kills / deaths
+
+    minutes = compute_game_minutes(data)
+    if minutes is not None:
+        features[GAME_MINUTES_COLUMN] = minutes
+        for feature, sources in PER_MINUTE_SOURCES.items():
+            source = next((column for column in sources if column in data.columns), None)
+            if source is not None:
+                features[feature] = as_float32(data[source]) / minutes
+
+    features.update(compute_team_shares(data))
+    return features
+
+
+def compute_team_shares(data):
+    """Cuotas de cada jugador sobre el total de su equipo en la partida, como {columna: array float32}.
+    
+    Los totales de todas las cuotas salen de una única agregación transform sobre
+    (partida, lado); las filas sin replay, con total de equipo nulo o de partidas cuyos
+    lados no son de 5 contra 5 (p. ej. sin Team y con resultado desconocido, todos caen
+    del mismo lado) quedan en NaN.
+    """
+    shares = {share: sources for share, sources in SHARE_SOURCES.items()
+              if all(column in data.columns for column in sources)}
+    if not shares:
+        return {}
+
+    match_keys = compute_match_keys(data).astype(np.int64)
+    team_keys = np.where(match_keys >= 0, match_keys * N_SIDES + get_team_sides(data), -1)
+    if (team_keys < 0).all():
+        return {}
+
+    totals_columns = sorted({total for _, total in shares.values()})
+    team_totals = (
+        data[totals_columns]
+        .astype(np.float32)
+        .groupby(team_keys, sort=False)
+        .transform('sum')
+    )
+    # Solo se confía en el reparto por lados de las partidas con dos equipos completos
+    side_sizes = np.bincount(team_keys[team_keys >= 0], minlength=(match_keys.max() + 1) * N_SIDES)
+    complete = (side_sizes.reshape(-1, N_SIDES) == TEAM_SIZE).all(axis=1)
+    no_team = (team_keys < 0) | ~complete[np.maximum(match_keys, 0)]
+
+    features = {}
+    for share, (value, total) in shares.items():
+        totals = team_totals[total].to_numpy(dtype=np.float32)
+        totals = np.where(no_team | (totals == 0), np.float32(np.nan), totals)
+        features[share] = as_float32(data[value]) / totals
+    return features
+
+
+def add_derived_features(data):
+    """Añade al DataFrame las métricas derivadas por fila"""
+    return data.assign(**compute_derived_features(data))
+
+
+def has_derived_features(data):
+    """True si el DataFrame ya tiene las métricas derivadas (partes guardadas con versiones antiguas no)"""
+    return all(column in data.columns for column in FEATURE_COLUMNS)
+
+
+def get_feature_column(data, feature):
+    """Métrica derivada precalculada por el cargador o, si falta, calculada al vuelo"""
+    if feature in data.columns:
+        return data[feature]
+    values = compute_derived_features(data).get(feature)
+    if values is None:
+        raise KeyError(feature)
+    return pd.Series(values, index=data.index, name=feature)
@@ -0,0 +1,248 @@
+"""
+Motor de filtros del dashboard
+Combina todos los filtros activos en una única máscara booleana calculada sobre
+códigos de categoría y números de día precalculados, sin copias intermedias
+"""
+
+import copy
+
+import numpy as np
+import pandas as pd
+
+
+# Columnas que aceptan filtros de selección múltiple
+FILTER_DIMENSIONS = ['Player', 'Role', 'Map', 'Hero']
+
+# Valor usado para fechas inválidas; nunca cae dentro de un rango
+_MISSING_DAY = np.iinfo(np.int32).min
+
+
+def encode_column(series):
+    """Obtiene códigos enteros y categorías (como texto) de una columna"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        categories = series.cat.categories
+    else:
+        codes, categories = pd.factorize(series)
+    # Los filtros comparan como texto, igual que las opciones del multiselect
+    return codes, pd.Index(categories).astype(str)
+
+
+def extend_codes(categories, series):
+    """Códigos de filas nuevas respecto a unas categorías existentes, añadiendo al final las que falten"""
+    codes, new_categories = encode_column(series)
+    categories = categories.append(new_categories.difference(categories, sort=False))
+    # La última posición atiende a los nulos (-1)
+    lookup = np.append(categories.get_indexer(new_categories), -1)
+    return lookup[codes], categories
+
+
+def encode_days(series):
+    """Convierte una columna de fechas a número de día (int32) desde la época"""
+    dates = pd.to_datetime(series, errors='coerce')
+    days = dates.to_numpy(dtype='datetime64[D]').astype(np.int64)
+    days[dates.isna().to_numpy()] = _MISSING_DAY
+    return days.astype(np.int32)
+
+
+def date_to_day(value):
+    """Número de día de una fecha individual"""
+    return int(np.datetime64(pd.Timestamp(value).date(), 'D').astype(np.int64))
+
+
+def build_postings(codes, n_categories):
+    """Índice invertido en formato CSR: filas ordenadas por código y desplazamientos por código"""
+    order = np.argsort(codes, kind='stable').astype(np.int32)
+    # El desplazamiento se corre una posición para reservar la primera a los nulos (-1)
+    counts = np.bincount(codes.astype(np.int64) + 1, minlength=n_categories + 1)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    return order, offsets
+
+
+def append_postings(postings, codes, first_row, n_categories):
+    """Añade al índice CSR filas nuevas (numeradas desde first_row) sin reordenar las existentes.
+    
+    Cada fila nueva se inserta al final del tramo de su código, donde la dejaría el
+    argsort estable del conjunto completo.
+    """
+    order, offsets = postings
+    offsets = np.concatenate([offsets, np.full(n_categories + 2 - len(offsets), offsets[-1])])
+    new_order = np.argsort(codes, kind='stable')
+    positions = offsets[codes[new_order].astype(np.int64) + 2]
+    order = np.insert(order, positions, (new_order + first_row).astype(np.int32))
+    counts = np.bincount(codes.astype(np.int64) + 1, minlength=n_categories + 1)
+    return order, offsets + np.concatenate([[0], np.cumsum(counts)])
+
+
+class FilterEngine:
+    """Evalúa filtros sobre representaciones compactas precalculadas de un dataset.
+    
+    Además de las máscaras mantiene un índice invertido por dimensión (valor → filas
+    ordenadas) para que las consultas selectivas cuesten en proporción al resultado.
+    """
+
+    # Si la consulta más selectiva supera esta fracción del dataset se usa la máscara completa
+    DENSE_FRACTION = 0.1
+
+    def __init__(self, data):
+        self.n_rows = len(data)
+        self.dimensions = {}
+        self.postings = {}
+        for column in FILTER_DIMENSIONS:
+            if column in data.columns:
+                codes, categories = encode_column(data[column])
+                self.dimensions[column] = (codes, categories)
+                self.postings[column] = build_postings(codes, len(categories))
+
+        self.days = None
+        if 'Date' in data.columns:
+            self.days = encode_days(data['Date'])
+            self.day_order = np.argsort(self.days, kind='stable').astype(np.int32)
+            self.sorted_days = self.days[self.day_order]
+
+    def can_append(self, data):
+        """Indica si las filas nuevas tienen las mismas dimensiones que el motor"""
+        dimensions = {column for column in FILTER_DIMENSIONS if column in data.columns}
+        return dimensions == set(self.dimensions) and (self.days is None) == ('Date' not in data.columns)
+
+    def append(self, data):
+        """Motor con filas nuevas añadidas al final, sin recalcular las existentes (ver can_append).
+        
+        El coste de codificar e indexar es proporcional a las filas nuevas; el motor
+        original no se modifica.
+        """
+        engine = copy.copy(self)
+        engine.n_rows = self.n_rows + len(data)
+        engine.dimensions = {}
+        engine.postings = {}
+        for column, (codes, categories) in self.dimensions.items():
+            new_codes, categories = extend_codes(categories, data[column])
+            engine.dimensions[column] = (np.concatenate([codes, new_codes]), categories)
+            engine.postings[column] = append_postings(self.postings[column], new_codes, self.n_rows, len(categories))
+
+        if self.days is not None:
+            new_days = encode_days(data['Date'])
+            new_order = np.argsort(new_days, kind='stable')
+            positions = np.searchsorted(self.sorted_days, new_days[new_order], side='right')
+            engine.days = np.concatenate([self.days, new_days])
+            engine.day_order = np.insert(self.day_order, positions, (new_order + self.n_rows).astype(np.int32))
+            engine.sorted_days = np.insert(self.sorted_days, positions, new_days[new_order])
+        return engine
+
+    def selected_codes(self, column, values):
+        """Códigos de los valores seleccionados que existen en la dimensión"""
+        _, categories = self.dimensions[column]
+        selected = categories.get_indexer([str(v) for v in values])
+        return np.unique(selected[selected >= 0])
+
+    def parse_filters(self, filters, on_error=None):
+        """Traduce el diccionario de filtros a predicados (columna, códigos o rango de días).
+        
+        Con on_error, un filtro que no puede interpretarse se omite y se notifica como
+        on_error(clave, excepción) sin descartar el resto; sin él, la excepción se propaga.
+        """
+        predicates = []
+
+        def add_predicate(key, build):
+            try:
+                predicate = build()
+            except Exception as error:
+                if on_error is None:
+                    raise
+                on_error(key, error)
+                return
+            if predicate is not None:
+                predicates.append(predicate)
+
+        # Filtro especial Geekos
+        if filters.get('_geeko_filter', False) and filters.get('_geeko_players') and 'Player' in self.dimensions:
+            add_predicate('_geeko_filter', lambda: ('Player', self.selected_codes('Player', filters['_geeko_players'])))
+
+        for column, filter_vals in filters.items():
+            # Saltar filtros especiales internos
+            if column.startswith('_') or not filter_vals:
+                continue
+            add_predicate(column, lambda: self.parse_filter(column, filter_vals))
+
+        return predicates
+
+    def parse_filter(self, column, filter_vals):
+        """Predicado de un filtro regular; None si la columna no se indexa o el valor no aplica"""
+        if column == 'Date':
+            if self.days is not None and hasattr(filter_vals, '__len__') and len(filter_vals) == 2:
+                start_date, end_date = filter_vals
+                return ('Date', (date_to_day(start_date), date_to_day(end_date)))
+        elif column in self.dimensions and isinstance(filter_vals, (list, tuple)):
+            return (column, self.selected_codes(column, filter_vals))
+        return None
+
+    def predicate_mask(self, column, payload, rows=None):
+        """Evalúa un predicado sobre todas las filas o solo sobre las posiciones indicadas"""
+        if column == 'Date':
+            start_day, end_day = payload
+            days = self.days if rows is None else self.days[rows]
+            return (days >= start_day) & (days <= end_day)
+
+        codes, categories = self.dimensions[column]
+        # Tabla de búsqueda por código; la última posición atiende a los nulos (-1)
+        lookup = np.zeros(len(categories) + 1, dtype=bool)
+        lookup[payload] = True
+        return lookup[codes if rows is None else codes[rows]]
+
+    def day_range(self, start_day, end_day):
+        """Tramo del orden por fecha que cubre el rango de días"""
+        left = int(np.searchsorted(self.sorted_days, start_day, side='left'))
+        right = int(np.searchsorted(self.sorted_days, end_day, side='right'))
+        return left, max(left, right)
+
+    def estimate_rows(self, column, payload):
+        """Número de filas que cumple un predicado, leído directamente del índice"""
+        if column == 'Date':
+            left, right = self.day_range(*payload)
+            return right - left
+
+        _, offsets = self.postings[column]
+        return int((offsets[payload + 2] - offsets[payload + 1]).sum())
+
+    def posting_rows(self, column, payload):
+        """Filas (sin ordenar) que cumplen un predicado, obtenidas del índice invertido"""
+        if column == 'Date':
+            left, right = self.day_range(*payload)
+            return self.day_order[left:right]
+
+        order, offsets = self.postings[column]
+        if len(payload) == 0:
+            return order[:0]
+        return np.concatenate([order[offsets[code + 1]:offsets[code + 2]] for code in payload])
+
+    def build_mask(self, filters):
+        """Combina todos los filtros activos en una sola máscara; None si no hay ninguno"""
+        return self.combine_predicates(self.parse_filters(filters))
+
+    def combine_predicates(self, predicates):
+        """Máscara con la conjunción de los predicados; None si no hay ninguno"""
+        mask = None
+        for column, payload in predicates:
+            predicate = self.predicate_mask(column, payload)
+            mask = predicate if mask is None else mask & predicate
+        return mask
+
+    def select_rows(self, filters, on_error=None):
+        """Posiciones de las filas que cumplen los filtros; None si no hay filtros activos"""
+        predicates = self.parse_filters(filters, on_error=on_error)
+        if not predicates:
+            return None
+
+        # El predicado más selectivo decide entre índice invertido o máscara completa
+        estimates = [self.estimate_rows(column, payload) for column, payload in predicates]
+        driver = int(np.argmin(estimates))
+        if estimates[driver] > self.n_rows * self.DENSE_FRACTION:
+            mask = self.combine_predicates(predicates)
+            return np.flatnonzero(mask)
+
+        # Candidatos desde el índice y comprobación vectorizada del resto de predicados
+        rows = self.posting_rows(*predicates[driver])
+        for position, (column, payload) in enumerate(predicates):
+            if position != driver and len(rows) > 0:
+                rows = rows[self.predicate_mask(column, payload, rows)]
+        return np.sort(rows)
@@ -0,0 +1,274 @@
+"""
+Tabla de partidas
+Reconstruye una vez por dataset la entidad partida (un replay, dos equipos de cinco)
+a partir de las filas por jugador: héroes y roles de cada equipo en arrays enteros de
+ancho fijo, equipo ganador, mapa y duración, enlazados a las filas con la clave MatchKey
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.aggregates import get_query
+from utils.filter_engine import encode_column
+from utils.hero_roles import get_all_roles, get_hero_roles
+
+MATCH_KEY_COLUMN = 'MatchKey'
+TEAM_SIZE = 5
+N_SIDES = 2
+
+# Código para huecos vacíos de un equipo y para héroes o roles desconocidos
+EMPTY_SLOT = -1
+
+# Columnas por partida que se copian de la primera fila de cada replay
+MATCH_COLUMNS = ['File', 'FileName', 'Map', 'Date', 'StartDateTime', 'GameTime', 'GameMode']
+
+
+def get_file_column(data):
+    """Columna que identifica el replay de cada fila; None si no existe"""
+    if 'File' in data.columns:
+        return 'File'
+    if 'FileName' in data.columns:
+        return 'FileName'
+    return None
+
+
+def compute_match_keys(data):
+    """Clave entera de partida por fila (código del replay); -1 si no tiene replay"""
+    file_col = get_file_column(data)
+    if file_col is None:
+        return np.full(len(data), EMPTY_SLOT, dtype=np.int32)
+    codes, _ = encode_column(data[file_col])
+    return codes.astype(np.int32)
+
+
+def get_match_keys(data):
+    """Claves de partida de las filas, reutilizando MatchKey si el dataset ya la tiene"""
+    if MATCH_KEY_COLUMN in data.columns:
+        return data[MATCH_KEY_COLUMN].to_numpy()
+    return compute_match_keys(data)
+
+
+def get_team_sides(data):
+    """Lado (0 o 1) de cada jugador: columna Team si existe; si no, ganadores frente a perdedores"""
+    if 'Team' in data.columns:
+        sides, _ = pd.factorize(data['Team'], sort=True)
+        return np.clip(sides, 0, N_SIDES - 1).astype(np.int8)
+    if 'Winner' in data.columns:
+        # Los resultados desconocidos (<NA>) van con los perdedores; esas partidas no quedan 5v5
+        return np.where(data['Winner'].to_numpy(dtype=bool, na_value=False), 0, 1).astype(np.int8)
+    return np.zeros(len(data), dtype=np.int8)
+
+
+def get_role_lookup(hero_categories):
+    """Código (en get_all_roles) del rol de cada categoría de héroe según get_hero_roles"""
+    hero_roles = get_hero_roles()
+    all_roles = get_all_roles()
+    return np.array(
+        [all_roles.index(hero_roles[hero]) if hero_roles.get(hero) in all_roles else EMPTY_SLOT
+         for hero in hero_categories],
+        dtype=np.int8
+    )
+
+
+def build_match_table(data, match_keys=None):
+    """Construye la tabla de partidas de un dataset de filas por jugador"""
+    if match_keys is None:
+        match_keys = get_match_keys(data)
+    match_keys = np.asarray(match_keys, dtype=np.int64)
+    valid = match_keys >= 0
+    n_matches = int(match_keys.max()) + 1 if valid.any() else 0
+    sides = get_team_sides(data).astype(np.int64)
+
+    # Posición de cada jugador dentro de su equipo, en el orden de las filas
+    groups = np.where(valid, match_keys * N_SIDES + sides, -1)
+    order = np.argsort(groups, kind='stable')
+    sorted_groups = groups[order]
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    group_sizes = np.diff(np.r_[starts, len(order)])
+    slots = np.empty(len(order), dtype=np.int64)
+    slots[order] = np.arange(len(order)) - np.repeat(starts, group_sizes)
+    fits = valid & (slots < TEAM_SIZE)
+
+    hero_codes, hero_categories = encode_column(data['Hero'])
+    heroes = np.full((n_matches, N_SIDES, TEAM_SIZE), EMPTY_SLOT, dtype=np.int16)
+    heroes[match_keys[fits], sides[fits], slots[fits]] = hero_codes[fits]
+
+    roles, role_categories = None, None
+    if 'Role' in data.columns:
+        role_codes, role_categories = encode_column(data['Role'])
+        roles = np.full((n_matches, N_SIDES, TEAM_SIZE), EMPTY_SLOT, dtype=np.int8)
+        roles[match_keys[fits], sides[fits], slots[fits]] = role_codes[fits]
+
+    team_sizes = np.bincount(groups[valid], minlength=n_matches * N_SIDES).reshape(n_matches, N_SIDES)
+    team_won = np.zeros((n_matches, N_SIDES), dtype=bool)
+    if 'Winner' in data.columns:
+        wins = np.bincount(groups[valid], weights=data['Winner'].to_numpy(dtype=bool, na_value=False)[valid],
+                           minlength=n_matches * N_SIDES)
+        team_won = wins.reshape(n_matches, N_SIDES) > 0
+    winner_side = np.where(team_won[:, 0] & ~team_won[:, 1], 0,
+                           np.where(team_won[:, 1] & ~team_won[:, 0], 1, EMPTY_SLOT)).astype(np.int8)
+
+    # Solo se conservan las claves con filas; los atributos salen de la primera fila del replay
+    present_keys, first_rows = np.unique(match_keys[valid], return_index=True)
+    first_rows = np.flatnonzero(valid)[first_rows]
+    frame = data[[column for column in MATCH_COLUMNS if column in data.columns]].iloc[first_rows]
+    frame = frame.reset_index(drop=True)
+    frame.insert(0, MATCH_KEY_COLUMN, present_keys.astype(np.int32))
+    frame['WinnerSide'] = winner_side[present_keys]
+    frame['Players'] = team_sizes[present_keys].sum(axis=1).astype(np.int16)
+
+    return MatchTable(
+        frame,
+        heroes[present_keys],
+        None if roles is None else roles[present_keys],
+        team_sizes[present_keys].astype(np.int16),
+        team_won[present_keys],
+        hero_categories,
+        role_categories
+    )
+
+
+def extend_match_table(matches, data, rows):
+    """Tabla de partidas tras añadir rows al final de data, sin reconstruir las ya existentes.
+    
+    Solo se construyen las partidas que tocan las filas nuevas, con claves compactas para
+    que el coste sea proporcional a ellas; si alguna ya estaba en la tabla se reconstruye
+    con todas sus filas de data.
+    """
+    row_keys = np.asarray(get_match_keys(rows), dtype=np.int64)
+    new_keys = np.unique(row_keys[row_keys >= 0])
+    if len(new_keys) == 0:
+        return matches
+    if np.isin(new_keys, matches.keys).any():
+        data_keys = np.asarray(get_match_keys(data), dtype=np.int64)
+        rows = data.iloc[np.flatnonzero(np.isin(data_keys, new_keys))]
+        row_keys = data_keys[np.isin(data_keys, new_keys)]
+
+    compact_keys = np.where(row_keys >= 0, np.searchsorted(new_keys, row_keys), EMPTY_SLOT)
+    added = build_match_table(rows, compact_keys)
+    added.frame = added.frame.assign(**{MATCH_KEY_COLUMN: new_keys[added.keys].astype(np.int32)})
+    return matches.merge(added)
+
+
+def union_categories(first, second):
+    """Categorías de first seguidas de las de second que no estén en first"""
+    return first.append(second.difference(first, sort=False))
+
+
+def recode(codes, categories, target):
+    """Traduce códigos de unas categorías a otras; los huecos vacíos se mantienen"""
+    lookup = np.append(target.get_indexer(categories), EMPTY_SLOT).astype(codes.dtype)
+    return lookup[codes]
+
+
+class MatchTable:
+    """Partidas con los héroes y roles de cada equipo en arrays (partida, lado, hueco)"""
+
+    def __init__(self, frame, heroes, roles, team_sizes, team_won, hero_categories, role_categories):
+        self.frame = frame
+        self.heroes = heroes
+        self.roles = roles
+        self.team_sizes = team_sizes
+        self.team_won = team_won
+        self.hero_categories = hero_categories
+        self.role_categories = role_categories
+
+    @property
+    def n_matches(self):
+        return len(self.frame)
+
+    @property
+    def keys(self):
+        return self.frame[MATCH_KEY_COLUMN].to_numpy()
+
+    def subset(self, match_keys):
+        """Tabla con solo las partidas indicadas (claves MatchKey)"""
+        return self.subset_positions(np.flatnonzero(np.isin(self.keys, match_keys)))
+
+    def subset_positions(self, positions):
+        """Tabla con las partidas de las posiciones indicadas, en ese orden"""
+        return MatchTable(
+            self.frame.iloc[positions].reset_index(drop=True),
+            self.heroes[positions],
+            None if self.roles is None else self.roles[positions],
+            self.team_sizes[positions],
+            self.team_won[positions],
+            self.hero_categories,
+            self.role_categories
+        )
+
+    def merge(self, other):
+        """Tabla con las partidas de ambas; las de other sustituyen a las de esta con la misma clave.
+        
+        Las categorías de héroe y rol de esta tabla se amplían al final con las de other,
+        así que solo se traducen los códigos de other.
+        """
+        keep = np.flatnonzero(~np.isin(self.keys, other.keys))
+        hero_categories = union_categories(self.hero_categories, other.hero_categories)
+        heroes = np.concatenate([self.heroes[keep], recode(other.heroes, other.hero_categories, hero_categories)])
+
+        roles, role_categories = None, None
+        if self.roles is not None and other.roles is not None:
+            role_categories = union_categories(self.role_categories, other.role_categories)
+            roles = np.concatenate([self.roles[keep], recode(other.roles, other.role_categories, role_categories)])
+
+        # Columnas categóricas con la unión de categorías para que concat no las convierta en object;
+        # las de esta tabla quedan al principio, así que sus códigos se reutilizan
+        frame, other_frame = self.frame.iloc[keep], other.frame
+        own, others = {}, {}
+        for column in frame.columns.intersection(other_frame.columns):
+            dtype, other_dtype = frame[column].dtype, other_frame[column].dtype
+            if isinstance(dtype, pd.CategoricalDtype) and isinstance(other_dtype, pd.CategoricalDtype) and dtype != other_dtype:
+                union = pd.CategoricalDtype(union_categories(dtype.categories, other_dtype.categories))
+                own[column] = pd.Categorical.from_codes(frame[column].cat.codes.to_numpy(), dtype=union)
+                others[column] = other_frame[column].astype(union)
+        frame = pd.concat([frame.assign(**own), other_frame.assign(**others)], ignore_index=True)
+
+        merged = MatchTable(
+            frame,
+            heroes,
+            roles,
+            np.concatenate([self.team_sizes[keep], other.team_sizes]),
+            np.concatenate([self.team_won[keep], other.team_won]),
+            hero_categories,
+            role_categories
+        )
+        # Las partidas se mantienen ordenadas por clave, como en build_match_table
+        keys = merged.keys
+        if len(keys) > 1 and (np.diff(keys) < 0).any():
+            return merged.subset_positions(np.argsort(keys, kind='stable'))
+        return merged
+
+    def complete_teams(self):
+        """Máscara (partida, lado) de los equipos con exactamente cinco jugadores"""
+        return self.team_sizes == TEAM_SIZE
+
+    def teams(self, complete_only=True):
+        """Equipos como filas: héroes (n, 5), roles (n, 5) o None, y si ganaron (n,)"""
+        mask = self.complete_teams() if complete_only else self.team_sizes > 0
+        roles = None if self.roles is None else self.roles[mask]
+        return self.heroes[mask], roles, self.team_won[mask]
+
+    def hero_role_codes(self, heroes):
+        """Roles (según get_hero_roles) de un array de códigos de héroe"""
+        lookup = np.append(get_role_lookup(self.hero_categories), EMPTY_SLOT)
+        return lookup[heroes]
+
+
+def get_match_table(data):
+    """Tabla de las partidas presentes en data.
+
+    Si data proviene de apply_filters se reutiliza la tabla del dataset completo (los
+    equipos quedan completos aunque los filtros dejen fuera a algunos jugadores); si no,
+    se construye a partir de data.
+    """
+    query = get_query(data)
+    matches = query['resources'].get('matches') if query is not None else None
+    if matches is None:
+        return build_match_table(data)
+
+    match_keys = np.unique(get_match_keys(data))
+    match_keys = match_keys[match_keys >= 0]
+    if len(match_keys) == matches.n_matches:
+        return matches
+    return matches.subset(match_keys)
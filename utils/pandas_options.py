@@ -0,0 +1,17 @@
+"""
+Opciones globales de pandas
+Ajustes que afectan a todo el proceso; se aplican una vez en cada punto de entrada
+(moba_dashboard.py y los scripts), no al importar un módulo
+"""
+
+import pandas as pd
+
+
+def enable_copy_on_write():
+    """Activa copy-on-write en pandas 2 (en pandas 3 siempre está activo).
+
+    Se llama una vez en cada punto de entrada, no al importar un módulo, para no cambiar
+    el comportamiento de pandas según el orden de importación.
+    """
+    if int(pd.__version__.split('.')[0]) == 2:
+        pd.set_option('mode.copy_on_write', True)
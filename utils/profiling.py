@@ -0,0 +1,207 @@
+"""
+Perfilado del renderizado por componente
+Con el modo de perfilado activo (interruptor de la barra lateral, encendido por defecto
+con la variable de entorno DASHBOARD_PROFILE), cada pestaña y subpestaña decorada con
+@profiled registra su tiempo, el pico de memoria del proceso durante la sección
+(tracemalloc) y las filas que recibe. Los registros se muestran en un panel plegable y se
+añaden a un log JSONL local
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+PROFILE_ENV_VAR = 'DASHBOARD_PROFILE'
+PROFILE_LOG_ENV_VAR = 'DASHBOARD_PROFILE_LOG'
+DEFAULT_PROFILE_LOG = 'dashboard_profile.jsonl'
+
+# Secciones abiertas en el hilo de la sesión actual (pila de anidamiento)
+_local = threading.local()
+_log_lock = threading.Lock()
+
+# tracemalloc es único en el intérprete: se comparte entre las sesiones (un hilo cada una)
+# con un contador de secciones externas abiertas, protegido por un lock
+_tracing_lock = threading.Lock()
+_tracing = {'sections': 0, 'owned': False}
+
+
+def profiling_enabled_by_env():
+    """True si DASHBOARD_PROFILE activa el perfilado (1, true, yes, on)"""
+    return os.environ.get(PROFILE_ENV_VAR, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def is_profiling_enabled():
+    """True si el interruptor de la sesión está activo; DASHBOARD_PROFILE solo fija su valor inicial"""
+    return bool(st.session_state.get('profiling_enabled', profiling_enabled_by_env()))
+
+
+def get_profile_log_path():
+    """Ruta del log JSONL de perfiles"""
+    return os.environ.get(PROFILE_LOG_ENV_VAR, DEFAULT_PROFILE_LOG)
+
+
+def start_profiling_run():
+    """Vacía los registros de la ejecución anterior del script"""
+    st.session_state.profiling_records = []
+
+
+def count_rows(args):
+    """Filas del primer DataFrame entre los argumentos; None si no hay ninguno"""
+    for arg in args:
+        if isinstance(arg, pd.DataFrame):
+            return len(arg)
+    return None
+
+
+def append_to_log(record):
+    """Añade un registro al log JSONL; un log no escribible no debe romper el dashboard"""
+    try:
+        with _log_lock, open(get_profile_log_path(), 'a', encoding='utf-8') as log:
+            log.write(json.dumps(record, ensure_ascii=False) + '\n')
+    except OSError:
+        pass
+
+
+def start_tracing():
+    """Registra una sección externa abierta; la primera activa tracemalloc si nadie lo hizo"""
+    with _tracing_lock:
+        _tracing['sections'] += 1
+        if _tracing['sections'] == 1 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing['owned'] = True
+
+
+def stop_tracing():
+    """Cierra una sección externa; la última detiene tracemalloc si lo activó el perfilado"""
+    with _tracing_lock:
+        _tracing['sections'] -= 1
+        if _tracing['sections'] == 0 and _tracing['owned']:
+            tracemalloc.stop()
+            _tracing['owned'] = False
+
+
+@contextmanager
+def profile_section(name, rows=None):
+    """Mide una sección: tiempo, pico de memoria asignada sobre la del inicio y filas.
+
+    Las secciones pueden anidarse; el pico de una sección incluye el de sus hijas. El pico
+    es del proceso: si otras sesiones están perfilando a la vez, no se reinicia (borraría
+    el suyo) y también incluye sus asignaciones. Si el perfilado no está activo no hace nada.
+    """
+    if not is_profiling_enabled():
+        yield
+        return
+
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+
+    # tracemalloc se activa con la primera sección externa abierta y se detiene con la última
+    outermost = not stack
+    if outermost:
+        start_tracing()
+    with _tracing_lock:
+        if stack:
+            # reset_peak borra el pico de la sección padre: se guarda antes de medir la hija
+            stack[-1]['peak'] = max(stack[-1]['peak'], tracemalloc.get_traced_memory()[1])
+        if _tracing['sections'] == 1:
+            tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+
+    # El registro se añade al abrir la sección para que el panel siga el orden de ejecución
+    record = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'section': name,
+        'parent': stack[-1]['name'] if stack else None,
+        'depth': len(stack),
+        'rows': rows
+    }
+    if 'profiling_records' not in st.session_state:
+        st.session_state.profiling_records = []
+    st.session_state.profiling_records.append(record)
+
+    frame = {'name': name, 'start_memory': start_memory, 'peak': 0}
+    stack.append(frame)
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        with _tracing_lock:
+            peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+        stack.pop()
+        if stack:
+            stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+        if outermost:
+            stop_tracing()
+
+        record.update({
+            'seconds': round(seconds, 4),
+            'peak_memory_mb': round(max(peak - frame['start_memory'], 0) / 1024 ** 2, 2),
+            'error': error
+        })
+        append_to_log(record)
+
+
+def profiled(function=None, name=None):
+    """Decorador que mide cada llamada a un componente con profile_section"""
+    def decorator(function):
+        section = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not is_profiling_enabled():
+                return function(*args, **kwargs)
+            with profile_section(section, count_rows(args)):
+                return function(*args, **kwargs)
+        return wrapper
+
+    return decorator(function) if function is not None else decorator
+
+
+def render_profiling_toggle():
+    """Interruptor del modo de perfilado en la barra lateral"""
+    st.sidebar.checkbox(
+        "⏱️ Perfilar renderizado",
+        value=profiling_enabled_by_env(),
+        key='profiling_enabled',
+        help=f"Mide tiempo, memoria y filas de cada pestaña y subpestaña y los guarda en {get_profile_log_path()}"
+    )
+
+
+def render_profiling_panel():
+    """Panel plegable con los registros de perfilado de esta ejecución"""
+    records = st.session_state.get('profiling_records', [])
+    if not is_profiling_enabled() or not records:
+        return
+
+    profile = pd.DataFrame(records)
+    # Sangría según el anidamiento para leer el árbol de secciones
+    profile['Sección'] = [' ' * depth + section for depth, section in zip(profile['depth'], profile['section'])]
+    total = profile.loc[profile['depth'] == 0, 'seconds'].sum()
+
+    with st.expander(f"⏱️ Perfil de renderizado ({total:.2f} s)", expanded=False):
+        st.dataframe(
+            profile[['Sección', 'seconds', 'peak_memory_mb', 'rows', 'error']].rename(columns={
+                'seconds': 'Tiempo (s)', 'peak_memory_mb': 'Pico memoria proceso (MB)', 'rows': 'Filas', 'error': 'Error'
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+        st.caption(
+            "ℹ️ El pico de memoria es del proceso completo: si otras sesiones perfilan a la vez, "
+            "incluye también sus asignaciones"
+        )
+        st.caption(f"📝 Registros añadidos a {get_profile_log_path()}")
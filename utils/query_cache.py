@@ -0,0 +1,125 @@
+"""
+Cachés de consultas del dashboard
+Firmas canónicas de filtros y una caché LRU limitada por bytes, compartida entre
+reruns y sesiones, para resultados derivados de un dataset
+"""
+
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def normalize_filter_value(value):
+    """Convierte un valor de filtro a una forma canónica serializable"""
+    if isinstance(value, (list, tuple, set)):
+        if len(value) == 2 and all(hasattr(v, 'isoformat') for v in value):
+            # Rango de fechas: el orden de los extremos sí importa
+            return [v.isoformat() for v in value]
+        return sorted(str(v) for v in value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def filter_signature(filters):
+    """Firma canónica de un diccionario de filtros, independiente del orden de claves y valores"""
+    normalized = {}
+
+    # El filtro Geekos solo cuenta si está activo y tiene jugadores
+    if filters.get('_geeko_filter', False) and filters.get('_geeko_players'):
+        normalized['_geeko_players'] = normalize_filter_value(filters['_geeko_players'])
+
+    for column, filter_vals in filters.items():
+        # Los filtros vacíos no cambian el resultado
+        if column.startswith('_') or not filter_vals:
+            continue
+        normalized[column] = normalize_filter_value(filter_vals)
+
+    payload = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def estimate_nbytes(value):
+    """Estimación del tamaño en memoria de un resultado cacheado"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True, index=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_nbytes(item) for item in value) + sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(item) for item in value.values()) + sys.getsizeof(value)
+    if hasattr(value, 'nbytes'):
+        # Estructuras propias (p. ej. matrices de sinergias) declaran su tamaño
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+
+class ByteBudgetLRU:
+    """Caché LRU cuyo límite es el tamaño total en bytes de los valores guardados"""
+
+    def __init__(self, max_bytes, sizeof=estimate_nbytes):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # Streamlit atiende cada sesión en su propio hilo
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """Retorna el valor guardado y lo marca como usado recientemente"""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        """Guarda un valor y expulsa los menos usados hasta respetar el límite"""
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            # Un valor mayor que todo el presupuesto no se guarda
+            return False
+
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+        return True
+
+    def clear(self):
+        """Vacía la caché"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        """Resumen de uso de la caché"""
+        return {
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
@@ -0,0 +1,203 @@
+"""
+Motor de rankings
+Una sola agregación agrupada (suma, conteo y máximo de todas las métricas de ranking por
+entidad y héroe) da el promedio, el total y el máximo de cada métrica por entidad y el
+mejor héroe de cada jugador. La tabla se memoriza por firma de filtros, así que cambiar
+de métrica o de agregación en los selectores es una consulta; el Top y el Bottom k se
+extraen con np.argpartition
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.aggregates import aggregate, memoize
+
+# Agregación del selector -> función
+AGGREGATIONS = {"Promedio": "mean", "Total": "sum", "Máximo": "max"}
+
+# Estadísticos de la pasada agrupada; el promedio se deriva de suma y conteo
+PASS_FUNCS = ('sum', 'count', 'max')
+
+
+def top_k_positions(values, k):
+    """Posiciones de los k valores mayores, de mayor a menor; ignora NaN"""
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) > k:
+        valid = valid[np.argpartition(-values[valid], k - 1)[:k]]
+    return valid[np.argsort(-values[valid], kind='stable')]
+
+
+def bottom_k_positions(values, k):
+    """Posiciones de los k valores menores, de mayor a menor (como el final de un ranking); ignora NaN"""
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) > k:
+        valid = valid[np.argpartition(values[valid], k - 1)[:k]]
+    return valid[np.argsort(-values[valid], kind='stable')]
+
+
+def derive_stat(pass_result, metric, func):
+    """Promedio, total o máximo de una métrica a partir de la salida de PASS_FUNCS"""
+    if func == 'mean':
+        counts = pass_result[(metric, 'count')].astype('float64')
+        return pass_result[(metric, 'sum')].astype('float64') / counts.where(counts > 0)
+    return pass_result[(metric, func)].astype('float64')
+
+
+class RankingTable:
+    """Promedio, total y máximo de cada métrica por entidad, con el mejor héroe de cada una"""
+
+    def __init__(self, entity_col, entities, values, best_heroes=None, integer_metrics=()):
+        self.entity_col = entity_col
+        self.entities = entities
+        self.values = values
+        self.best_heroes = best_heroes
+        self.integer_metrics = set(integer_metrics)
+
+    def __len__(self):
+        return len(self.entities)
+
+    @property
+    def nbytes(self):
+        """Memoria aproximada de la tabla, para el presupuesto de la caché de agregaciones"""
+        arrays = list(self.values.values()) + list((self.best_heroes or {}).values())
+        return sum(array.nbytes for array in arrays) + int(self.entities.memory_usage(deep=True))
+
+    def column_values(self, metric, func, positions=None):
+        """Valores de una métrica y función; el total y el máximo de una métrica entera son int64, como en pandas"""
+        values = self.values[(metric, func)]
+        if positions is not None:
+            values = values[positions]
+        if func in ('sum', 'max') and metric in self.integer_metrics and not np.isnan(values).any():
+            return values.astype('int64')
+        return values
+
+    def stats(self, metric, aggregation):
+        """Valores de una métrica y agregación por entidad"""
+        return pd.Series(self.column_values(metric, AGGREGATIONS[aggregation]), index=self.entities, name=metric)
+
+    def rows(self, metric, aggregation, positions):
+        """Filas del ranking (entidad, valor y, si se conoce, héroe) para unas posiciones"""
+        func = AGGREGATIONS[aggregation]
+        rows = pd.DataFrame({
+            self.entity_col: self.entities[positions],
+            metric: self.column_values(metric, func, positions)
+        })
+        if self.best_heroes is not None:
+            rows['Héroe'] = self.best_heroes[(metric, func)][positions]
+        return rows
+
+    def top(self, metric, aggregation, k=5):
+        """Las k entidades con el valor más alto, de mayor a menor"""
+        return self.rows(metric, aggregation, top_k_positions(self.values[(metric, AGGREGATIONS[aggregation])], k))
+
+    def bottom(self, metric, aggregation, k=5):
+        """Las k entidades con el valor más bajo, de mayor a menor"""
+        return self.rows(metric, aggregation, bottom_k_positions(self.values[(metric, AGGREGATIONS[aggregation])], k))
+
+
+def build_ranking_table(data, entity_col, metrics, hero_col=None):
+    """Tabla de rankings de todas las métricas; con hero_col incluye el mejor héroe por entidad.
+
+    El mejor héroe de cada métrica y agregación es el de mayor valor con esa misma
+    agregación entre los héroes de la entidad; para el máximo, el de la primera fila que lo
+    alcanza, como idxmax sobre las filas.
+    """
+    keys = [entity_col] if hero_col is None else [entity_col, hero_col]
+    pass_result = aggregate(data, keys, metrics, PASS_FUNCS)
+
+    if hero_col is None:
+        entity_totals = pass_result
+    else:
+        # El total por entidad se deriva de la pasada por (entidad, héroe) sin volver a recorrer data
+        by_entity = pass_result.groupby(level=0, observed=True, sort=False)
+        entity_totals = pd.concat(
+            [by_entity[[column for column in pass_result.columns if column[1] in ('sum', 'count')]].sum(),
+             by_entity[[column for column in pass_result.columns if column[1] == 'max']].max()],
+            axis=1
+        )
+
+    entities = pd.Index(entity_totals.index, name=entity_col)
+    columns = [(metric, func) for metric in metrics for func in AGGREGATIONS.values()]
+    values = {column: derive_stat(entity_totals, *column).to_numpy(dtype='float64') for column in columns}
+
+    best_heroes = None
+    if hero_col is not None:
+        pair_values = pd.DataFrame({
+            column: derive_stat(pass_result, *column) for column in columns if column[1] != 'max'
+        })
+        best_heroes = best_by_entity(pair_values, entities)
+        maxes = {metric: values[(metric, 'max')] for metric in metrics}
+        best_heroes.update(first_at_max(data, entity_col, hero_col, entities, maxes))
+
+    integer_metrics = [metric for metric in metrics if pd.api.types.is_integer_dtype(data[metric].dtype)]
+    return RankingTable(entity_col, entities, values, best_heroes, integer_metrics)
+
+
+def best_by_entity(pair_values, entities):
+    """Héroe con el valor más alto de cada entidad en cada columna de un DataFrame indexado por (entidad, héroe).
+    
+    Todas las columnas se resuelven a la vez con reduceat sobre los tramos de cada entidad;
+    dentro de cada tramo los héroes van por nombre, así que con empates gana el primero en
+    orden alfabético, como con groupby ordenado + idxmax.
+    """
+    best = {column: np.full(len(entities), None, dtype=object) for column in pair_values.columns}
+    if pair_values.empty:
+        return best
+
+    entity_codes = entities.get_indexer(pair_values.index.get_level_values(0))
+    hero_names = pair_values.index.get_level_values(1).astype(str).to_numpy(dtype=str)
+    order = np.lexsort((np.unique(hero_names, return_inverse=True)[1], entity_codes))
+    codes = entity_codes[order]
+    values = pair_values.to_numpy(dtype='float64')[order]
+    heroes = np.append(pair_values.index.get_level_values(1).to_numpy(dtype=object)[order], None)
+
+    # Inicio de cada tramo de entidad y tramo de cada fila
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    segment = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(codes)]))
+
+    # NaN nunca es el máximo; la primera fila que alcanza el máximo del tramo es el mejor héroe
+    missing = np.isnan(values)
+    filled = np.where(missing, -np.inf, values)
+    segment_max = np.maximum.reduceat(filled, starts, axis=0)
+    is_best = (filled == segment_max[segment]) & ~missing
+    rows = np.where(is_best, np.arange(len(codes))[:, None], len(codes))
+    first = np.minimum.reduceat(rows, starts, axis=0)
+
+    for position, column in enumerate(pair_values.columns):
+        best[column][codes[starts]] = heroes[first[:, position]]
+    return best
+
+
+def entity_row_codes(column, entities):
+    """Posición en entities de la entidad de cada fila; -1 si no está"""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # Una búsqueda por categoría; el código -1 (valor nulo) cae en el último hueco
+        lookup = np.append(entities.get_indexer(column.cat.categories), -1)
+        return lookup[column.cat.codes.to_numpy()]
+    return entities.get_indexer(column)
+
+
+def first_at_max(data, entity_col, hero_col, entities, maxes):
+    """Héroe de la primera fila que alcanza el máximo de cada entidad, como idxmax sobre las filas.
+
+    maxes asocia cada métrica con su máximo por entidad (alineado con entities). Retorna
+    el mejor héroe por entidad con la clave (métrica, 'max').
+    """
+    codes = entity_row_codes(data[entity_col], entities)
+    known = codes >= 0
+    best = {}
+    for metric, metric_max in maxes.items():
+        heroes = np.full(len(entities), None, dtype=object)
+        values = data[metric].to_numpy(dtype='float64', na_value=np.nan)
+        # NaN nunca es igual al máximo; las filas vienen en orden, así que la primera es la de idxmax
+        at_max = np.flatnonzero(known & (values == metric_max[np.where(known, codes, 0)]))
+        found, first = np.unique(codes[at_max], return_index=True)
+        heroes[found] = data[hero_col].take(at_max[first]).to_numpy(dtype=object)
+        best[(metric, 'max')] = heroes
+    return best
+
+
+def get_ranking_table(data, entity_col, metrics, hero_col=None):
+    """Tabla de rankings memorizada por (dataset, firma de filtros, entidad, métricas)"""
+    name = ('ranking_table', entity_col, hero_col, tuple(metrics))
+    return memoize(data, name, lambda frame: build_ranking_table(frame, entity_col, list(metrics), hero_col))
@@ -0,0 +1,263 @@
+"""
+Cubo de agregados precalculados
+Resume el dataset por (Player, Hero, Map, Role, día) guardando conteos, sumas,
+sumas de cuadrados, máximos y mínimos de cada métrica numérica. Las agregaciones
+sobre esas dimensiones se responden desde el cubo en lugar del DataFrame completo;
+promedios y desviaciones se derivan algebraicamente
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.filter_engine import FilterEngine
+
+
+# Dimensiones del cubo, en el orden en que se agrupan
+CUBE_DIMENSIONS = ['Player', 'Hero', 'Map', 'Role', 'Date']
+
+# Columnas duplicadas que pueden responderse con su dimensión equivalente
+KEY_ALIASES = {'PlayerName': 'Player', 'HeroName': 'Hero'}
+
+# Funciones que se derivan de los estadísticos guardados
+CUBE_FUNCS = {'count', 'sum', 'mean', 'var', 'std', 'max', 'min'}
+
+# El cubo solo se materializa si reduce al menos a la mitad el número de filas
+MAX_ROW_RATIO = 0.5
+
+ROWS_COLUMN = 'rows'
+
+
+def get_cube_metrics(data, dimensions):
+    """Columnas numéricas o booleanas que el cubo puede resumir"""
+    metrics = []
+    for column in data.columns:
+        if column in dimensions or column in KEY_ALIASES:
+            continue
+        dtype = data[column].dtype
+        if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_float_dtype(dtype):
+            metrics.append(column)
+    return metrics
+
+
+def stat_column(metric, stat):
+    """Nombre de la columna del cubo para un estadístico de una métrica"""
+    return f"{metric}__{stat}"
+
+
+def build_rollup_cube(data, max_row_ratio=MAX_ROW_RATIO):
+    """Construye el cubo de un dataset; None si no reduce lo suficiente el número de filas.
+    
+    Con max_row_ratio=None el cubo se construye siempre (partes que se combinarán después).
+    """
+    dimensions = [column for column in CUBE_DIMENSIONS if column in data.columns]
+    if not dimensions or len(data) == 0:
+        return None
+
+    keys = [data[column] for column in dimensions]
+    if 'Date' in dimensions:
+        keys[dimensions.index('Date')] = pd.to_datetime(data['Date'], errors='coerce').dt.floor('D')
+
+    # Las filas con claves nulas también cuentan para agregaciones por otras dimensiones
+    if max_row_ratio is not None:
+        n_groups = data.groupby(keys, observed=True, dropna=False).ngroups
+        if n_groups > len(data) * max_row_ratio:
+            return None
+
+    metrics = get_cube_metrics(data, dimensions)
+    values = data[metrics].astype('float64')
+    grouped = values.groupby(keys, observed=True, dropna=False)
+
+    stats = {ROWS_COLUMN: grouped.size()}
+    sums = grouped.sum()
+    sumsqs = (values ** 2).groupby(keys, observed=True, dropna=False).sum()
+    maxes = grouped.max()
+    mins = grouped.min()
+    counts = grouped.count()
+    for metric in metrics:
+        dtype = data[metric].dtype
+        stats[stat_column(metric, 'sum')] = sums[metric]
+        stats[stat_column(metric, 'sumsq')] = sumsqs[metric]
+        # Máximos y mínimos conservan el tipo original de la métrica
+        stats[stat_column(metric, 'max')] = maxes[metric].astype(dtype, errors='ignore')
+        stats[stat_column(metric, 'min')] = mins[metric].astype(dtype, errors='ignore')
+        if data[metric].isna().any():
+            stats[stat_column(metric, 'count')] = counts[metric]
+
+    # Un solo DataFrame a partir del dict agrupa las columnas por tipo en lugar de un bloque por columna
+    frame = pd.DataFrame(stats).reset_index()
+    frame.columns = dimensions + list(frame.columns[len(dimensions):])
+
+    # Las dimensiones del cubo mantienen las mismas categorías que el dataset
+    for column in dimensions:
+        if isinstance(data[column].dtype, pd.CategoricalDtype):
+            frame[column] = frame[column].astype(data[column].dtype)
+
+    aliases = {
+        alias: column for alias, column in KEY_ALIASES.items()
+        if alias in data.columns and column in dimensions
+        and data[alias].astype(str).equals(data[column].astype(str))
+    }
+    day_resolution = 'Date' in dimensions and bool(
+        (keys[dimensions.index('Date')].dropna() == data['Date'].dropna()).all()
+    )
+    dtypes = {metric: data[metric].dtype for metric in metrics}
+    return RollupCube(frame, dimensions, dtypes, aliases, day_resolution)
+
+
+def merge_rollup_cubes(cubes, data):
+    """Combina cubos de partes disjuntas de un dataset en un único cubo.
+    
+    Sumas, conteos y sumas de cuadrados se suman; máximos y mínimos se recombinan. El coste
+    es proporcional a las filas de los cubos, no a las del dataset. data es el dataset
+    combinado y aporta las categorías y tipos finales.
+    """
+    dimensions = cubes[0].dimensions
+    count_columns = sorted({
+        column for cube in cubes for column in cube.frame.columns if column.endswith('__count')
+    })
+
+    frames = []
+    for cube in cubes:
+        frame = cube.frame
+        missing_counts = [column for column in count_columns if column not in frame.columns]
+        if missing_counts:
+            # Sin columna de conteo la métrica no tenía nulos: cuenta todas las filas
+            frame = frame.assign(**{column: frame[ROWS_COLUMN] for column in missing_counts})
+        frames.append(frame)
+
+    combined = pd.concat(frames, ignore_index=True)
+    for column in dimensions:
+        if isinstance(data[column].dtype, pd.CategoricalDtype):
+            combined[column] = combined[column].astype(object).astype(data[column].dtype)
+
+    stat_columns = [column for column in combined.columns if column not in dimensions]
+    max_columns = [column for column in stat_columns if column.endswith('__max')]
+    min_columns = [column for column in stat_columns if column.endswith('__min')]
+    sum_columns = [column for column in stat_columns if column not in max_columns and column not in min_columns]
+
+    # Una reducción por tipo de estadístico, sin fragmentar el resultado en un bloque por columna
+    grouped = combined.groupby(dimensions, observed=True, dropna=False)
+    frame = pd.concat(
+        [grouped[sum_columns].sum(), grouped[max_columns].max(), grouped[min_columns].min()], axis=1
+    )[stat_columns].copy().reset_index()
+
+    dtypes = {metric: data[metric].dtype for metric in cubes[0].dtypes if metric in data.columns}
+    aliases = {
+        alias: column for alias, column in cubes[0].aliases.items()
+        if all(cube.aliases.get(alias) == column for cube in cubes)
+    }
+    day_resolution = all(cube.day_resolution for cube in cubes)
+    return RollupCube(frame, dimensions, dtypes, aliases, day_resolution)
+
+
+class RollupCube:
+    """Agregados precalculados por combinación de dimensiones, consultables con los filtros del dashboard"""
+
+    def __init__(self, frame, dimensions, dtypes, aliases, day_resolution):
+        self.frame = frame
+        self.dimensions = dimensions
+        self.dtypes = dtypes
+        self.aliases = aliases
+        self.day_resolution = day_resolution
+        # Los filtros se evalúan sobre el cubo con el mismo motor que sobre el dataset
+        self.engine = FilterEngine(frame)
+
+    @property
+    def n_rows(self):
+        return len(self.frame)
+
+    def key_column(self, key):
+        """Dimensión del cubo que responde a una clave de agrupación; None si no hay ninguna"""
+        column = self.aliases.get(key, key)
+        if column not in self.dimensions:
+            return None
+        if column == 'Date' and not self.day_resolution:
+            return None
+        return column
+
+    def supports(self, keys, metrics, funcs):
+        """Indica si la agregación puede responderse desde el cubo"""
+        return (
+            all(self.key_column(key) is not None for key in keys)
+            and all(metric in self.dtypes for metric in metrics)
+            and all(func in CUBE_FUNCS for func in funcs)
+        )
+
+    def count_column(self, metric):
+        """Columna con los valores no nulos de una métrica (las filas si no tiene nulos)"""
+        column = stat_column(metric, 'count')
+        return column if column in self.frame.columns else ROWS_COLUMN
+
+    def required_columns(self, metrics, funcs):
+        """Columnas del cubo a sumar, maximizar y minimizar para responder la consulta"""
+        sum_columns, max_columns, min_columns = [], [], []
+        for metric in metrics:
+            for func in funcs:
+                if func == 'max':
+                    max_columns.append(stat_column(metric, 'max'))
+                elif func == 'min':
+                    min_columns.append(stat_column(metric, 'min'))
+                else:
+                    sum_columns.append(self.count_column(metric))
+                    if func != 'count':
+                        sum_columns.append(stat_column(metric, 'sum'))
+                    if func in ('var', 'std'):
+                        sum_columns.append(stat_column(metric, 'sumsq'))
+        unique = lambda columns: list(dict.fromkeys(columns))
+        return unique(sum_columns), unique(max_columns), unique(min_columns)
+
+    def derive(self, totals, metric, func):
+        """Calcula una función de agregación de una métrica a partir de los estadísticos reducidos"""
+        dtype = self.dtypes[metric]
+        if func == 'max':
+            return totals[stat_column(metric, 'max')]
+        if func == 'min':
+            return totals[stat_column(metric, 'min')]
+
+        counts = totals[self.count_column(metric)]
+        if func == 'count':
+            return counts
+
+        sums = totals[stat_column(metric, 'sum')]
+        if func == 'sum':
+            if pd.api.types.is_float_dtype(dtype):
+                return sums.astype(dtype)
+            return sums.round().astype('int64')
+
+        counts = counts.astype('float64')
+        if func == 'mean':
+            return sums / counts.where(counts > 0)
+
+        sumsqs = totals[stat_column(metric, 'sumsq')]
+        variance = ((sumsqs - sums ** 2 / counts.where(counts > 0)) / (counts - 1).where(counts > 1)).clip(lower=0)
+        if func == 'var':
+            return variance
+        return np.sqrt(variance)
+
+    def query(self, filters, keys, metrics, funcs):
+        """Agrega las métricas por las claves sobre las filas del cubo que cumplen los filtros"""
+        rows = self.engine.select_rows(filters)
+        frame = self.frame if rows is None else self.frame.take(rows)
+        grouped = frame.groupby([self.key_column(key) for key in keys], observed=True)
+
+        # Una sola reducción por tipo de estadístico para todas las métricas
+        sum_columns, max_columns, min_columns = self.required_columns(metrics, funcs)
+        reduced = []
+        if sum_columns:
+            reduced.append(grouped[sum_columns].sum())
+        if max_columns:
+            reduced.append(grouped[max_columns].max())
+        if min_columns:
+            reduced.append(grouped[min_columns].min())
+        totals = pd.concat(reduced, axis=1) if len(reduced) > 1 else reduced[0]
+
+        results = {}
+        for metric in metrics:
+            for func in funcs:
+                results[(metric, func)] = self.derive(totals, metric, func)
+
+        result = pd.DataFrame(results)
+        if len(funcs) == 1:
+            result.columns = list(metrics)
+        result.index.names = list(keys)
+        return result
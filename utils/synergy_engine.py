@@ -0,0 +1,149 @@
+"""
+Motor de sinergias y counters entre héroes
+A partir de la tabla de partidas construye matrices héroe×héroe de partidas juntos
+(aliados) y enfrentados (rivales), con sus versiones ponderadas por victoria, mediante
+productos de matrices dispersas de incidencia equipo×héroe
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from utils.aggregates import memoize
+from utils.match_table import get_match_table
+
+# Partidas mínimas de una pareja para considerar su winrate
+DEFAULT_MIN_PAIR_GAMES = 5
+
+
+def team_incidence(heroes, n_heroes, weights=None):
+    """Matriz dispersa (equipos, héroes) con un 1 (o el peso del equipo) por héroe presente"""
+    n_teams = heroes.shape[0]
+    rows = np.repeat(np.arange(n_teams), heroes.shape[1])
+    columns = heroes.ravel().astype(np.int64)
+    present = columns >= 0
+    if weights is None:
+        values = np.ones(len(columns))
+    else:
+        values = np.repeat(np.asarray(weights, dtype=np.float64), heroes.shape[1])
+    return sparse.csr_matrix(
+        (values[present], (rows[present], columns[present])), shape=(n_teams, n_heroes)
+    )
+
+
+def build_synergy_matrices(matches):
+    """Calcula las matrices de aliados y rivales de una tabla de partidas"""
+    n_heroes = len(matches.hero_categories)
+    side_a, side_b = matches.heroes[:, 0], matches.heroes[:, 1]
+    won_a, won_b = matches.team_won[:, 0], matches.team_won[:, 1]
+
+    # Incidencia de ambos lados apilada: cada fila es un equipo
+    teams = team_incidence(np.concatenate([side_a, side_b]), n_heroes)
+    won = np.concatenate([won_a, won_b]).astype(np.float64)
+    winning_teams = sparse.diags(won) @ teams
+    ally_games = (teams.T @ teams).tocsr()
+    ally_wins = (teams.T @ winning_teams).tocsr()
+
+    # Rivales: héroes del lado A frente a los del lado B y viceversa
+    a, b = team_incidence(side_a, n_heroes), team_incidence(side_b, n_heroes)
+    a_wins, b_wins = team_incidence(side_a, n_heroes, won_a), team_incidence(side_b, n_heroes, won_b)
+    enemy_games = (a.T @ b + b.T @ a).tocsr()
+    enemy_wins = (a_wins.T @ b + b_wins.T @ a).tocsr()
+
+    return SynergyMatrices(matches.hero_categories, ally_games, ally_wins, enemy_games, enemy_wins)
+
+
+class SynergyMatrices:
+    """Partidas y victorias por pareja de héroes, como aliados y como rivales.
+
+    La diagonal de ally_games y ally_wins contiene las partidas y victorias de cada héroe;
+    enemy_wins[i, j] cuenta las victorias de i cuando se enfrenta a j.
+    """
+
+    def __init__(self, hero_names, ally_games, ally_wins, enemy_games, enemy_wins):
+        self.hero_names = pd.Index(hero_names)
+        self.ally_games = ally_games
+        self.ally_wins = ally_wins
+        self.enemy_games = enemy_games
+        self.enemy_wins = enemy_wins
+
+    @property
+    def nbytes(self):
+        matrices = [self.ally_games, self.ally_wins, self.enemy_games, self.enemy_wins]
+        return sum(m.data.nbytes + m.indices.nbytes + m.indptr.nbytes for m in matrices)
+
+    @property
+    def hero_games(self):
+        return np.asarray(self.ally_games.diagonal())
+
+    @property
+    def hero_winrates(self):
+        games = self.hero_games
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.asarray(self.ally_wins.diagonal()) / games
+
+    def _pairs(self, games, wins, min_games, upper=False):
+        """Parejas (i, j) fuera de la diagonal con al menos min_games partidas"""
+        # Las matrices de aliados son simétricas: basta con el triángulo superior
+        games = sparse.triu(games, k=1).tocoo() if upper else games.tocoo()
+        keep = (games.data >= min_games) & (games.row != games.col)
+        rows, cols, counts = games.row[keep], games.col[keep], games.data[keep]
+        pair_wins = np.asarray(wins[rows, cols]).ravel()
+        return rows, cols, counts, pair_wins
+
+    def ally_pairs(self, min_games=DEFAULT_MIN_PAIR_GAMES):
+        """Parejas de aliados con su winrate y la diferencia frente a la media de sus winrates"""
+        rows, cols, games, wins = self._pairs(self.ally_games, self.ally_wins, min_games, upper=True)
+        baselines = self.hero_winrates
+        winrate = wins / games
+        return pd.DataFrame({
+            'Hero': self.hero_names[rows],
+            'Partner': self.hero_names[cols],
+            'Games': games.astype(np.int64),
+            'Winrate': winrate,
+            'Delta': winrate - (baselines[rows] + baselines[cols]) / 2
+        })
+
+    def enemy_pairs(self, min_games=DEFAULT_MIN_PAIR_GAMES):
+        """Enfrentamientos (héroe frente a rival) con su winrate y la diferencia frente al winrate del héroe"""
+        rows, cols, games, wins = self._pairs(self.enemy_games, self.enemy_wins, min_games)
+        winrate = wins / games
+        return pd.DataFrame({
+            'Hero': self.hero_names[rows],
+            'Opponent': self.hero_names[cols],
+            'Games': games.astype(np.int64),
+            'Winrate': winrate,
+            'Delta': winrate - self.hero_winrates[rows]
+        })
+
+    def synergy_matrix(self, heroes, min_games=DEFAULT_MIN_PAIR_GAMES):
+        """Matriz densa de delta de winrate como aliados entre los héroes indicados"""
+        positions = self.hero_names.get_indexer(heroes)
+        games = self.ally_games[positions][:, positions].toarray()
+        wins = self.ally_wins[positions][:, positions].toarray()
+        baselines = self.hero_winrates[positions]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            delta = wins / games - (baselines[:, None] + baselines[None, :]) / 2
+        delta[(games < min_games) | np.eye(len(positions), dtype=bool)] = np.nan
+        return pd.DataFrame(delta, index=list(heroes), columns=list(heroes))
+
+    def best_partners(self, hero, n=10, min_games=DEFAULT_MIN_PAIR_GAMES):
+        """Aliados con mayor delta de winrate para un héroe"""
+        pairs = self.ally_pairs(min_games)
+        partners = pd.concat([
+            pairs[pairs['Hero'] == hero],
+            pairs[pairs['Partner'] == hero].rename(columns={'Hero': 'Partner', 'Partner': 'Hero'})
+        ])
+        return partners.drop(columns='Hero').nlargest(n, 'Delta').reset_index(drop=True)
+
+    def matchups(self, hero, n=10, min_games=DEFAULT_MIN_PAIR_GAMES, best=True):
+        """Rivales contra los que el héroe más gana (best) o más pierde respecto a su winrate"""
+        pairs = self.enemy_pairs(min_games)
+        pairs = pairs[pairs['Hero'] == hero].drop(columns='Hero')
+        ranked = pairs.nlargest(n, 'Delta') if best else pairs.nsmallest(n, 'Delta')
+        return ranked.reset_index(drop=True)
+
+
+def get_synergy_matrices(data):
+    """Matrices de sinergias de las partidas presentes en data, memorizadas por firma de filtros"""
+    return memoize(data, 'synergy_matrices', lambda frame: build_synergy_matrices(get_match_table(frame)))
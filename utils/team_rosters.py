@@ -0,0 +1,106 @@
+"""
+Plantillas de equipo codificadas como bits
+Cada equipo completo de la tabla de partidas se guarda como una máscara de 128 bits de
+héroes (dos palabras uint64) y un vector de conteos por rol, de modo que los filtros por
+subconjunto, superconjunto o restricciones de rol son operaciones vectorizadas
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.aggregates import memoize
+from utils.hero_roles import get_all_roles
+from utils.match_table import EMPTY_SLOT, get_match_table
+
+# Palabras de 64 bits por máscara: 128 bits cubren todos los héroes del juego
+HERO_MASK_WORDS = 2
+WORD_BITS = 64
+
+
+def hero_masks(heroes, n_words=HERO_MASK_WORDS):
+    """Máscara de bits (equipos, palabras) con los héroes de cada equipo; ignora huecos vacíos"""
+    heroes = np.asarray(heroes, dtype=np.int64)
+    words = heroes // WORD_BITS
+    bits = np.where(heroes >= 0, np.left_shift(np.uint64(1), (heroes % WORD_BITS).astype(np.uint64)), np.uint64(0))
+    masks = np.zeros((len(heroes), n_words), dtype=np.uint64)
+    for word in range(n_words):
+        masks[:, word] = np.bitwise_or.reduce(np.where(words == word, bits, np.uint64(0)), axis=1)
+    return masks
+
+
+def build_team_rosters(matches):
+    """Codifica los equipos completos de una tabla de partidas"""
+    n_heroes = len(matches.hero_categories)
+    if n_heroes > HERO_MASK_WORDS * WORD_BITS:
+        raise ValueError(f"Demasiados héroes para una máscara de {HERO_MASK_WORDS * WORD_BITS} bits: {n_heroes}")
+
+    heroes, _, won = matches.teams()
+    role_codes = matches.hero_role_codes(heroes)
+    n_roles = len(get_all_roles())
+
+    # Conteo por rol; los héroes sin rol conocido van a la última columna
+    codes = np.where(role_codes == EMPTY_SLOT, n_roles, role_codes).astype(np.int64)
+    flat = (np.arange(len(codes), dtype=np.int64)[:, None] * (n_roles + 1) + codes).ravel()
+    role_counts = np.bincount(flat, minlength=len(codes) * (n_roles + 1)).reshape(len(codes), n_roles + 1)
+
+    return TeamRosters(hero_masks(heroes), role_counts.astype(np.int8), won, matches.hero_categories)
+
+
+class TeamRosters:
+    """Equipos como máscaras de héroes y conteos de rol, filtrables con operaciones de bits"""
+
+    def __init__(self, masks, role_counts, won, hero_names):
+        self.masks = masks
+        self.role_counts = role_counts
+        self.won = won
+        self.hero_names = pd.Index(hero_names)
+        self.role_names = get_all_roles()
+
+    @property
+    def n_teams(self):
+        return len(self.masks)
+
+    @property
+    def nbytes(self):
+        return self.masks.nbytes + self.role_counts.nbytes + self.won.nbytes
+
+    def query_mask(self, heroes):
+        """Máscara de bits de un conjunto de héroes por nombre; None si alguno no existe"""
+        codes = self.hero_names.get_indexer(list(heroes))
+        if (codes < 0).any():
+            return None
+        return hero_masks(codes.reshape(1, -1))[0]
+
+    def containing(self, heroes):
+        """Equipos que contienen todos los héroes indicados (superconjuntos de la selección)"""
+        query = self.query_mask(heroes)
+        if query is None:
+            return np.zeros(self.n_teams, dtype=bool)
+        return ((self.masks & query) == query).all(axis=1)
+
+    def within(self, heroes):
+        """Equipos formados solo por héroes del conjunto indicado (subconjuntos del pool)"""
+        # Los héroes del pool que no aparecen en los equipos no cambian el resultado
+        query = self.query_mask([hero for hero in heroes if hero in self.hero_names])
+        return ((self.masks & ~query) == 0).all(axis=1)
+
+    def with_roles(self, min_counts=None, max_counts=None):
+        """Equipos que cumplen mínimos y máximos por rol, p. ej. {'Tank': 1, 'Healer': 2}"""
+        mask = np.ones(self.n_teams, dtype=bool)
+        for role, count in (min_counts or {}).items():
+            mask &= self.role_counts[:, self.role_names.index(role)] >= count
+        for role, count in (max_counts or {}).items():
+            mask &= self.role_counts[:, self.role_names.index(role)] <= count
+        return mask
+
+    def with_any_role(self, roles):
+        """Equipos con al menos un héroe de alguno de los roles indicados"""
+        if not roles:
+            return np.ones(self.n_teams, dtype=bool)
+        columns = [self.role_names.index(role) for role in roles]
+        return (self.role_counts[:, columns] > 0).any(axis=1)
+
+
+def get_team_rosters(data):
+    """Plantillas de los equipos presentes en data, memorizadas por firma de filtros"""
+    return memoize(data, 'team_rosters', lambda frame: build_team_rosters(get_match_table(frame)))